@@ -0,0 +1,307 @@
+"""
+Admission Control
+Keeps a burst of CPU-heavy requests from starving everything else: each route
+has a priority class and the heavy ones a concurrency limit. Requests that
+cannot start wait in one bounded queue, best priority first, and overload is
+answered quickly with a Retry-After instead of by timing out.
+
+    cheap     lookups and cached data (/, /api/categories, /api/vedic/chart, ...)
+    standard  everything not listed
+    heavy     scans over many charts (correlations, searches, exports, ...)
+
+Responses:
+    429  a client exceeded its rate for heavy routes (ADMISSION_CLIENT_RATE
+         requests per second, bursts of ADMISSION_CLIENT_BURST; 0 disables)
+    503  the queue is full (ADMISSION_QUEUE_SIZE) of requests at least as urgent,
+         a more urgent request took a waiting one's place, or a request waited
+         longer than ADMISSION_QUEUE_TIMEOUT seconds
+
+ADMISSION_MAX_ACTIVE caps requests running at once; per-route limits can be
+overridden with ADMISSION_ROUTE_LIMITS, e.g. "/api/vedic/search=4,/api/vedic/export=2".
+Queue depth, running requests, admissions and rejections are exported at
+/metrics in the Prometheus text format.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from starlette.routing import Match
+
+from cache import LRUCache, cache_size
+
+PRIORITIES = {"cheap": 0, "standard": 1, "heavy": 2}
+
+CHEAP_ROUTES = {
+    "/",
+    "/metrics",
+    "/api/categories",
+    "/api/countries",
+    "/api/events/{event_id}",
+    "/api/vedic/chart/{month}/{day}/{year}",
+    "/api/vedic/today",
+    "/api/vedic/panchanga/{month}/{day}/{year}",
+    "/api/vedic/dasha/{month}/{day}/{year}",
+    "/api/vedic/tiles",
+    "/api/vedic/tiles/{year}.bin",
+    "/api/vedic/profiles",
+    "/api/stats/keys",
+}
+
+# Heavy routes and how many of each may run at once
+HEAVY_ROUTE_LIMITS = {
+    "/api/vedic/correlations/{month}/{day}": 2,
+    "/api/day/{month}/{day}": 2,
+    "/api/vedic/search": 2,
+    "/api/vedic/aspect-search": 2,
+    "/api/vedic/upcoming/{month}/{day}/{year}": 1,
+    "/api/vedic/export": 1,
+    "/api/vedic/panchanga": 2,
+    "/api/vedic/dashas/{month}/{day}": 2,
+    "/api/stats/enrichment": 2,
+}
+
+DEFAULT_MAX_ACTIVE = 16
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_QUEUE_TIMEOUT = 10.0
+MAX_RETRY_AFTER = 60
+
+
+def parse_route_limits(value: str) -> Dict[str, int]:
+    """Route limits from "route=limit,route=limit"; raises ValueError"""
+    limits = {}
+    for part in value.split(","):
+        if part.strip():
+            route, _, limit = part.rpartition("=")
+            limits[route.strip()] = int(limit)
+    return limits
+
+
+class Rejected(Exception):
+    def __init__(self, status: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency slots, the wait queue and per-client rate limits"""
+
+    def __init__(
+        self,
+        max_active: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        route_limits: Optional[Dict[str, int]] = None,
+        client_rate: Optional[float] = None,
+        client_burst: Optional[float] = None,
+    ):
+        env = os.environ.get
+        self.max_active = max_active if max_active is not None else int(env("ADMISSION_MAX_ACTIVE", DEFAULT_MAX_ACTIVE))
+        self.queue_size = queue_size if queue_size is not None else int(env("ADMISSION_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+        self.queue_timeout = queue_timeout if queue_timeout is not None else float(
+            env("ADMISSION_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT)
+        )
+        self.route_limits = {**HEAVY_ROUTE_LIMITS, **parse_route_limits(env("ADMISSION_ROUTE_LIMITS", ""))}
+        if route_limits:
+            self.route_limits.update(route_limits)
+        self.client_rate = client_rate if client_rate is not None else float(env("ADMISSION_CLIENT_RATE", 0))
+        self.client_burst = client_burst if client_burst is not None else float(
+            env("ADMISSION_CLIENT_BURST", max(self.client_rate * 5, 1))
+        )
+
+        self.active = 0
+        self.active_by_route: Counter = Counter()
+        # Waiting requests: [priority, arrival, route, future]
+        self._queue: List[list] = []
+        self._arrivals = itertools.count()
+        # Client -> [tokens, last refill time]
+        self._buckets = LRUCache(cache_size("clients", 10000))
+        # Smoothed seconds per request, for Retry-After estimates
+        self._service_time: Dict[str, float] = defaultdict(lambda: 1.0)
+
+        self.admitted: Counter = Counter()
+        self.rejected: Counter = Counter()
+        self.wait_seconds: Counter = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_active > 0
+
+    def priority(self, route: str) -> int:
+        if route in CHEAP_ROUTES:
+            return PRIORITIES["cheap"]
+        if route in self.route_limits:
+            return PRIORITIES["heavy"]
+        return PRIORITIES["standard"]
+
+    def _can_start(self, route: str) -> bool:
+        limit = self.route_limits.get(route)
+        return self.active < self.max_active and (limit is None or self.active_by_route[route] < limit)
+
+    def _start(self, route: str):
+        self.active += 1
+        self.active_by_route[route] += 1
+        self.admitted[route] += 1
+
+    def _retry_after(self, route: str) -> int:
+        """Seconds until the queue ahead of a new request has probably drained"""
+        waiting = sum(1 for entry in self._queue if entry[2] == route) + 1
+        slots = self.route_limits.get(route, self.max_active)
+        estimate = self._service_time[route] * waiting / slots
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(estimate)))
+
+    def _check_rate(self, route: str, client: str):
+        if self.client_rate <= 0 or route not in self.route_limits:
+            return
+        now = time.monotonic()
+        bucket = self._buckets.get(client) or [self.client_burst, now]
+        bucket[0] = min(self.client_burst, bucket[0] + (now - bucket[1]) * self.client_rate)
+        bucket[1] = now
+        self._buckets.put(client, bucket)
+        if bucket[0] < 1:
+            self.rejected[(route, "rate_limited")] += 1
+            raise Rejected(429, "Too many requests", math.ceil((1 - bucket[0]) / self.client_rate))
+        bucket[0] -= 1
+
+    async def admit(self, route: str, client: str):
+        """Wait until the request may start; raises Rejected"""
+        self._check_rate(route, client)
+        # Waiting requests are started as soon as they fit, so one that fits now jumps no one
+        if self._can_start(route):
+            self._start(route)
+            return
+
+        priority = self.priority(route)
+        if len(self._queue) >= self.queue_size:
+            # Make room by shedding the newest of the least urgent waiters, if less urgent than this one
+            last = max(self._queue, key=lambda entry: entry[:2])
+            if last[0] <= priority:
+                self.rejected[(route, "queue_full")] += 1
+                raise Rejected(503, "Server busy", self._retry_after(route))
+            self._queue.remove(last)
+            heapq.heapify(self._queue)
+            self.rejected[(last[2], "shed")] += 1
+            last[3].set_exception(Rejected(503, "Server busy", self._retry_after(last[2])))
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._arrivals), route, future]
+        heapq.heappush(self._queue, entry)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not future.done():
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self.rejected[(route, "timeout")] += 1
+                raise Rejected(503, "Server busy", self._retry_after(route))
+            future.result()  # Started, or shed, just as the wait ran out
+        except asyncio.CancelledError:
+            # The client went away while waiting; give back a slot granted meanwhile
+            if future.done() and future.exception() is None:
+                self.release(route, 0.0)
+            elif entry in self._queue:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+            raise
+        self.wait_seconds[route] += time.monotonic() - started
+
+    def release(self, route: str, elapsed: float):
+        """A request finished after `elapsed` seconds; start waiting requests that now fit"""
+        self.active -= 1
+        self.active_by_route[route] -= 1
+        if elapsed:
+            self._service_time[route] = 0.8 * self._service_time[route] + 0.2 * elapsed
+        for entry in sorted(self._queue):
+            if self._can_start(entry[2]):
+                self._queue.remove(entry)
+                self._start(entry[2])
+                entry[3].set_result(True)
+        heapq.heapify(self._queue)
+
+    def metrics(self) -> str:
+        """Counters and gauges in the Prometheus text format"""
+        names = {value: name for name, value in PRIORITIES.items()}
+        depth = Counter(names[entry[0]] for entry in self._queue)
+        lines = [
+            "# TYPE admission_queue_depth gauge",
+            *(f'admission_queue_depth{{priority="{name}"}} {depth[name]}' for name in PRIORITIES),
+            "# TYPE admission_active gauge",
+            *(f'admission_active{{route="{route}"}} {count}' for route, count in sorted(self.active_by_route.items())),
+            "# TYPE admission_admitted_total counter",
+            *(f'admission_admitted_total{{route="{route}"}} {count}' for route, count in sorted(self.admitted.items())),
+            "# TYPE admission_rejected_total counter",
+            *(
+                f'admission_rejected_total{{route="{route}",reason="{reason}"}} {count}'
+                for (route, reason), count in sorted(self.rejected.items())
+            ),
+            "# TYPE admission_wait_seconds_total counter",
+            *(f'admission_wait_seconds_total{{route="{route}"}} {seconds:.3f}' for route, seconds in sorted(self.wait_seconds.items())),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def route_template(scope: dict) -> Optional[str]:
+    """Path template of the route a request will be handled by"""
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return None
+
+
+def client_id(scope: dict, trust_forwarded: bool) -> str:
+    if trust_forwarded:
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware holding each request's slot until its response is fully sent"""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+        self.trust_forwarded = os.environ.get("ADMISSION_TRUST_FORWARDED", "") == "1"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.controller.enabled:
+            await self.app(scope, receive, send)
+            return
+        route = route_template(scope)
+        if route is None:
+            await self.app(scope, receive, send)  # 404s and 405s cost nothing
+            return
+
+        try:
+            await self.controller.admit(route, client_id(scope, self.trust_forwarded))
+        except Rejected as e:
+            body = json.dumps({"detail": e.reason}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": e.status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(e.retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route, time.monotonic() - started)
@@ -0,0 +1,104 @@
+"""
+Per-worker Caches
+Size-bounded LRU caches, sized through CACHE_SIZE_<NAME> environment variables
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+def cache_size(name: str, default: int) -> int:
+    """Configured size of a named cache (0 disables it)"""
+    return int(os.environ.get(f"CACHE_SIZE_{name.upper()}", default))
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache holding at most maxsize entries,
+    optionally expiring them ttl seconds after they were stored
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key in self._data:
+                stored_at, value = self._data[key]
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class CoalescingCache(LRUCache):
+    """LRU cache whose misses are computed once, however many callers ask at the same time"""
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        super().__init__(maxsize, ttl)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        usable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Cached value for key, or the result of compute().
+        A cached (or in-flight) value that usable() rejects is recomputed and replaced.
+        """
+        value = self.get(key)
+        if value is not None and (usable is None or usable(value)):
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            # Shielded so one caller disconnecting does not cancel the others
+            value = await asyncio.shield(task)
+            if usable is None or usable(value):
+                return value
+
+        task = asyncio.ensure_future(self._compute(key, compute))
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await compute()
+            self.put(key, value)
+            return value
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
@@ -0,0 +1,158 @@
+"""
+Event Classification
+Keyword-based category, country and region detection for historical events
+"""
+
+from typing import List, Optional
+
+
+def categorize_event(text: str) -> str:
+    """Categorize historical events based on keywords"""
+    text_lower = text.lower()
+    
+    # Battle/War keywords
+    if any(word in text_lower for word in ['war', 'battle', 'invasion', 'siege', 'military', 'army', 'troops', 'conflict', 'revolt', 'rebellion']):
+        return 'battle'
+    
+    # Political/Coronation keywords
+    if any(word in text_lower for word in ['king', 'queen', 'emperor', 'coronation', 'throne', 'crowned', 'dynasty', 'kingdom', 'empire', 'president', 'prime minister', 'elected']):
+        return 'political'
+    
+    # Discovery/Science keywords
+    if any(word in text_lower for word in ['discover', 'invent', 'scientist', 'astronomer', 'patent', 'theory', 'experiment', 'research', 'observatory']):
+        return 'discovery'
+    
+    # Religious keywords
+    if any(word in text_lower for word in ['temple', 'church', 'mosque', 'religious', 'pope', 'saint', 'monastery', 'pilgrimage', 'sacred']):
+        return 'religious'
+    
+    # Natural disasters
+    if any(word in text_lower for word in ['earthquake', 'flood', 'tsunami', 'volcano', 'hurricane', 'cyclone', 'disaster', 'famine']):
+        return 'disaster'
+    
+    # Cultural/Arts
+    if any(word in text_lower for word in ['art', 'music', 'literature', 'poet', 'writer', 'composer', 'theater', 'film', 'published']):
+        return 'cultural'
+    
+    return 'general'
+
+
+# Country and region detection
+COUNTRIES = {
+    # Asia
+    'India': ['india', 'indian', 'delhi', 'mumbai', 'calcutta', 'kolkata', 'chennai', 'madras', 'bengal', 'punjab', 'gujarat', 'rajasthan', 'maharashtra', 'tamil', 'kerala', 'mughal', 'maratha', 'vijayanagara', 'chola', 'maurya', 'gupta'],
+    'China': ['china', 'chinese', 'beijing', 'peking', 'shanghai', 'ming', 'qing', 'tang', 'song', 'han dynasty', 'tibet', 'manchuria'],
+    'Japan': ['japan', 'japanese', 'tokyo', 'kyoto', 'osaka', 'shogun', 'samurai', 'meiji', 'edo'],
+    'Korea': ['korea', 'korean', 'seoul', 'pyongyang', 'joseon'],
+    'Vietnam': ['vietnam', 'vietnamese', 'hanoi', 'saigon'],
+    'Thailand': ['thailand', 'thai', 'siam', 'bangkok'],
+    'Indonesia': ['indonesia', 'indonesian', 'java', 'sumatra', 'jakarta', 'batavia'],
+    'Philippines': ['philippines', 'filipino', 'manila'],
+    'Malaysia': ['malaysia', 'malaysian', 'malaya', 'kuala lumpur'],
+    'Singapore': ['singapore'],
+    'Myanmar': ['myanmar', 'burma', 'burmese', 'rangoon', 'yangon'],
+    'Pakistan': ['pakistan', 'pakistani', 'karachi', 'lahore', 'islamabad'],
+    'Bangladesh': ['bangladesh', 'bangladeshi', 'dhaka', 'east pakistan'],
+    'Sri Lanka': ['sri lanka', 'ceylon', 'sinhalese', 'colombo'],
+    'Nepal': ['nepal', 'nepalese', 'kathmandu'],
+    'Afghanistan': ['afghanistan', 'afghan', 'kabul', 'kandahar'],
+    
+    # Middle East
+    'Iran': ['iran', 'iranian', 'persia', 'persian', 'tehran', 'isfahan', 'safavid'],
+    'Iraq': ['iraq', 'iraqi', 'baghdad', 'babylon', 'mesopotamia', 'basra'],
+    'Saudi Arabia': ['saudi', 'arabia', 'arabian', 'mecca', 'medina', 'riyadh'],
+    'Turkey': ['turkey', 'turkish', 'ottoman', 'constantinople', 'istanbul', 'ankara', 'anatolia'],
+    'Israel': ['israel', 'israeli', 'jerusalem', 'tel aviv', 'judea', 'palestine', 'palestinian'],
+    'Egypt': ['egypt', 'egyptian', 'cairo', 'alexandria', 'pharaoh', 'nile'],
+    'Syria': ['syria', 'syrian', 'damascus', 'aleppo'],
+    'Lebanon': ['lebanon', 'lebanese', 'beirut'],
+    'Jordan': ['jordan', 'jordanian', 'amman'],
+    
+    # Europe
+    'United Kingdom': ['britain', 'british', 'england', 'english', 'scotland', 'scottish', 'wales', 'welsh', 'ireland', 'irish', 'london', 'edinburgh', 'uk', 'united kingdom'],
+    'France': ['france', 'french', 'paris', 'versailles', 'normandy', 'gaul', 'napoleon', 'bourbon'],
+    'Germany': ['germany', 'german', 'berlin', 'prussia', 'prussian', 'bavaria', 'saxon', 'holy roman'],
+    'Italy': ['italy', 'italian', 'rome', 'roman', 'venice', 'venetian', 'florence', 'milan', 'naples', 'papal', 'vatican'],
+    'Spain': ['spain', 'spanish', 'madrid', 'castile', 'aragon', 'habsburg', 'seville', 'barcelona'],
+    'Portugal': ['portugal', 'portuguese', 'lisbon'],
+    'Netherlands': ['netherlands', 'dutch', 'holland', 'amsterdam', 'rotterdam'],
+    'Belgium': ['belgium', 'belgian', 'brussels', 'flanders'],
+    'Austria': ['austria', 'austrian', 'vienna', 'habsburg'],
+    'Switzerland': ['switzerland', 'swiss', 'geneva', 'zurich'],
+    'Poland': ['poland', 'polish', 'warsaw', 'krakow'],
+    'Russia': ['russia', 'russian', 'moscow', 'st petersburg', 'soviet', 'ussr', 'czar', 'tsar', 'romanov'],
+    'Ukraine': ['ukraine', 'ukrainian', 'kiev', 'kyiv'],
+    'Greece': ['greece', 'greek', 'athens', 'sparta', 'byzantine', 'macedon'],
+    'Sweden': ['sweden', 'swedish', 'stockholm'],
+    'Norway': ['norway', 'norwegian', 'oslo', 'viking'],
+    'Denmark': ['denmark', 'danish', 'copenhagen'],
+    'Finland': ['finland', 'finnish', 'helsinki'],
+    'Hungary': ['hungary', 'hungarian', 'budapest', 'magyar'],
+    'Czech Republic': ['czech', 'bohemia', 'bohemian', 'prague'],
+    'Romania': ['romania', 'romanian', 'bucharest', 'wallachia'],
+    'Bulgaria': ['bulgaria', 'bulgarian', 'sofia'],
+    'Serbia': ['serbia', 'serbian', 'belgrade', 'yugoslavia'],
+    
+    # Americas
+    'United States': ['united states', 'america', 'american', 'usa', 'u.s.', 'washington', 'new york', 'california', 'texas', 'congress', 'president'],
+    'Canada': ['canada', 'canadian', 'toronto', 'montreal', 'ottawa', 'quebec'],
+    'Mexico': ['mexico', 'mexican', 'aztec', 'maya'],
+    'Brazil': ['brazil', 'brazilian', 'rio', 'sao paulo'],
+    'Argentina': ['argentina', 'argentine', 'buenos aires'],
+    'Peru': ['peru', 'peruvian', 'lima', 'inca'],
+    'Colombia': ['colombia', 'colombian', 'bogota'],
+    'Chile': ['chile', 'chilean', 'santiago'],
+    'Cuba': ['cuba', 'cuban', 'havana'],
+    
+    # Africa
+    'South Africa': ['south africa', 'south african', 'cape town', 'johannesburg', 'zulu', 'boer'],
+    'Nigeria': ['nigeria', 'nigerian', 'lagos'],
+    'Ethiopia': ['ethiopia', 'ethiopian', 'abyssinia', 'addis ababa'],
+    'Morocco': ['morocco', 'moroccan', 'marrakesh'],
+    'Algeria': ['algeria', 'algerian', 'algiers'],
+    'Tunisia': ['tunisia', 'tunisian', 'tunis', 'carthage'],
+    'Libya': ['libya', 'libyan', 'tripoli'],
+    'Sudan': ['sudan', 'sudanese', 'khartoum'],
+    'Kenya': ['kenya', 'kenyan', 'nairobi'],
+    
+    # Oceania
+    'Australia': ['australia', 'australian', 'sydney', 'melbourne'],
+    'New Zealand': ['new zealand', 'zealand', 'auckland', 'wellington', 'maori'],
+}
+
+REGIONS = {
+    'South Asia': ['India', 'Pakistan', 'Bangladesh', 'Sri Lanka', 'Nepal', 'Afghanistan'],
+    'East Asia': ['China', 'Japan', 'Korea'],
+    'Southeast Asia': ['Vietnam', 'Thailand', 'Indonesia', 'Philippines', 'Malaysia', 'Singapore', 'Myanmar'],
+    'Middle East': ['Iran', 'Iraq', 'Saudi Arabia', 'Turkey', 'Israel', 'Egypt', 'Syria', 'Lebanon', 'Jordan'],
+    'Western Europe': ['United Kingdom', 'France', 'Germany', 'Italy', 'Spain', 'Portugal', 'Netherlands', 'Belgium'],
+    'Eastern Europe': ['Russia', 'Ukraine', 'Poland', 'Hungary', 'Czech Republic', 'Romania', 'Bulgaria', 'Serbia'],
+    'Northern Europe': ['Sweden', 'Norway', 'Denmark', 'Finland'],
+    'North America': ['United States', 'Canada', 'Mexico'],
+    'South America': ['Brazil', 'Argentina', 'Peru', 'Colombia', 'Chile'],
+    'Africa': ['South Africa', 'Nigeria', 'Ethiopia', 'Morocco', 'Algeria', 'Tunisia', 'Libya', 'Sudan', 'Kenya', 'Egypt'],
+    'Oceania': ['Australia', 'New Zealand'],
+}
+
+
+def detect_countries(text: str) -> List[str]:
+    """Detect countries mentioned in event text"""
+    text_lower = text.lower()
+    detected = []
+    
+    for country, keywords in COUNTRIES.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                if country not in detected:
+                    detected.append(country)
+                break
+    
+    return detected
+
+
+def get_region(country: str) -> Optional[str]:
+    """Get region for a country"""
+    for region, countries in REGIONS.items():
+        if country in countries:
+            return region
+    return None
@@ -0,0 +1,343 @@
+"""
+Event Corpus
+Offline snapshot of Wikipedia's "on this day" events for every calendar day,
+used to build precomputed statistics and indexes.
+
+The snapshot is stored as one JSON record per line, sorted by id, next to a
+sorted id -> byte offset index. Both are memory-mapped read-only, so every
+worker process serves lookups from the same pages of the OS page cache.
+
+Each snapshot's files carry a generation in their names (corpus.<generation>.jsonl,
+...) and are published by replacing the meta file naming it, so a reader always
+opens files of one snapshot (see publish_files). The statistics cube and the
+similarity graph are published the same way.
+
+Build it with:
+    python corpus.py build [--path data/corpus.jsonl]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import re
+import uuid
+from datetime import date, datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+import httpx
+import numpy as np
+
+from classification import categorize_event, detect_countries, get_region
+from vedic_calc import get_planetary_signatures, signature_keys
+
+DEFAULT_CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'corpus.jsonl')
+
+# Overridable to point at a local stand-in server (see loadtest.py)
+ONTHISDAY_URL = os.environ.get(
+    "ONTHISDAY_URL",
+    "https://en.wikipedia.org/api/rest_v1/feed/onthisday/all/{month:02d}/{day:02d}",
+)
+WIKIPEDIA_HEADERS = {
+    "User-Agent": "ThisDayInHistory/1.0 (contact@example.com)"
+}
+
+# Only events from the last 1500 years (from ~525 CE) are used
+MIN_YEAR = 525
+
+
+async def fetch_onthisday(client: httpx.AsyncClient, month: int, day: int) -> dict:
+    """Fetch the raw Wikipedia "on this day" feed for a calendar day"""
+    url = ONTHISDAY_URL.format(month=month, day=day)
+    response = await client.get(url, headers=WIKIPEDIA_HEADERS, timeout=10.0)
+    response.raise_for_status()
+    return response.json()
+
+
+def event_id(month: int, day: int, year: int, text: str) -> str:
+    """Stable identifier for an event"""
+    digest = hashlib.sha1(f"{month}-{day}-{year}-{text}".encode()).hexdigest()[:10]
+    return f"{month:02d}{day:02d}-{year}-{digest}"
+
+
+def corpus_record(month: int, day: int, year: int, text: str, kind: str = "events") -> dict:
+    """Classify one event into a corpus record"""
+    countries = detect_countries(text)
+    return {
+        "id": event_id(month, day, year, text),
+        "month": month,
+        "day": day,
+        "year": year,
+        "kind": kind,
+        "text": text,
+        "category": categorize_event(text) if kind == "events" else kind[:-1],
+        "countries": countries,
+        "region": get_region(countries[0]) if countries else None,
+    }
+
+
+def corpus_records(month: int, day: int, data: dict) -> List[dict]:
+    """Flatten one day's feed into classified corpus records"""
+    records = []
+    for kind in ("events", "births", "deaths"):
+        for item in data.get(kind, []):
+            year = item.get("year", 0)
+            if year >= MIN_YEAR:
+                records.append(corpus_record(month, day, year, item.get("text", ""), kind))
+    return records
+
+
+def event_signature_keys(record: dict) -> Optional[List[str]]:
+    """Signature keys of an event's noon chart, or None if the date does not exist"""
+    try:
+        event_date = datetime(record["year"], record["month"], record["day"], 12, 0)
+    except ValueError:
+        return None  # e.g., Feb 29 in non-leap years
+    return sorted(set(signature_keys(get_planetary_signatures(event_date))))
+
+
+def calendar_days():
+    """Every (month, day) of the year, including February 29"""
+    current = date(2024, 1, 1)
+    while current.year == 2024:
+        yield current.month, current.day
+        current = date.fromordinal(current.toordinal() + 1)
+
+
+async def build_corpus(path: str, concurrency: int = 8) -> List[dict]:
+    """Fetch every calendar day from Wikipedia and write the corpus to path"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient() as client:
+        async def fetch_day(month: int, day: int) -> List[dict]:
+            async with semaphore:
+                return corpus_records(month, day, await fetch_onthisday(client, month, day))
+
+        days = await asyncio.gather(*(fetch_day(m, d) for m, d in calendar_days()))
+
+    records = [record for day_records in days for record in day_records]
+    save_corpus(records, path)
+    return records
+
+
+GENERATION = re.compile(r"[0-9a-f]{16}")
+# Times a reader retries a file set removed by a publish while it was opening it
+OPEN_ATTEMPTS = 3
+
+T = TypeVar("T")
+
+
+def new_generation() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def generation_path(path: str, generation: Optional[str]) -> str:
+    """Name of a file of one generation of a file set (sets from before generations use the plain name)"""
+    if generation is None:
+        return path
+    base, ext = os.path.splitext(path)
+    return f"{base}.{generation}{ext}"
+
+
+def write_meta(meta_path: str, meta: dict, generation: str, files: List[str]) -> Tuple[str, str]:
+    """
+    Write the meta file of a file set, naming its generation and files, under a
+    temporary name; returns the (temporary, final) pair for publish_files
+    """
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump({**meta, "generation": generation, "files": [os.path.basename(path) for path in files]}, f)
+    return meta_path + ".tmp", meta_path
+
+
+def read_meta(meta_path: str) -> dict:
+    """A file set's meta ({} if it has none)"""
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def load_generation(meta_path: str, load: Callable[[dict], T]) -> T:
+    """load(meta) for the file set's current meta, again if a publish removed its files meanwhile"""
+    for attempt in range(OPEN_ATTEMPTS):
+        try:
+            return load(read_meta(meta_path))
+        except FileNotFoundError:
+            if attempt == OPEN_ATTEMPTS - 1:
+                raise
+
+
+def remove_superseded(meta_path: str):
+    """Remove the files of every generation of a file set but the one its meta names"""
+    meta = read_meta(meta_path)
+    directory = os.path.dirname(meta_path) or "."
+    for name in meta.get("files", []):
+        base, ext = os.path.splitext(name)
+        for entry in os.listdir(directory):
+            generation = entry[len(base) + 1:len(entry) - len(ext)]
+            stale = entry == name or (
+                entry.startswith(base + ".") and entry.endswith(ext)
+                and GENERATION.fullmatch(generation) is not None and generation != meta["generation"]
+            )
+            if stale:
+                try:
+                    os.remove(os.path.join(directory, entry))
+                except FileNotFoundError:
+                    pass  # Removed by another publish
+
+
+def corpus_path(path: Optional[str] = None) -> str:
+    return path or os.environ.get("CORPUS_PATH", DEFAULT_CORPUS_PATH)
+
+
+def snapshot_meta_path(path: str) -> str:
+    """File holding the snapshot's version and generation; publishing a snapshot replaces it"""
+    return os.path.splitext(path)[0] + ".meta.json"
+
+
+def _index_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".index.npy"
+
+
+def _days_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".days.npy"
+
+
+# Records sorted by id, with their byte offset in the snapshot file
+INDEX_DTYPE = np.dtype([("id", "S24"), ("source", "S16"), ("offset", np.int64)])
+# Index positions sorted by calendar day (an edit may move an event away from the day in its id)
+DAYS_DTYPE = np.dtype([("day", np.int16), ("position", np.int32)])
+
+
+def _day_key(month: int, day: int) -> int:
+    return month * 32 + day
+
+
+def snapshot_exists(path: Optional[str] = None) -> bool:
+    path = corpus_path(path)
+    return os.path.exists(snapshot_meta_path(path)) or os.path.exists(path)
+
+
+def write_corpus(records: List[dict], path: Optional[str] = None, seq: int = 0,
+                 day_seqs: Optional[Dict[Tuple[int, int], int]] = None) -> List[Tuple[str, str]]:
+    """
+    Write the files of a new snapshot generation, recording the event log
+    sequence number the snapshot includes and, per (month, day), that of the
+    day's latest change (see event_store.py).
+    Returns (temporary, final) path pairs for publish_files.
+    """
+    path = corpus_path(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    records = sorted(records, key=lambda r: r["id"])
+    generation = new_generation()
+
+    index = np.zeros(len(records), dtype=INDEX_DTYPE)
+    with open(generation_path(path, generation), "wb") as f:
+        for i, record in enumerate(records):
+            index[i] = (record["id"].encode(), record.get("source", "wikipedia").encode(), f.tell())
+            f.write(json.dumps(record).encode() + b"\n")
+    days = np.zeros(len(records), dtype=DAYS_DTYPE)
+    days["day"] = [_day_key(r["month"], r["day"]) for r in records]
+    days["position"] = np.arange(len(records))
+    days.sort(order=["day", "position"])
+
+    for target, array in ((_index_path(path), index), (_days_path(path), days)):
+        with open(generation_path(target, generation), "wb") as f:
+            np.save(f, array)
+
+    files = [path, _index_path(path), _days_path(path)]
+    meta = {"seq": seq, "day_seqs": {f"{month}-{day}": s for (month, day), s in (day_seqs or {}).items()}}
+    return [write_meta(snapshot_meta_path(path), meta, generation, files)]
+
+
+def publish_files(pairs: List[Tuple[str, str]]):
+    """
+    Move written files into place. Each move is atomic, but not a set of them,
+    so file sets are written under a new generation's names and only their meta
+    files are moved: readers opening a set see the old generation or the new
+    one, never a mix. Superseded generations are then removed; open mappings
+    keep their files.
+    """
+    for temporary, target in pairs:
+        os.replace(temporary, target)
+    for _, target in pairs:
+        remove_superseded(target)
+
+
+def save_corpus(records: List[dict], path: Optional[str] = None, seq: int = 0):
+    """Write the corpus snapshot atomically"""
+    publish_files(write_corpus(records, path, seq))
+
+
+def load_corpus(path: Optional[str] = None) -> List[dict]:
+    """Load the whole corpus snapshot (for offline tools)"""
+    return list(CorpusReader(path))
+
+
+def snapshot_seq(path: Optional[str] = None) -> int:
+    """Event log sequence number included in the corpus snapshot"""
+    return read_meta(snapshot_meta_path(corpus_path(path))).get("seq", 0)
+
+
+class CorpusReader:
+    """Read-only, memory-mapped view of a corpus snapshot"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = corpus_path(path)
+        load_generation(snapshot_meta_path(self.path), self._open)
+
+    def _open(self, meta: dict):
+        generation = meta.get("generation")
+        self.seq = meta.get("seq", 0)
+        self.day_seqs = {tuple(map(int, key.split("-"))): s for key, s in meta.get("day_seqs", {}).items()}
+        self.index = np.load(generation_path(_index_path(self.path), generation), mmap_mode="r")
+        self.days = np.load(generation_path(_days_path(self.path), generation), mmap_mode="r")
+        with open(generation_path(self.path, generation), "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[dict]:
+        for position in range(len(self.index)):
+            yield self._record(position)
+
+    def _record(self, position: int) -> dict:
+        start = int(self.index["offset"][position])
+        return json.loads(self._data[start:self._data.find(b"\n", start)])
+
+    def get(self, event_id: str) -> Optional[dict]:
+        key = event_id.encode()
+        position = int(np.searchsorted(self.index["id"], key))
+        if position < len(self.index) and self.index["id"][position] == key:
+            return self._record(position)
+        return None
+
+    def day(self, month: int, day: int, source: Optional[str] = None) -> List[dict]:
+        """Records of one calendar day, optionally only those from one source"""
+        key = _day_key(month, day)
+        first, last = np.searchsorted(self.days["day"], [key, key + 1])
+        positions = self.days["position"][first:last]
+        if source is not None:
+            positions = positions[self.index["source"][positions] == source.encode()]
+        return [self._record(position) for position in positions]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Event corpus tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Fetch every calendar day from Wikipedia")
+    build.add_argument("--path", default=os.environ.get("CORPUS_PATH", DEFAULT_CORPUS_PATH))
+    build.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        records = asyncio.run(build_corpus(args.path, args.concurrency))
+        print(f"Wrote {len(records)} events to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Vimshottari Dasha
+Mahadasha, antardasha and pratyantardasha timelines from the Moon's nakshatra
+at a birth moment, with binary-search lookup of the periods active at any date
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+from cache import LRUCache, cache_size
+from ephemeris import get_ephemeris
+from timescale import datetime_to_jd, jd_to_iso
+from vedic_calc import calculate_sidereal_longitude, get_nakshatra, DEFAULT_AYANAMSHA, NAKSHATRA_SPAN
+
+# Dasha lords in sequence with the length of their mahadasha in years (120 in all)
+DASHA_YEARS = {
+    'Ketu': 7,
+    'Venus': 20,
+    'Sun': 6,
+    'Moon': 10,
+    'Mars': 7,
+    'Rahu': 18,
+    'Jupiter': 16,
+    'Saturn': 19,
+    'Mercury': 17,
+}
+DASHA_LORDS = list(DASHA_YEARS)
+TOTAL_YEARS = sum(DASHA_YEARS.values())
+YEAR_DAYS = 365.25
+
+LEVELS = ('mahadasha', 'antardasha', 'pratyantardasha')
+
+
+def _subperiods(first_lord: int) -> List[int]:
+    """The nine lords of a period's subperiods, starting with the period's own lord"""
+    return [(first_lord + i) % len(DASHA_LORDS) for i in range(len(DASHA_LORDS))]
+
+
+class DashaTimeline:
+    """
+    Every pratyantardasha of the 120-year cycle that starts with the birth
+    nakshatra's lord, as sorted boundary Julian Days and the lords of each level.
+    The cycle starts before birth, by the part of the first mahadasha the Moon
+    had already traversed in its nakshatra.
+    """
+
+    def __init__(self, birth_jd: float, moon_longitude: float):
+        self.birth_jd = birth_jd
+        self.nakshatra = get_nakshatra(moon_longitude)
+        first = DASHA_LORDS.index(self.nakshatra['ruler'])
+        elapsed = (moon_longitude % NAKSHATRA_SPAN) / NAKSHATRA_SPAN
+        self.start_jd = birth_jd - elapsed * DASHA_YEARS[DASHA_LORDS[first]] * YEAR_DAYS
+
+        lords = []
+        lengths = []
+        for maha in _subperiods(first):
+            for antar in _subperiods(maha):
+                for pratyantar in _subperiods(antar):
+                    lords.append((maha, antar, pratyantar))
+                    lengths.append(
+                        DASHA_YEARS[DASHA_LORDS[maha]] * DASHA_YEARS[DASHA_LORDS[antar]]
+                        * DASHA_YEARS[DASHA_LORDS[pratyantar]] / TOTAL_YEARS ** 2 * YEAR_DAYS
+                    )
+        # starts[i] is where period i begins; starts[-1] is where the cycle ends
+        self.starts = self.start_jd + np.concatenate(([0.0], np.cumsum(lengths)))
+        self.lords = np.array(lords, dtype=np.int8)
+
+    @property
+    def end_jd(self) -> float:
+        return float(self.starts[-1])
+
+    def period_indices(self, jds: np.ndarray) -> np.ndarray:
+        """Index of the pratyantardasha active at each Julian Day, -1 before birth or after the cycle"""
+        jds = np.asarray(jds, dtype=np.float64)
+        indices = np.searchsorted(self.starts, jds, side='right') - 1
+        outside = (jds < self.birth_jd) | (indices >= len(self.lords))
+        return np.where(outside, -1, indices)
+
+    def _bounds(self, index: int, level: int) -> tuple:
+        """First and last+1 pratyantardasha index of the level's period containing index"""
+        size = len(DASHA_LORDS) ** (len(LEVELS) - 1 - level)
+        first = index - index % size
+        return first, first + size
+
+    def describe(self, index: int) -> Optional[dict]:
+        """The mahadasha, antardasha and pratyantardasha containing pratyantardasha `index`"""
+        if index < 0:
+            return None
+        periods = {}
+        for level, name in enumerate(LEVELS):
+            first, last = self._bounds(index, level)
+            periods[name] = {
+                'lord': DASHA_LORDS[self.lords[index][level]],
+                'start': jd_to_iso(max(self.starts[first], self.birth_jd), date_only=True),
+                'end': jd_to_iso(self.starts[last], date_only=True),
+            }
+        return periods
+
+    def active(self, jd: float) -> Optional[dict]:
+        """The periods active at a Julian Day (UT), or None outside the life of the timeline"""
+        return self.describe(int(self.period_indices([jd])[0]))
+
+    def periods(self, depth: int = 2) -> List[dict]:
+        """
+        The timeline from birth to the end of the cycle, as nested periods down to
+        `depth` levels (1 = mahadashas only, 3 = down to pratyantardashas)
+        """
+        def build(first: int, last: int, level: int) -> List[dict]:
+            size = (last - first) // len(DASHA_LORDS)
+            result = []
+            for start in range(first, last, size):
+                if self.starts[start + size] <= self.birth_jd:
+                    continue
+                period = {
+                    'lord': DASHA_LORDS[self.lords[start][level]],
+                    'start': jd_to_iso(max(self.starts[start], self.birth_jd), date_only=True),
+                    'end': jd_to_iso(self.starts[start + size], date_only=True),
+                }
+                if level + 1 < depth:
+                    period[LEVELS[level + 1]] = build(start, start + size, level + 1)
+                result.append(period)
+            return result
+
+        return build(0, len(self.lords), 0)
+
+
+# Timelines depend only on the birth moment, the ayanamsha and the ephemeris, and many events
+# are compared against the same few reference charts
+_timeline_cache = LRUCache(cache_size('dashas', 512))
+
+
+def get_dasha_timeline(birth: datetime, ayanamsha: str = DEFAULT_AYANAMSHA) -> DashaTimeline:
+    """Vimshottari timeline for a birth moment (UT), from the Moon's nakshatra under an ayanamsha system"""
+    cache_key = (birth, ayanamsha, get_ephemeris().name)
+    timeline = _timeline_cache.get(cache_key)
+    if timeline is None:
+        jd = datetime_to_jd(birth)
+        timeline = DashaTimeline(jd, calculate_sidereal_longitude('Moon', birth, jd, ayanamsha))
+        _timeline_cache.put(cache_key, timeline)
+    return timeline
@@ -0,0 +1,109 @@
+"""
+Day Index
+Prebuilt indexes over one day's processed events, births and deaths, so that
+filtered browsing costs O(results) rather than one pass per filter over every event
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from classification import REGIONS
+
+# Country -> every region listing it
+COUNTRY_REGIONS: Dict[str, List[str]] = defaultdict(list)
+for _region, _countries in REGIONS.items():
+    for _country in _countries:
+        COUNTRY_REGIONS[_country].append(_region)
+
+
+class Postings:
+    """Ascending positions of the items carrying a value, as a list and a set"""
+
+    def __init__(self):
+        self.positions: List[int] = []
+        self.members: Set[int] = set()
+
+    def add(self, position: int):
+        if position not in self.members:
+            self.positions.append(position)
+            self.members.add(position)
+
+
+EMPTY = Postings()
+
+
+class ListIndex:
+    """Year, category, country and region indexes over items sorted newest first"""
+
+    def __init__(self, items: List[dict]):
+        self.items = items
+        # Years in ascending order (the items reversed), for bisect range queries
+        self.years = [item["year"] for item in reversed(items)]
+        self.by_category: Dict[str, Postings] = defaultdict(Postings)
+        self.by_country: Dict[str, Postings] = defaultdict(Postings)
+        self.by_region: Dict[str, Postings] = defaultdict(Postings)
+
+        for position, item in enumerate(items):
+            self.by_category[item["category"]].add(position)
+            for country in item.get("countries", []):
+                self.by_country[country].add(position)
+                for region in COUNTRY_REGIONS.get(country, []):
+                    self.by_region[region].add(position)
+
+    def year_range(self, year_from: Optional[int], year_to: Optional[int]) -> range:
+        """Positions of the items within the year bounds"""
+        count = len(self.items)
+        lowest = bisect_left(self.years, year_from) if year_from else 0
+        highest = bisect_right(self.years, year_to) if year_to else count
+        return range(count - highest, count - lowest)
+
+    def select(self, positions: range, postings: List[Postings]) -> List[dict]:
+        """Items within a position range that appear in every posting list, in order"""
+        if not postings:
+            return self.items[positions.start:positions.stop]
+
+        postings = sorted(postings, key=lambda p: len(p.positions))
+        shortest = postings[0].positions
+        others = [p.members for p in postings[1:]]
+        first = bisect_left(shortest, positions.start)
+        last = bisect_left(shortest, positions.stop)
+        return [
+            self.items[position]
+            for position in shortest[first:last]
+            if all(position in members for members in others)
+        ]
+
+
+class DayIndex:
+    """A processed day payload (see main.fetch_wikipedia_events) with indexes per list"""
+
+    LISTS = ("events", "births", "deaths")
+
+    def __init__(self, payload: dict):
+        self.payload = payload
+        self.lists = {name: ListIndex(payload[name]) for name in self.LISTS}
+
+    def filter(
+        self,
+        category: Optional[str] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        country: Optional[str] = None,
+        region: Optional[str] = None,
+    ) -> dict:
+        """
+        The payload with every list filtered; the category applies to events only.
+        The payload itself is shared and never modified.
+        """
+        result = dict(self.payload)
+        for name, index in self.lists.items():
+            postings = []
+            if category and name == "events":
+                postings.append(index.by_category.get(category, EMPTY))
+            if country:
+                postings.append(index.by_country.get(country, EMPTY))
+            if region:
+                postings.append(index.by_region.get(region, EMPTY))
+            result[name] = index.select(index.year_range(year_from, year_to), postings)
+        return result
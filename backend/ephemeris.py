@@ -0,0 +1,429 @@
+"""
+Ephemeris Backends
+Tropical longitudes of the grahas from interchangeable models
+
+- "fast":    mean motion with a single perturbation term (the original model)
+- "precise": analytic theory (Keplerian elements with secular rates for the planets,
+             the main periodic terms of the lunar theory, the solar equation of center
+             and the mean lunar node), pre-fitted into piecewise Chebyshev segments
+             stored on disk so each lookup is a short polynomial evaluation.
+
+Build the precise tables with:
+    python ephemeris.py build [--start-year 500] [--end-year 2300]
+"""
+
+import argparse
+import json
+import math
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+J2000 = 2451545.0
+
+# Planets with mean orbital elements at J2000 epoch (fast model)
+PLANETS = {
+    'Sun': {'period': 365.25636, 'longitude0': 280.46646, 'daily_motion': 0.9856474},
+    'Moon': {'period': 27.321582, 'longitude0': 218.3165, 'daily_motion': 13.176358},
+    'Mercury': {'period': 87.969, 'longitude0': 252.2511, 'daily_motion': 4.0923344},
+    'Venus': {'period': 224.701, 'longitude0': 181.9798, 'daily_motion': 1.6021302},
+    'Mars': {'period': 686.98, 'longitude0': 355.4330, 'daily_motion': 0.5240208},
+    'Jupiter': {'period': 4332.59, 'longitude0': 34.3515, 'daily_motion': 0.0830853},
+    'Saturn': {'period': 10759.22, 'longitude0': 49.9429, 'daily_motion': 0.0334442},
+    'Rahu': {'period': 6793.5, 'longitude0': 125.0, 'daily_motion': -0.0529539},
+    'Ketu': {'period': 6793.5, 'longitude0': 305.0, 'daily_motion': -0.0529539},
+}
+
+PLANET_NAMES = list(PLANETS)
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ephemeris')
+
+# Keplerian elements and rates per Julian century, J2000 ecliptic and equinox
+# (Standish, "Keplerian Elements for Approximate Positions of the Major Planets",
+# table valid 3000 BC - 3000 AD)
+# a (AU), e, I (deg), L (deg), longitude of perihelion (deg), longitude of node (deg)
+KEPLER_ELEMENTS = {
+    'Mercury': ((0.38709843, 0.0), (0.20563661, 0.00002123), (7.00559432, -0.00590158),
+                (252.25166724, 149472.67486623), (77.45771895, 0.15940013), (48.33961819, -0.12214182)),
+    'Venus': ((0.72332102, -0.00000026), (0.00676399, -0.00005107), (3.39777545, 0.00043494),
+              (181.97970850, 58517.81560260), (131.76755713, 0.05679648), (76.67261496, -0.27274174)),
+    'EMBary': ((1.00000018, -0.00000003), (0.01673163, -0.00003661), (-0.00054346, -0.01337178),
+               (100.46691572, 35999.37306329), (102.93005885, 0.31795260), (-5.11260389, -0.24123856)),
+    'Mars': ((1.52371243, 0.00000097), (0.09336511, 0.00009149), (1.85181869, -0.00724757),
+             (-4.56813164, 19140.29934243), (-23.91744784, 0.45223625), (49.71320984, -0.26852431)),
+    'Jupiter': ((5.20248019, -0.00002864), (0.04853590, 0.00018026), (1.29861416, -0.00322699),
+                (34.33479152, 3034.90371757), (14.27495244, 0.18199196), (100.29282654, 0.13024619)),
+    'Saturn': ((9.54149883, -0.00003065), (0.05550825, -0.00032044), (2.49424102, 0.00451969),
+               (50.07571329, 1222.11494724), (92.86136063, 0.54179478), (113.63998702, -0.25015002)),
+}
+
+# Additional mean anomaly terms b, c, s, f for the outer planets
+KEPLER_EXTRA_TERMS = {
+    'Jupiter': (-0.00012452, 0.06064060, -0.35635438, 38.35125000),
+    'Saturn': (0.00025899, -0.13434469, 0.87320147, 38.35125000),
+}
+
+# Periodic terms of the Moon's longitude: multiples of D, M, M', F and
+# the coefficient in millionths of a degree (Meeus, Astronomical Algorithms, ch. 47)
+MOON_LONGITUDE_TERMS = [
+    (0, 0, 1, 0, 6288774), (2, 0, -1, 0, 1274027), (2, 0, 0, 0, 658314),
+    (0, 0, 2, 0, 213618), (0, 1, 0, 0, -185116), (0, 0, 0, 2, -114332),
+    (2, 0, -2, 0, 58793), (2, -1, -1, 0, 57066), (2, 0, 1, 0, 53322),
+    (2, -1, 0, 0, 45758), (0, 1, -1, 0, -40923), (1, 0, 0, 0, -34720),
+    (0, 1, 1, 0, -30383), (2, 0, 0, -2, 15327), (0, 0, 1, 2, -12528),
+    (0, 0, 1, -2, 10980), (4, 0, -1, 0, 10675), (0, 0, 3, 0, 10034),
+    (4, 0, -2, 0, 8548), (2, 1, -1, 0, -7888), (2, 1, 0, 0, -6766),
+    (1, 0, -1, 0, -5163), (1, 1, 0, 0, 4987), (2, -1, 1, 0, 4036),
+    (2, 0, 2, 0, 3994), (4, 0, 0, 0, 3861), (2, 0, -3, 0, 3665),
+    (0, 1, -2, 0, -2689), (2, 0, -1, 2, -2602), (2, -1, -2, 0, 2390),
+    (1, 0, 1, 0, -2348), (2, -2, 0, 0, 2236), (0, 1, 2, 0, -2120),
+    (0, 2, 0, 0, -2069), (2, -2, -1, 0, 2048), (2, 0, 1, -2, -1773),
+    (2, 0, 0, 2, -1595), (4, -1, -1, 0, 1215), (0, 0, 2, 2, -1110),
+    (3, 0, -1, 0, -892), (2, 1, 1, 0, -810), (4, -1, -2, 0, 759),
+    (0, 2, -1, 0, -713), (2, 2, -1, 0, -700), (2, 1, -2, 0, 691),
+    (2, -1, 0, -2, 596), (4, 0, 1, 0, 549), (0, 0, 4, 0, 537),
+    (4, -1, 0, 0, 520), (1, 0, -2, 0, -487), (2, 1, 0, -2, -399),
+    (0, 0, 2, -2, -381), (1, 1, 1, 0, 351), (3, 0, -2, 0, -340),
+    (4, 0, -3, 0, 330), (2, -1, 2, 0, 327), (0, 2, 1, 0, -323),
+    (1, 1, -1, 0, 299), (2, 0, 3, 0, 294),
+]
+
+# Chebyshev segment length (days) and polynomial degree per graha
+SEGMENTS = {
+    'Sun': (64, 8),
+    'Moon': (16, 13),
+    'Mercury': (32, 12),
+    'Venus': (32, 10),
+    'Mars': (64, 10),
+    'Jupiter': (128, 8),
+    'Saturn': (128, 8),
+    'Rahu': (256, 4),
+    'Ketu': (256, 4),
+}
+
+
+def normalize_angle(angle: float) -> float:
+    """Normalize angle to 0-360 degrees"""
+    angle = angle % 360
+    return angle if angle >= 0 else angle + 360
+
+
+def year_to_jd(year: int) -> float:
+    """Julian Day at 0h on January 1st of a (proleptic Gregorian) year"""
+    return datetime(year, 1, 1).toordinal() + 1721424.5
+
+
+class FastEphemeris:
+    """Mean motion model with a simple perturbation for Mercury and Venus"""
+
+    name = 'fast'
+
+    def tropical_longitude(self, planet: str, jd: float) -> float:
+        """Tropical longitude of one planet at one Julian Day"""
+        days_from_j2000 = jd - J2000
+        data = PLANETS[planet]
+
+        longitude = data['longitude0'] + data['daily_motion'] * days_from_j2000
+
+        # Simple perturbation for inner planets
+        if planet in ('Mercury', 'Venus'):
+            anomaly = (days_from_j2000 * 360 / data['period']) % 360
+            longitude += 5 * math.sin(math.radians(anomaly))
+
+        return normalize_angle(longitude)
+
+    def tropical_longitudes(self, jds: np.ndarray) -> np.ndarray:
+        """Tropical longitudes, shape (len(jds), len(PLANET_NAMES))"""
+        days_from_j2000 = np.asarray(jds, dtype=np.float64) - J2000
+        longitudes = np.empty((len(days_from_j2000), len(PLANET_NAMES)), dtype=np.float64)
+
+        for index, planet in enumerate(PLANET_NAMES):
+            data = PLANETS[planet]
+            longitude = data['longitude0'] + data['daily_motion'] * days_from_j2000
+            if planet in ('Mercury', 'Venus'):
+                anomaly = (days_from_j2000 * 360 / data['period']) % 360
+                longitude = longitude + 5 * np.sin(np.radians(anomaly))
+            longitudes[:, index] = np.mod(longitude, 360)
+
+        return longitudes
+
+
+class AnalyticEphemeris:
+    """
+    Direct evaluation of the analytic theory.
+    Sun and Moon agree with the full theories to about 0.01 degree, the planets to
+    within a few tenths of a degree over 3000 BC - 3000 AD. Too slow to evaluate
+    per query; PreciseEphemeris serves it from fitted tables instead.
+    """
+
+    name = 'analytic'
+
+    def tropical_longitude(self, planet: str, jd: float) -> float:
+        """Tropical longitude of one planet at one Julian Day"""
+        return float(self.tropical_longitudes(np.array([jd]))[0, PLANET_NAMES.index(planet)])
+
+    def tropical_longitudes(self, jds: np.ndarray) -> np.ndarray:
+        """Tropical longitudes, shape (len(jds), len(PLANET_NAMES))"""
+        t = (np.asarray(jds, dtype=np.float64) - J2000) / 36525
+        node = self._mean_node(t)
+        nutation = -0.00478 * np.sin(np.radians(node))
+
+        earth = self._heliocentric('EMBary', t)
+        precession = (5029.0966 * t + 1.11113 * t * t) / 3600
+
+        columns = {
+            'Sun': self._sun(t, node),
+            'Moon': self._moon(t) + nutation,
+            'Rahu': node,
+            'Ketu': node + 180,
+        }
+        for planet in ('Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn'):
+            x, y, _ = self._heliocentric(planet, t)
+            geocentric = np.degrees(np.arctan2(y - earth[1], x - earth[0]))
+            columns[planet] = geocentric + precession + nutation
+
+        return np.mod(np.column_stack([columns[p] for p in PLANET_NAMES]), 360)
+
+    @staticmethod
+    def _mean_node(t: np.ndarray) -> np.ndarray:
+        return (125.0445479 - 1934.1362891 * t + 0.0020754 * t ** 2
+                + t ** 3 / 467441 - t ** 4 / 60616000)
+
+    @staticmethod
+    def _sun(t: np.ndarray, node: np.ndarray) -> np.ndarray:
+        """Apparent longitude of the Sun (equation of center, aberration, nutation)"""
+        mean_longitude = 280.46646 + 36000.76983 * t + 0.0003032 * t ** 2
+        anomaly = np.radians(357.52911 + 35999.05029 * t - 0.0001537 * t ** 2)
+        center = ((1.914602 - 0.004817 * t - 0.000014 * t ** 2) * np.sin(anomaly)
+                  + (0.019993 - 0.000101 * t) * np.sin(2 * anomaly)
+                  + 0.000289 * np.sin(3 * anomaly))
+        return mean_longitude + center - 0.00569 - 0.00478 * np.sin(np.radians(node))
+
+    @staticmethod
+    def _moon(t: np.ndarray) -> np.ndarray:
+        """Geometric longitude of the Moon from the main periodic terms"""
+        mean_longitude = (218.3164477 + 481267.88123421 * t - 0.0015786 * t ** 2
+                          + t ** 3 / 538841 - t ** 4 / 65194000)
+        elongation = np.radians(297.8501921 + 445267.1114034 * t - 0.0018819 * t ** 2
+                                + t ** 3 / 545868 - t ** 4 / 113065000)
+        sun_anomaly = np.radians(357.5291092 + 35999.0502909 * t - 0.0001536 * t ** 2
+                                 + t ** 3 / 24490000)
+        moon_anomaly = np.radians(134.9633964 + 477198.8675055 * t + 0.0087414 * t ** 2
+                                  + t ** 3 / 69699 - t ** 4 / 14712000)
+        latitude_argument = np.radians(93.2720950 + 483202.0175233 * t - 0.0036539 * t ** 2
+                                       - t ** 3 / 3526000 + t ** 4 / 863310000)
+        eccentricity = 1 - 0.002516 * t - 0.0000074 * t ** 2
+
+        total = np.zeros_like(t)
+        for d, m, mp, f, coefficient in MOON_LONGITUDE_TERMS:
+            term = coefficient * np.sin(d * elongation + m * sun_anomaly
+                                        + mp * moon_anomaly + f * latitude_argument)
+            if m:
+                term = term * eccentricity ** abs(m)
+            total += term
+
+        a1 = np.radians(119.75 + 131.849 * t)
+        a2 = np.radians(53.09 + 479264.290 * t)
+        total += (3958 * np.sin(a1)
+                  + 1962 * np.sin(np.radians(mean_longitude) - latitude_argument)
+                  + 318 * np.sin(a2))
+
+        return mean_longitude + total / 1e6
+
+    @staticmethod
+    def _heliocentric(body: str, t: np.ndarray):
+        """Heliocentric ecliptic coordinates (J2000) from Keplerian elements"""
+        (a0, a1), (e0, e1), (i0, i1), (l0, l1), (w0, w1), (n0, n1) = KEPLER_ELEMENTS[body]
+        a = a0 + a1 * t
+        e = e0 + e1 * t
+        inclination = np.radians(i0 + i1 * t)
+        mean_longitude = l0 + l1 * t
+        perihelion = w0 + w1 * t
+        node = np.radians(n0 + n1 * t)
+
+        mean_anomaly = mean_longitude - perihelion
+        if body in KEPLER_EXTRA_TERMS:
+            b, c, s, f = KEPLER_EXTRA_TERMS[body]
+            ft = np.radians(f * t)
+            mean_anomaly = mean_anomaly + b * t ** 2 + c * np.cos(ft) + s * np.sin(ft)
+        mean_anomaly = np.radians(np.mod(mean_anomaly + 180, 360) - 180)
+        argument = np.radians(perihelion) - node
+
+        eccentric = mean_anomaly + e * np.sin(mean_anomaly)
+        for _ in range(5):
+            eccentric -= (eccentric - e * np.sin(eccentric) - mean_anomaly) / (1 - e * np.cos(eccentric))
+
+        xp = a * (np.cos(eccentric) - e)
+        yp = a * np.sqrt(1 - e * e) * np.sin(eccentric)
+
+        cw, sw = np.cos(argument), np.sin(argument)
+        cn, sn = np.cos(node), np.sin(node)
+        ci, si = np.cos(inclination), np.sin(inclination)
+
+        x = (cw * cn - sw * sn * ci) * xp + (-sw * cn - cw * sn * ci) * yp
+        y = (cw * sn + sw * cn * ci) * xp + (-sw * sn + cw * cn * ci) * yp
+        z = (sw * si) * xp + (cw * si) * yp
+        return x, y, z
+
+
+class PreciseEphemeris:
+    """
+    Analytic theory served from piecewise Chebyshev segments.
+    Dates outside the fitted range (or when no tables are built) fall back to
+    direct evaluation of the theory.
+    """
+
+    name = 'precise'
+
+    def __init__(self, data_dir: Optional[str] = None):
+        self.data_dir = data_dir or os.environ.get('EPHEMERIS_DATA_DIR', DEFAULT_DATA_DIR)
+        self.analytic = AnalyticEphemeris()
+        self.tables: Optional[Dict[str, np.ndarray]] = None
+        self.start_jd = 0.0
+        self.end_jd = 0.0
+        self._loaded = False
+
+    def _load(self):
+        self._loaded = True
+        manifest_path = os.path.join(self.data_dir, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            return
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        self.start_jd = manifest['start_jd']
+        self.end_jd = manifest['end_jd']
+        # Memory-mapped read-only: every worker process shares the same pages
+        self.tables = {
+            planet: np.load(os.path.join(self.data_dir, f"{planet}.npy"), mmap_mode='r')
+            for planet in PLANET_NAMES
+        }
+
+    def tropical_longitude(self, planet: str, jd: float) -> float:
+        """Tropical longitude of one planet at one Julian Day"""
+        if not self._loaded:
+            self._load()
+        if self.tables is None or not (self.start_jd <= jd < self.end_jd):
+            return self.analytic.tropical_longitude(planet, jd)
+
+        segment_days, _ = SEGMENTS[planet]
+        offset = jd - self.start_jd
+        segment = int(offset // segment_days)
+        x = 2 * (offset - segment * segment_days) / segment_days - 1
+        coefficients = self.tables[planet][segment].tolist()
+
+        # Clenshaw recurrence
+        b1 = b2 = 0.0
+        for c in reversed(coefficients[1:]):
+            b1, b2 = 2 * x * b1 - b2 + c, b1
+        return normalize_angle(x * b1 - b2 + coefficients[0])
+
+    def tropical_longitudes(self, jds: np.ndarray) -> np.ndarray:
+        """Tropical longitudes, shape (len(jds), len(PLANET_NAMES))"""
+        if not self._loaded:
+            self._load()
+        jds = np.asarray(jds, dtype=np.float64)
+        if self.tables is None:
+            return self.analytic.tropical_longitudes(jds)
+
+        inside = (jds >= self.start_jd) & (jds < self.end_jd)
+        longitudes = np.empty((len(jds), len(PLANET_NAMES)), dtype=np.float64)
+        if not inside.all():
+            longitudes[~inside] = self.analytic.tropical_longitudes(jds[~inside])
+
+        offsets = jds[inside] - self.start_jd
+        for index, planet in enumerate(PLANET_NAMES):
+            segment_days, _ = SEGMENTS[planet]
+            segments = (offsets // segment_days).astype(np.int64)
+            x = 2 * (offsets - segments * segment_days) / segment_days - 1
+            longitudes[inside, index] = np.mod(
+                chebyshev_evaluate(self.tables[planet][segments], x), 360
+            )
+
+        return longitudes
+
+
+def chebyshev_evaluate(coefficients: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Evaluate one Chebyshev series per row of `coefficients` at the matching x"""
+    b1 = np.zeros_like(x)
+    b2 = np.zeros_like(x)
+    for j in range(coefficients.shape[1] - 1, 0, -1):
+        b1, b2 = 2 * x * b1 - b2 + coefficients[:, j], b1
+    return x * b1 - b2 + coefficients[:, 0]
+
+
+def build_tables(data_dir: str, start_year: int = 500, end_year: int = 2300) -> dict:
+    """Fit the analytic theory into Chebyshev segments and write them to data_dir"""
+    analytic = AnalyticEphemeris()
+    start_jd = year_to_jd(start_year)
+    end_jd = year_to_jd(end_year)
+    os.makedirs(data_dir, exist_ok=True)
+
+    for index, planet in enumerate(PLANET_NAMES):
+        segment_days, degree = SEGMENTS[planet]
+        count = math.ceil((end_jd - start_jd) / segment_days)
+
+        # Chebyshev nodes on [-1, 1] and the matrix mapping node values to coefficients
+        nodes = np.cos(np.pi * (np.arange(degree + 1) + 0.5) / (degree + 1))
+        fit = np.linalg.inv(np.polynomial.chebyshev.chebvander(nodes, degree))
+
+        segment_starts = start_jd + segment_days * np.arange(count)
+        sample_jds = segment_starts[:, None] + (nodes[None, :] + 1) * segment_days / 2
+        values = analytic.tropical_longitudes(sample_jds.ravel())[:, index].reshape(count, degree + 1)
+        values = np.unwrap(values, period=360, axis=1)
+
+        np.save(os.path.join(data_dir, f"{planet}.npy"), values @ fit.T)
+
+    manifest = {
+        'model': 'analytic-v1',
+        'start_jd': start_jd,
+        'end_jd': end_jd,
+        'segments': {p: {'days': SEGMENTS[p][0], 'degree': SEGMENTS[p][1]} for p in PLANET_NAMES},
+    }
+    with open(os.path.join(data_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+BACKENDS = {
+    'fast': FastEphemeris,
+    'precise': PreciseEphemeris,
+}
+
+_ephemeris = None
+
+
+def get_ephemeris():
+    """Active ephemeris backend, chosen by the EPHEMERIS_BACKEND env var (default: precise)"""
+    global _ephemeris
+    if _ephemeris is None:
+        set_ephemeris(os.environ.get('EPHEMERIS_BACKEND', 'precise'))
+    return _ephemeris
+
+
+def set_ephemeris(name: str):
+    """Switch the active ephemeris backend"""
+    global _ephemeris
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ephemeris backend '{name}'. Choose from: {list(BACKENDS)}")
+    _ephemeris = BACKENDS[name]()
+    return _ephemeris
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Ephemeris table tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="Fit the precise model into Chebyshev tables")
+    build.add_argument('--data-dir', default=os.environ.get('EPHEMERIS_DATA_DIR', DEFAULT_DATA_DIR))
+    build.add_argument('--start-year', type=int, default=500)
+    build.add_argument('--end-year', type=int, default=2300)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        manifest = build_tables(args.data_dir, args.start_year, args.end_year)
+        print(f"Wrote Chebyshev tables for JD {manifest['start_jd']} - {manifest['end_jd']} to {args.data_dir}")
+
+
+if __name__ == '__main__':
+    main()
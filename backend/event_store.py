@@ -0,0 +1,369 @@
+"""
+Event Store
+Adds, edits and removes events (e.g. user contributions) on top of the corpus
+snapshot without rebuilding anything.
+
+Every change is appended to a log as one JSON line carrying the new and the
+previous version of the event together with their signature keys. Reads are
+served from the memory-mapped corpus snapshot and statistics cube, which every
+worker process shares through the OS page cache, plus a small per-process
+overlay of the changes logged since they were written. A worker notices
+changes made by other workers from the log file's size and replays only those.
+
+Once the log grows past a threshold it is compacted in a background thread:
+the log is rotated, its changes are folded into new cube files and a new corpus
+snapshot, and those are swapped in atomically. Reads never wait for compaction.
+"""
+
+import fcntl
+import json
+import os
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from corpus import (
+    CorpusReader,
+    corpus_path,
+    corpus_record,
+    event_signature_keys,
+    publish_files,
+    snapshot_exists,
+    snapshot_meta_path,
+    write_corpus,
+)
+from stats_cube import StatisticsCube, event_cell, merge_cube_changes, write_cube, load_cube, DEFAULT_CUBE_DIR
+
+DEFAULT_LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'events')
+DEFAULT_COMPACT_THRESHOLD = 500
+
+# Callback(previous, current) invoked after every change; either may be None
+Subscriber = Callable[[Optional[dict], Optional[dict]], None]
+
+
+@contextmanager
+def file_lock(path: str, exclusive: bool = True, blocking: bool = True):
+    """Advisory lock shared by every process using the same files; yields whether it was acquired"""
+    with open(path, 'a') as f:
+        flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        try:
+            fcntl.flock(f, flags if blocking else flags | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class EventStore:
+    """Corpus snapshot plus an append-only change log"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        log_dir: Optional[str] = None,
+        cube_dir: Optional[str] = None,
+        compact_threshold: Optional[int] = None,
+    ):
+        self.path = corpus_path(path)
+        self.log_dir = log_dir or os.environ.get('EVENT_LOG_DIR', DEFAULT_LOG_DIR)
+        self.cube_dir = cube_dir or os.environ.get('STATS_CUBE_DIR', DEFAULT_CUBE_DIR)
+        self.compact_threshold = compact_threshold or int(
+            os.environ.get('EVENT_LOG_COMPACT_THRESHOLD', DEFAULT_COMPACT_THRESHOLD)
+        )
+        self.log_path = os.path.join(self.log_dir, 'log.jsonl')
+        self.compacting_path = os.path.join(self.log_dir, 'log.compacting.jsonl')
+        self.lock_path = os.path.join(self.log_dir, 'log.lock')
+        self.compact_lock_path = os.path.join(self.log_dir, 'compact.lock')
+
+        self.snapshot: Optional[CorpusReader] = None
+        # Event id -> (seq, record or None if removed) for changes newer than the snapshot
+        self.changes: Dict[str, Tuple[int, Optional[dict]]] = {}
+        self.changed_days: Dict[tuple, Set[str]] = defaultdict(set)
+        # (month, day) -> sequence number of the day's latest change in the log
+        self.day_seqs: Dict[tuple, int] = {}
+        self.cube: Optional[StatisticsCube] = None
+        self.subscribers: List[Subscriber] = []
+        self.seq = 0
+        self.cube_seq = 0
+        self.pending = 0
+
+        self._versions: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+
+    def load(self):
+        """Open the snapshot and cube, then replay the log on top of them"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        with self._lock, file_lock(self.lock_path, exclusive=False):
+            self._sync()
+        return self
+
+    def refresh(self):
+        """Pick up changes written by other processes"""
+        with self._lock:
+            self._refresh()
+
+    def subscribe(self, subscriber: Subscriber):
+        """Register a derived index to be updated on every change"""
+        self.subscribers.append(subscriber)
+
+    def get(self, event_id: str) -> Optional[dict]:
+        with self._lock:
+            self._refresh()
+            return self._lookup(event_id)
+
+    def day_seq(self, month: int, day: int) -> int:
+        """
+        Sequence number of the latest change to a calendar day's events (0 if
+        none), so results for a day are only invalidated by changes to it
+        """
+        with self._lock:
+            self._refresh()
+            base = self.snapshot.day_seqs.get((month, day), 0) if self.snapshot is not None else 0
+            return max(base, self.day_seqs.get((month, day), 0))
+
+    def events_for_day(self, month: int, day: int, source: Optional[str] = None) -> List[dict]:
+        """Events of a calendar day, optionally only those from one source"""
+        with self._lock:
+            self._refresh()
+            events = []
+            if self.snapshot is not None:
+                events = [e for e in self.snapshot.day(month, day, source) if e['id'] not in self.changes]
+            for event_id in self.changed_days.get((month, day), ()):
+                event = self.changes[event_id][1]
+                if source is None or event.get('source', 'wikipedia') == source:
+                    events.append(event)
+            return events
+
+    def add(self, month: int, day: int, year: int, text: str, links: Optional[List[dict]] = None,
+            source: str = 'user') -> dict:
+        """Add a new event; raises KeyError if an identical event already exists"""
+        record = self._classify(month, day, year, text, links, source)
+        return self._write('put', record['id'], record, must_exist=False)
+
+    def edit(self, event_id: str, month: int, day: int, year: int, text: str,
+             links: Optional[List[dict]] = None) -> dict:
+        """Replace an existing event, keeping its id; raises KeyError if unknown"""
+        previous = self.get(event_id)
+        if previous is None:
+            raise KeyError(event_id)
+        record = self._classify(month, day, year, text, links, previous.get('source', 'wikipedia'))
+        record['id'] = event_id
+        return self._write('put', event_id, record, must_exist=True)
+
+    def remove(self, event_id: str) -> dict:
+        """Remove an event; raises KeyError if unknown"""
+        return self._write('delete', event_id, None, must_exist=True)
+
+    @staticmethod
+    def _classify(month, day, year, text, links, source) -> dict:
+        record = corpus_record(month, day, year, text)
+        record['source'] = source
+        if links:
+            record['links'] = links
+        return record
+
+    def _write(self, op: str, event_id: str, record: Optional[dict], must_exist: bool) -> Optional[dict]:
+        """Append a change; returns the new record, or the removed one for deletes"""
+        # Derived data travels with the entry so replay and compaction never recompute charts
+        event = _with_keys(record)
+        with self._lock, file_lock(self.lock_path):
+            # Catch up with other processes first so sequence numbers stay unique
+            self._sync()
+            previous = self._lookup(event_id)
+            if (previous is not None) != must_exist:
+                raise KeyError(event_id)
+
+            entry = {'op': op, 'event': event, 'previous': _with_keys(previous), 'seq': self.seq + 1}
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+            self._apply(entry)
+            self.pending += 1
+            self._versions = self._file_versions()
+
+        if self.pending >= self.compact_threshold:
+            self.compact_in_background()
+        return record if record is not None else previous
+
+    def _lookup(self, event_id: str) -> Optional[dict]:
+        if event_id in self.changes:
+            return self.changes[event_id][1]
+        return self.snapshot.get(event_id) if self.snapshot is not None else None
+
+    def _file_versions(self) -> tuple:
+        """Identity of every file that other processes may replace or append to"""
+        versions = []
+        for path in (self.log_path, snapshot_meta_path(self.path), os.path.join(self.cube_dir, 'meta.json')):
+            try:
+                stat = os.stat(path)
+                versions.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                versions.append(None)
+        return tuple(versions)
+
+    def _refresh(self):
+        if self._file_versions() != self._versions:
+            with file_lock(self.lock_path, exclusive=False):
+                self._sync()
+
+    def _sync(self):
+        """Bring this process up to date with the files on disk (caller holds both locks)"""
+        versions = self._file_versions()
+        if versions == self._versions:
+            return
+        if self._versions is None or versions[1] != self._versions[1]:
+            self._open_snapshot()
+        if self._versions is None or versions[2] != self._versions[2]:
+            self.cube = load_cube(self.cube_dir)
+            self.cube_seq = self.cube.seq if self.cube is not None else 0
+
+        log = self._read_log(self.log_path)
+        for entry in self._read_log(self.compacting_path) + log:
+            if entry['seq'] > self.seq or (self.cube is not None and entry['seq'] > self.cube_seq):
+                self._apply(entry)
+        self.pending = len(log)
+        self._versions = versions
+
+    def _open_snapshot(self):
+        self.snapshot = CorpusReader(self.path) if snapshot_exists(self.path) else None
+        base_seq = self.snapshot.seq if self.snapshot is not None else 0
+        self.seq = max(self.seq, base_seq)
+        # Changes folded into the new snapshot no longer need the overlay
+        for event_id, (seq, _) in list(self.changes.items()):
+            if seq <= base_seq:
+                self._set_change(event_id, seq, None)
+                del self.changes[event_id]
+
+    def _apply(self, entry: dict):
+        seq = entry['seq']
+        if seq > self.seq:
+            self.seq = seq
+            previous = _without_keys(entry['previous'])
+            current = _without_keys(entry['event'])
+            if previous:
+                self._set_change(previous['id'], seq, None)
+            if current:
+                self._set_change(current['id'], seq, current)
+            for record in (previous, current):
+                if record:
+                    self.day_seqs[(record['month'], record['day'])] = seq
+            for subscriber in self.subscribers:
+                subscriber(previous, current)
+
+        if self.cube is not None and seq > self.cube_seq:
+            self.cube_seq = seq
+            for version, delta in ((entry['previous'], -1), (entry['event'], 1)):
+                if version and version['signature_keys'] is not None:
+                    self.cube.add_event(version['signature_keys'], event_cell(version), delta)
+
+    def _set_change(self, event_id: str, seq: int, record: Optional[dict]):
+        if event_id in self.changes:
+            old = self.changes[event_id][1]
+            if old is not None:
+                self.changed_days[(old['month'], old['day'])].discard(event_id)
+        self.changes[event_id] = (seq, record)
+        if record is not None:
+            self.changed_days[(record['month'], record['day'])].add(event_id)
+
+    @staticmethod
+    def _read_log(path: str) -> List[dict]:
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def compact_in_background(self):
+        """Start a compaction unless one is already running"""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, daemon=True)
+            self._compactor.start()
+
+    def compact(self):
+        """Fold the log into the cube files and corpus snapshot on disk"""
+        with file_lock(self.compact_lock_path, blocking=False) as acquired:
+            if acquired:  # otherwise another process is compacting
+                self._compact()
+
+    def _compact(self):
+        with self._lock, file_lock(self.lock_path):
+            self._sync()
+            # A leftover compacting log (from an interrupted run) is finished first
+            if not os.path.exists(self.compacting_path) and os.path.exists(self.log_path):
+                os.replace(self.log_path, self.compacting_path)
+                self.pending = 0
+            self._versions = self._file_versions()
+
+        entries = self._read_log(self.compacting_path)
+        if not entries:
+            return
+        last_seq = entries[-1]['seq']
+
+        # New files are written under temporary names while reads and writes continue
+        pairs = []
+        cube = load_cube(self.cube_dir, mmap=False)
+        if cube is not None:
+            changes = []
+            for entry in entries:
+                if entry['seq'] <= cube.seq:
+                    continue
+                for version, delta in ((entry['previous'], -1), (entry['event'], 1)):
+                    if version:
+                        changes.append((version['signature_keys'], version, delta))
+            pairs += write_cube(merge_cube_changes(cube, changes, last_seq), self.cube_dir)
+
+        snapshot = CorpusReader(self.path) if snapshot_exists(self.path) else None
+        base_seq = snapshot.seq if snapshot is not None else 0
+        day_seqs = dict(snapshot.day_seqs) if snapshot is not None else {}
+        changed: Dict[str, Optional[dict]] = {}
+        for entry in entries:
+            if entry['seq'] <= base_seq:
+                continue
+            for version in (entry['previous'], entry['event']):
+                if version:
+                    day_seqs[(version['month'], version['day'])] = entry['seq']
+            if entry['previous']:
+                changed[entry['previous']['id']] = None
+            if entry['event']:
+                current = _without_keys(entry['event'])
+                changed[current['id']] = current
+        records = [r for r in snapshot if r['id'] not in changed] if snapshot is not None else []
+        records += [r for r in changed.values() if r is not None]
+        pairs += write_corpus(records, self.path, last_seq, day_seqs)
+
+        with self._lock, file_lock(self.lock_path):
+            publish_files(pairs)
+            os.remove(self.compacting_path)
+            self._sync()
+
+
+def _with_keys(record: Optional[dict]) -> Optional[dict]:
+    if record is None:
+        return None
+    return {**record, 'signature_keys': event_signature_keys(record)}
+
+
+def _without_keys(record: Optional[dict]) -> Optional[dict]:
+    if record is None:
+        return None
+    return {k: v for k, v in record.items() if k != 'signature_keys'}
+
+
+_store: Optional[EventStore] = None
+_store_lock = threading.Lock()
+
+
+def get_event_store() -> EventStore:
+    """Shared event store, loaded on first use and kept current with other workers"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EventStore().load()
+            return _store
+    _store.refresh()
+    return _store
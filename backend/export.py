@@ -0,0 +1,205 @@
+"""
+Chart Export
+Daily transit tables (each planet's longitude, rashi, nakshatra, pada and
+dignity, and the day's panchanga) over long date ranges, computed in batches of
+CHUNK_DAYS and streamed, so memory stays constant however long the range is.
+
+Formats:
+    csv       one row per day, categories by name
+    columnar  JSON lines: a schema line, then one row group per chunk holding
+              each column as an array, with categories dictionary-encoded
+              (their codes index the schema's dictionary), in the manner of Parquet
+
+Write a file locally with:
+    python export.py 1000-01-01 2000-12-31 --fields rashi,nakshatra,pada,dignity -o transits.csv
+"""
+
+import argparse
+import csv
+import io
+import json
+from datetime import date
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from timescale import jd_to_iso, julian_day
+from vedic_calc import (
+    calculate_sidereal_longitudes_batch,
+    nakshatra_indices,
+    panchanga_indices,
+    rashi_indices,
+    DIGNITY,
+    KARANAS,
+    NAKSHATRA_SPAN,
+    NAKSHATRAS,
+    PLANET_NAMES,
+    RASHIS,
+    TITHIS,
+    VARAS,
+    YOGAS,
+    AYANAMSHAS,
+    DEFAULT_AYANAMSHA,
+)
+
+CHUNK_DAYS = 4096
+MAX_DAYS = 3000 * 366
+FORMATS = ("csv", "columnar")
+
+DIGNITIES = ["", "exalted", "debilitated"]
+
+# Per-planet fields (columns named like Sun_rashi) and per-day fields: (type, dictionary)
+PLANET_FIELDS = {
+    "longitude": ("float", None),
+    "rashi": ("category", [r["name"] for r in RASHIS]),
+    "nakshatra": ("category", [n["name"] for n in NAKSHATRAS]),
+    "pada": ("int", None),
+    "dignity": ("category", DIGNITIES),
+}
+DAY_FIELDS = {
+    "tithi": ("category", [f"{t['paksha']} {t['name']}" for t in TITHIS]),
+    "yoga": ("category", YOGAS),
+    "karana": ("category", KARANAS),
+    "vara": ("category", [v["name"] for v in VARAS]),
+}
+DEFAULT_FIELDS = ["rashi", "nakshatra", "pada", "dignity"]
+
+# DIGNITY_CODES[planet, rashi] indexes DIGNITIES
+DIGNITY_CODES = np.zeros((len(PLANET_NAMES), 12), dtype=np.int8)
+for _planet, _dignity in DIGNITY.items():
+    DIGNITY_CODES[PLANET_NAMES.index(_planet), _dignity["exalted"]] = 1
+    DIGNITY_CODES[PLANET_NAMES.index(_planet), _dignity["debilitated"]] = 2
+
+
+def parse_fields(value: Optional[str]) -> List[str]:
+    """Requested fields in table order; raises ValueError for unknown ones"""
+    if not value:
+        return list(DEFAULT_FIELDS)
+    requested = [field.strip() for field in value.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in PLANET_FIELDS and field not in DAY_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join([*PLANET_FIELDS, *DAY_FIELDS])}")
+    return [field for field in [*PLANET_FIELDS, *DAY_FIELDS] if field in requested]
+
+
+def day_range(start: date, end: date, hour: float = 12.0) -> Tuple[float, int]:
+    """Julian Day (UT) of the first day's chart and the number of days, end inclusive"""
+    first = julian_day(start.year, start.month, start.day, hour)
+    days = int(round(julian_day(end.year, end.month, end.day, hour) - first)) + 1
+    return first, days
+
+
+def columns(fields: Sequence[str]) -> List[Tuple[str, str, Optional[list]]]:
+    """(name, type, dictionary) of every column, date first"""
+    result = [("date", "date", None)]
+    for field in fields:
+        if field in PLANET_FIELDS:
+            kind, dictionary = PLANET_FIELDS[field]
+            result.extend((f"{planet}_{field}", kind, dictionary) for planet in PLANET_NAMES)
+    for field in fields:
+        if field in DAY_FIELDS:
+            kind, dictionary = DAY_FIELDS[field]
+            result.append((field, kind, dictionary))
+    return result
+
+
+def compute_chunk(jds: np.ndarray, fields: Sequence[str], ayanamsha: str = DEFAULT_AYANAMSHA) -> List[np.ndarray]:
+    """Column arrays (dates excluded, categories as codes) for a batch of days, in columns() order"""
+    longitudes = calculate_sidereal_longitudes_batch(jds, ayanamsha)
+    rashis = rashi_indices(longitudes)
+    per_planet = {
+        "longitude": lambda: np.round(longitudes, 4),
+        "rashi": lambda: rashis,
+        "nakshatra": lambda: nakshatra_indices(longitudes),
+        "pada": lambda: (np.mod(longitudes, NAKSHATRA_SPAN) / (NAKSHATRA_SPAN / 4)).astype(np.int8) + 1,
+        "dignity": lambda: DIGNITY_CODES[np.arange(len(PLANET_NAMES)), rashis],
+    }
+    result = []
+    for field in fields:
+        if field in per_planet:
+            values = per_planet[field]()
+            result.extend(values[:, i] for i in range(len(PLANET_NAMES)))
+    if any(field in DAY_FIELDS for field in fields):
+        panchanga = panchanga_indices(longitudes, jds)
+        result.extend(panchanga[field] for field in fields if field in DAY_FIELDS)
+    return result
+
+
+def chunks(first_jd: float, days: int, fields: Sequence[str], ayanamsha: str = DEFAULT_AYANAMSHA,
+           chunk_days: int = CHUNK_DAYS) -> Iterator[Tuple[List[str], List[np.ndarray]]]:
+    """(dates, column arrays) for each chunk of days"""
+    for offset in range(0, days, chunk_days):
+        jds = first_jd + np.arange(offset, min(offset + chunk_days, days), dtype=np.float64)
+        yield [jd_to_iso(jd, date_only=True) for jd in jds], compute_chunk(jds, fields, ayanamsha)
+
+
+def export_csv(first_jd: float, days: int, fields: Sequence[str], ayanamsha: str = DEFAULT_AYANAMSHA) -> Iterator[str]:
+    """The table as CSV text, one chunk of rows at a time"""
+    layout = columns(fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _, _ in layout])
+    for dates, values in chunks(first_jd, days, fields, ayanamsha):
+        # Decode categories to names column by column, then write the rows
+        decoded = [dates]
+        for (_, kind, dictionary), column in zip(layout[1:], values):
+            decoded.append(np.array(dictionary, dtype=object)[column] if kind == "category" else column.tolist())
+        writer.writerows(zip(*decoded))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def export_columnar(first_jd: float, days: int, fields: Sequence[str],
+                    ayanamsha: str = DEFAULT_AYANAMSHA) -> Iterator[str]:
+    """The table as a schema line followed by one JSON row group per chunk"""
+    layout = columns(fields)
+    schema = [
+        {"name": name, "type": kind, **({"dictionary": dictionary} if dictionary else {})}
+        for name, kind, dictionary in layout
+    ]
+    yield json.dumps({"schema": schema, "rows": days}) + "\n"
+    for dates, values in chunks(first_jd, days, fields, ayanamsha):
+        group = {"rows": len(dates), "columns": [dates] + [column.tolist() for column in values]}
+        yield json.dumps(group, separators=(",", ":")) + "\n"
+
+
+def export(first_jd: float, days: int, fields: Sequence[str], format: str = "csv",
+           ayanamsha: str = DEFAULT_AYANAMSHA) -> Iterator[str]:
+    """The table in a format, under an ayanamsha system, as a stream of text chunks"""
+    if format == "csv":
+        return export_csv(first_jd, days, fields, ayanamsha)
+    if format == "columnar":
+        return export_columnar(first_jd, days, fields, ayanamsha)
+    raise ValueError(f"Unknown format '{format}'. Choose from: {list(FORMATS)}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Export daily transit tables")
+    parser.add_argument("start", help="First date (YYYY-MM-DD)")
+    parser.add_argument("end", help="Last date, inclusive (YYYY-MM-DD)")
+    parser.add_argument("--fields", help=f"Comma-separated fields (default: {','.join(DEFAULT_FIELDS)})")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--hour", type=float, default=12.0, help="Hour of each day's chart (UT)")
+    parser.add_argument("--ayanamsha", choices=list(AYANAMSHAS), default=DEFAULT_AYANAMSHA)
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args(argv)
+
+    try:
+        fields = parse_fields(args.fields)
+        start = date.fromisoformat(args.start)
+        end = date.fromisoformat(args.end)
+    except ValueError as e:
+        parser.error(str(e))
+    first_jd, days = day_range(start, end, args.hour)
+    if not (1 <= days <= MAX_DAYS):
+        parser.error(f"Range must cover between 1 and {MAX_DAYS} days")
+
+    with open(args.output, "w", newline="") as f:
+        for text in export(first_jd, days, fields, args.format, args.ayanamsha):
+            f.write(text)
+    print(f"Wrote {days} days to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
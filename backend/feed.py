@@ -0,0 +1,156 @@
+"""
+Wikipedia Feed
+Keeps each day's raw "on this day" feed for FEED_CACHE_TTL seconds and fetches
+it once however many requests ask for it at the same time. Each copy is
+versioned by a hash of its content, so results (and cursors) computed from it
+stay valid across refetches and worker processes until the feed changes.
+
+Feed items are processed by a lazy pipeline of generator stages:
+parse -> year filter -> top-N selection -> classify -> shape, so classification
+only runs on items that survive selection.
+
+Record a day's feed and benchmark the pipeline on it with:
+    python feed.py record 7 4 data/feed-0704.json
+    python feed.py bench data/feed-0704.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import heapq
+import json
+import os
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import httpx
+
+from cache import CoalescingCache, cache_size
+from classification import categorize_event, detect_countries, get_region
+from corpus import fetch_onthisday, MIN_YEAR
+
+FEED_CACHE_TTL = float(os.environ.get("FEED_CACHE_TTL", 3600))
+
+_feeds = CoalescingCache(cache_size("feeds", 366), ttl=FEED_CACHE_TTL)
+
+
+def feed_version(data: dict) -> str:
+    return hashlib.sha1(json.dumps(data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()[:12]
+
+
+async def get_day_feed(month: int, day: int) -> Tuple[str, dict]:
+    """(version, raw feed) for a calendar day; raises httpx.HTTPError if Wikipedia fails"""
+    async def fetch() -> Tuple[str, dict]:
+        async with httpx.AsyncClient() as client:
+            data = await fetch_onthisday(client, month, day)
+        return feed_version(data), data
+
+    return await _feeds.get_or_compute((month, day), fetch)
+
+
+# Pipeline items: (year, text, pages), then (year, text, pages, category, countries) once classified
+RawItem = Tuple[int, str, list]
+ClassifiedItem = Tuple[int, str, list, str, List[str]]
+
+
+def parse(data: dict, kind: str) -> Iterator[RawItem]:
+    """Items of one kind ("events", "births" or "deaths") from a raw feed"""
+    for item in data.get(kind, []):
+        yield item.get("year", 0), item.get("text", ""), item.get("pages", [])
+
+
+def since(items: Iterable[RawItem], min_year: int = MIN_YEAR) -> Iterator[RawItem]:
+    for item in items:
+        if item[0] >= min_year:
+            yield item
+
+
+def newest(items: Iterable[RawItem], count: int) -> Iterator[RawItem]:
+    """The count most recent items, newest first (ties keep feed order, like a stable sort)"""
+    return iter(heapq.nlargest(count, items, key=lambda item: item[0]))
+
+
+def classify(items: Iterable[RawItem], category: Optional[str] = None) -> Iterator[ClassifiedItem]:
+    """Attach category (detected unless given) and countries"""
+    for year, text, pages in items:
+        yield year, text, pages, category or categorize_event(text), detect_countries(text)
+
+
+def shape(items: Iterable[ClassifiedItem], links: int, region: bool) -> Iterator[dict]:
+    for year, text, pages, category, countries in items:
+        record = {
+            "year": year,
+            "text": text,
+            "category": category,
+            "countries": countries,
+        }
+        if region:
+            record["region"] = get_region(countries[0]) if countries else None
+        record["links"] = pages[:links]
+        yield record
+
+
+def process_feed(data: dict, kind: str, limit: Optional[int] = None, category: Optional[str] = None,
+                 links: int = 3, region: bool = False) -> List[dict]:
+    """
+    Shaped items of one kind from MIN_YEAR on; with a limit, only the newest
+    `limit` items (newest first) are classified and shaped
+    """
+    items = since(parse(data, kind))
+    if limit is not None:
+        items = newest(items, limit)
+    return list(shape(classify(items, category), links, region))
+
+
+def benchmark(data: dict, repeat: int = 20) -> dict:
+    """Milliseconds per run of the day's processing with and without early selection"""
+    def classify_then_select(kind: str) -> List[dict]:
+        items = process_feed(data, kind, category=kind[:-1], links=2)
+        return sorted(items, key=lambda x: x["year"], reverse=True)[:20]
+
+    cases = {
+        "events (all stages)": lambda: process_feed(data, "events", region=True),
+        "births+deaths, classify then select top 20": lambda: [classify_then_select(k) for k in ("births", "deaths")],
+        "births+deaths, select top 20 then classify": lambda: [
+            process_feed(data, kind, limit=20, category=kind[:-1], links=2) for kind in ("births", "deaths")
+        ],
+    }
+    timings = {}
+    for name, run in cases.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        timings[name] = round((time.perf_counter() - start) / repeat * 1000, 3)
+    return timings
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Wikipedia feed tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record = subparsers.add_parser("record", help="Save a day's raw feed to a file")
+    record.add_argument("month", type=int)
+    record.add_argument("day", type=int)
+    record.add_argument("path")
+    bench = subparsers.add_parser("bench", help="Time the processing pipeline on a recorded feed")
+    bench.add_argument("path")
+    bench.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        async def fetch() -> dict:
+            async with httpx.AsyncClient() as client:
+                return await fetch_onthisday(client, args.month, args.day)
+
+        data = asyncio.run(fetch())
+        with open(args.path, "w") as f:
+            json.dump(data, f)
+        print(f"Wrote {sum(len(data.get(k, [])) for k in ('events', 'births', 'deaths'))} items to {args.path}")
+    elif args.command == "bench":
+        with open(args.path) as f:
+            data = json.load(f)
+        for name, milliseconds in benchmark(data, args.repeat).items():
+            print(f"{name}: {milliseconds} ms")
+
+
+if __name__ == "__main__":
+    main()
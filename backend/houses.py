@@ -0,0 +1,224 @@
+"""
+House Engine
+Local sidereal time, ascendant (Lagna) and whole-sign houses, computed in batch
+over many charts, with chart locations from a per-country coordinate table
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from timescale import J2000, datetime_to_jd, julian_days, terrestrial_time
+from vedic_calc import (
+    ayanamsha_at,
+    calculate_sidereal_longitudes_batch,
+    DEFAULT_AYANAMSHA,
+    rashi_indices,
+    PLANET_NAMES,
+    RASHIS,
+)
+
+# Country (as in classification.COUNTRIES) -> (latitude, longitude) in degrees,
+# north and east positive. Events rarely say where in a country they happened,
+# so each country is placed at its capital or historical centre.
+COUNTRY_COORDINATES: Dict[str, Tuple[float, float]] = {
+    # Asia
+    'India': (28.61, 77.21),
+    'China': (39.90, 116.41),
+    'Japan': (35.68, 139.69),
+    'Korea': (37.57, 126.98),
+    'Vietnam': (21.03, 105.85),
+    'Thailand': (13.76, 100.50),
+    'Indonesia': (-6.21, 106.85),
+    'Philippines': (14.60, 120.98),
+    'Malaysia': (3.14, 101.69),
+    'Singapore': (1.35, 103.82),
+    'Myanmar': (16.87, 96.20),
+    'Pakistan': (31.55, 74.34),
+    'Bangladesh': (23.81, 90.41),
+    'Sri Lanka': (6.93, 79.85),
+    'Nepal': (27.72, 85.32),
+    'Afghanistan': (34.56, 69.21),
+
+    # Middle East
+    'Iran': (35.69, 51.39),
+    'Iraq': (33.32, 44.37),
+    'Saudi Arabia': (21.39, 39.86),
+    'Turkey': (41.01, 28.98),
+    'Israel': (31.77, 35.21),
+    'Egypt': (30.04, 31.24),
+    'Syria': (33.51, 36.29),
+    'Lebanon': (33.89, 35.50),
+    'Jordan': (31.95, 35.93),
+
+    # Europe
+    'United Kingdom': (51.51, -0.13),
+    'France': (48.86, 2.35),
+    'Germany': (52.52, 13.40),
+    'Italy': (41.90, 12.50),
+    'Spain': (40.42, -3.70),
+    'Portugal': (38.72, -9.14),
+    'Netherlands': (52.37, 4.90),
+    'Belgium': (50.85, 4.35),
+    'Austria': (48.21, 16.37),
+    'Switzerland': (46.95, 7.45),
+    'Poland': (52.23, 21.01),
+    'Russia': (55.76, 37.62),
+    'Ukraine': (50.45, 30.52),
+    'Greece': (37.98, 23.73),
+    'Sweden': (59.33, 18.07),
+    'Norway': (59.91, 10.75),
+    'Denmark': (55.68, 12.57),
+    'Finland': (60.17, 24.94),
+    'Hungary': (47.50, 19.04),
+    'Czech Republic': (50.08, 14.44),
+    'Romania': (44.43, 26.10),
+    'Bulgaria': (42.70, 23.32),
+    'Serbia': (44.79, 20.45),
+
+    # Americas
+    'United States': (38.91, -77.04),
+    'Canada': (45.42, -75.70),
+    'Mexico': (19.43, -99.13),
+    'Brazil': (-22.91, -43.17),
+    'Argentina': (-34.60, -58.38),
+    'Peru': (-12.05, -77.04),
+    'Colombia': (4.71, -74.07),
+    'Chile': (-33.45, -70.67),
+    'Cuba': (23.11, -82.37),
+
+    # Africa
+    'South Africa': (-33.92, 18.42),
+    'Nigeria': (6.52, 3.38),
+    'Ethiopia': (9.03, 38.74),
+    'Morocco': (34.02, -6.84),
+    'Algeria': (36.75, 3.06),
+    'Tunisia': (36.81, 10.18),
+    'Libya': (32.89, 13.19),
+    'Sudan': (15.50, 32.56),
+    'Kenya': (-1.29, 36.82),
+
+    # Oceania
+    'Australia': (-33.87, 151.21),
+    'New Zealand': (-41.29, 174.78),
+}
+
+
+def country_location(countries: List[str]) -> Optional[Tuple[float, float]]:
+    """Coordinates of the first of an event's countries found in the table"""
+    for country in countries:
+        if country in COUNTRY_COORDINATES:
+            return COUNTRY_COORDINATES[country]
+    return None
+
+
+def local_sidereal_time(jds: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Local mean sidereal time in degrees for Julian Days (UT) and east longitudes (Meeus, ch. 12)"""
+    d = jds - J2000
+    t = d / 36525
+    gmst = 280.46061837 + 360.98564736629 * d + 0.000387933 * t ** 2 - t ** 3 / 38710000
+    return np.mod(gmst + longitudes, 360)
+
+
+def mean_obliquity(jds_tt: np.ndarray) -> np.ndarray:
+    """Mean obliquity of the ecliptic in degrees"""
+    t = (jds_tt - J2000) / 36525
+    return 23.439291 - 0.0130042 * t
+
+
+def ascendants(jds: np.ndarray, latitudes: np.ndarray, longitudes: np.ndarray,
+               ayanamsha: str = DEFAULT_AYANAMSHA) -> np.ndarray:
+    """Sidereal ascendant longitudes for Julian Days (UT) at the given places"""
+    jds_tt = terrestrial_time(jds)
+    ramc = np.radians(local_sidereal_time(jds, longitudes))
+    obliquity = np.radians(mean_obliquity(jds_tt))
+    latitude = np.radians(latitudes)
+    tropical = np.degrees(np.arctan2(
+        np.cos(ramc),
+        -(np.sin(ramc) * np.cos(obliquity) + np.tan(latitude) * np.sin(obliquity)),
+    ))
+    return np.mod(tropical - ayanamsha_at(jds_tt, ayanamsha), 360)
+
+
+def calculate_houses_batch(
+    jds: np.ndarray,
+    latitudes: np.ndarray,
+    longitudes: np.ndarray,
+    planet_longitudes: Optional[np.ndarray] = None,
+    ayanamsha: str = DEFAULT_AYANAMSHA,
+) -> Dict[str, np.ndarray]:
+    """
+    Ascendant, Lagna (rashi index of the ascendant) and the whole-sign house
+    (1-12) of every planet, for arrays of Julian Days (UT) and places.
+    planet_longitudes, if already computed, are the charts' sidereal longitudes.
+    """
+    jds = np.asarray(jds, dtype=np.float64)
+    if planet_longitudes is None:
+        planet_longitudes = calculate_sidereal_longitudes_batch(jds, ayanamsha)
+    ascendant = ascendants(
+        jds,
+        np.asarray(latitudes, dtype=np.float64),
+        np.asarray(longitudes, dtype=np.float64),
+        ayanamsha,
+    )
+    lagna = rashi_indices(ascendant)
+    houses = (rashi_indices(planet_longitudes) - lagna[:, None]) % 12 + 1
+    return {'ascendant': ascendant, 'lagna': lagna, 'houses': houses}
+
+
+def house_signatures(lagna: int, houses: np.ndarray) -> List[dict]:
+    """House signatures of one chart (a row of calculate_houses_batch)"""
+    rashi = RASHIS[int(lagna)]['name']
+    signatures = [{'key': f"Lagna_in_{rashi}", 'element': 'lagna', 'rashi': rashi}]
+    for planet, house in zip(PLANET_NAMES, houses):
+        signatures.append({
+            'key': f"{planet}_in_house_{int(house)}",
+            'element': 'house',
+            'planet': planet,
+            'house': int(house),
+        })
+    return signatures
+
+
+def get_house_chart(dt: datetime, location: Tuple[float, float], ayanamsha: str = DEFAULT_AYANAMSHA) -> dict:
+    """Ascendant, Lagna and whole-sign houses for a moment and place"""
+    latitude, longitude = location
+    chart = calculate_houses_batch([datetime_to_jd(dt)], [latitude], [longitude], ayanamsha=ayanamsha)
+    lagna = int(chart['lagna'][0])
+    return {
+        'latitude': latitude,
+        'longitude': longitude,
+        'ascendant': round(float(chart['ascendant'][0]), 2),
+        'lagna': RASHIS[lagna],
+        'houses': {planet: int(house) for planet, house in zip(PLANET_NAMES, chart['houses'][0])},
+        'signatures': house_signatures(lagna, chart['houses'][0]),
+    }
+
+
+def house_signatures_batch(
+    dates: List[datetime],
+    locations: List[Optional[Tuple[float, float]]],
+    ayanamsha: str = DEFAULT_AYANAMSHA,
+) -> List[List[dict]]:
+    """House signatures for many charts in one pass; charts without a location get none"""
+    located = [i for i, location in enumerate(locations) if location is not None]
+    signatures: List[List[dict]] = [[] for _ in dates]
+    if not located:
+        return signatures
+
+    jds = julian_days(
+        [dates[i].year for i in located],
+        [dates[i].month for i in located],
+        [dates[i].day for i in located],
+        [dates[i].hour + dates[i].minute / 60 for i in located],
+    )
+    chart = calculate_houses_batch(
+        jds,
+        [locations[i][0] for i in located],
+        [locations[i][1] for i in located],
+        ayanamsha=ayanamsha,
+    )
+    for row, i in enumerate(located):
+        signatures[i] = house_signatures(chart['lagna'][row], chart['houses'][row])
+    return signatures
@@ -0,0 +1,102 @@
+"""
+Intra-day Windows
+For events whose time of day is unknown: which nakshatras and rashis each
+planet passes through during the whole day (00:00-24:00 UT) and for what
+fraction of it, so a placement can be matched if it holds at any time that day,
+weighted by how long it holds.
+
+Longitudes are sampled every 24 / SEGMENTS hours, for many days in one batch.
+Within a segment even the Moon moves under 5 degrees, so it crosses at most one
+nakshatra or rashi boundary, at a time found by linear interpolation (to within
+a minute or so). Samples are tropical, so one set serves every ayanamsha.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ephemeris import get_ephemeris, PLANET_NAMES
+from timescale import datetime_to_jd, terrestrial_time
+from vedic_calc import ayanamsha_at, DEFAULT_AYANAMSHA, NAKSHATRA_SPAN, NAKSHATRAS, RASHIS
+
+SEGMENTS = 8  # 3-hour segments
+
+# Signature types matched over the day: the signature field naming the
+# division, the divisions' span and the divisions
+WINDOW_TYPES = {
+    'planet_in_nakshatra': ('nakshatra', NAKSHATRA_SPAN, NAKSHATRAS),
+    'planet_in_rashi': ('rashi', 30.0, RASHIS),
+}
+
+
+def calculate_day_samples(dates: List[datetime]) -> Dict[str, np.ndarray]:
+    """
+    Julian Days (UT), shape (n, SEGMENTS + 1), and tropical longitudes,
+    (n, SEGMENTS + 1, planets), from midnight to midnight of each date's day
+    """
+    midnights = np.array([datetime_to_jd(datetime(d.year, d.month, d.day)) for d in dates], dtype=np.float64)
+    jds = midnights[:, None] + np.arange(SEGMENTS + 1, dtype=np.float64) / SEGMENTS
+    tropical = get_ephemeris().tropical_longitudes(terrestrial_time(jds.ravel()))
+    return {'jds': jds, 'tropical': tropical.reshape(len(dates), SEGMENTS + 1, len(PLANET_NAMES))}
+
+
+def occupancy(samples: Dict[str, np.ndarray], span: float,
+              ayanamsha: str = DEFAULT_AYANAMSHA) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Divisions (sidereal longitude // span) each planet is in during each day and
+    the fraction of the day it spends there, as two (n, planets, 2 * SEGMENTS)
+    arrays: each segment's division at its start and, if it crosses into
+    another, that one. Divisions may repeat; a planet's time in a division is
+    the sum of the fractions of its entries.
+    """
+    offsets = ayanamsha_at(terrestrial_time(samples['jds']), ayanamsha)
+    sidereal = samples['tropical'] - offsets[..., None]
+    # Each segment's end relative to its start, so segments crossing 0 degrees stay continuous
+    start = np.mod(sidereal[:, :-1], 360) / span
+    end = start + (np.mod(sidereal[:, 1:] - sidereal[:, :-1] + 180, 360) - 180) / span
+    first = np.floor(start)
+    second = np.floor(end)
+    crossing = first != second
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Share of the segment before the boundary, whichever way the planet moves
+        before = np.where(crossing, (np.maximum(first, second) - start) / (end - start), 1.0)
+
+    divisions = np.stack([first, second], axis=-1) % round(360 / span)
+    fractions = np.stack([before, 1 - before], axis=-1) / SEGMENTS
+    n = len(divisions)
+    return (
+        divisions.astype(np.int8).transpose(0, 2, 1, 3).reshape(n, len(PLANET_NAMES), 2 * SEGMENTS),
+        fractions.transpose(0, 2, 1, 3).reshape(n, len(PLANET_NAMES), 2 * SEGMENTS),
+    )
+
+
+def window_fractions(reference_signatures: dict, samples: Dict[str, np.ndarray],
+                     ayanamsha: str = DEFAULT_AYANAMSHA) -> Dict[str, np.ndarray]:
+    """
+    For each WINDOW_TYPES type, the fraction of each day, shape (n, planets),
+    each planet spends in the reference chart's division (its nakshatra or rashi)
+    """
+    planet_index = {name: i for i, name in enumerate(PLANET_NAMES)}
+    result = {}
+    for match_type, (field, span, names) in WINDOW_TYPES.items():
+        index = {division['name']: division['id'] for division in names}
+        reference = np.full(len(PLANET_NAMES), -1, dtype=np.int8)
+        for sig in reference_signatures[match_type]:
+            reference[planet_index[sig['planet']]] = index[sig[field]]
+        divisions, fractions = occupancy(samples, span, ayanamsha)
+        result[match_type] = (fractions * (divisions == reference[None, :, None])).sum(axis=-1)
+    return result
+
+
+def window_matches(reference_signatures: dict, fractions: Dict[str, np.ndarray], row: int) -> Dict[str, List[dict]]:
+    """One day's WINDOW_TYPES matches (see window_fractions), each with the fraction of the day it holds"""
+    matches = {}
+    for match_type, (field, _, _) in WINDOW_TYPES.items():
+        held = fractions[match_type][row].round(4)
+        matches[match_type] = []
+        for sig in reference_signatures[match_type]:
+            fraction = float(held[PLANET_NAMES.index(sig['planet'])])
+            if fraction > 0:
+                matches[match_type].append({'key': sig['key'], 'planet': sig['planet'], field: sig[field], 'fraction': fraction})
+    return matches
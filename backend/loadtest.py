@@ -0,0 +1,429 @@
+"""
+Load Testing
+Drives the API with concurrent traffic mixes and reports throughput, latency
+percentiles and error rates per route.
+
+Wikipedia is replaced by a local stand-in server that serves recorded feeds
+(see feed.py record) with configurable latency and injected errors, so runs are
+repeatable and never touch the real API. Days without a recording are served
+one of the recorded feeds.
+
+Record a feed or two, then start the stand-in and the app and run a mix:
+    python feed.py record 7 4 data/fixtures/feed-0704.json
+    python loadtest.py run --start --fixtures data/fixtures --mix default --duration 30
+
+Or run each piece separately:
+    python loadtest.py stand-in --fixtures data/fixtures --latency 0.2 --error-rate 0.05
+    ONTHISDAY_URL=http://127.0.0.1:8100/feed/{month:02d}/{day:02d} uvicorn main:app --workers 2
+    python loadtest.py run --base-url http://127.0.0.1:8000 --mix today-burst
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from classification import COUNTRIES, REGIONS
+from vedic_calc import NAKSHATRAS, RASHIS
+
+STAND_IN_PORT = 8100
+APP_PORT = 8000
+
+# ---------------------------------------------------------------------------
+# Wikipedia stand-in
+# ---------------------------------------------------------------------------
+
+FIXTURE_NAME = re.compile(r"(\d{2})(\d{2})\.json$")
+
+
+def load_fixtures(directory: str) -> Tuple[Dict[Tuple[int, int], bytes], List[bytes]]:
+    """Recorded feeds by (month, day) from files named like feed-0704.json, and all of them"""
+    by_day = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        match = FIXTURE_NAME.search(path)
+        if match:
+            with open(path, "rb") as f:
+                by_day[(int(match.group(1)), int(match.group(2)))] = f.read()
+    if not by_day:
+        raise SystemExit(f"No recorded feeds (*MMDD.json) in {directory}")
+    return by_day, list(by_day.values())
+
+
+async def serve_stand_in(
+    fixtures: str,
+    host: str = "127.0.0.1",
+    port: int = STAND_IN_PORT,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    seed: Optional[int] = None,
+):
+    """
+    Serve GET /feed/MM/DD from recorded feeds until cancelled. Each response waits
+    latency +/- jitter seconds; error_rate of them are 503s instead.
+    """
+    by_day, recorded = load_fixtures(fixtures)
+    rng = random.Random(seed)
+
+    async def respond(writer: asyncio.StreamWriter, status: str, body: bytes):
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                path = request.split(b" ", 2)[1].decode().split("?")[0]
+                delay = max(0.0, latency + rng.uniform(-jitter, jitter))
+                if delay:
+                    await asyncio.sleep(delay)
+
+                match = re.fullmatch(r"/feed/(\d{1,2})/(\d{1,2})", path)
+                if match is None:
+                    await respond(writer, "404 Not Found", b'{"detail": "Not found"}')
+                elif rng.random() < error_rate:
+                    await respond(writer, "503 Service Unavailable", b'{"detail": "Injected error"}')
+                else:
+                    day = (int(match.group(1)), int(match.group(2)))
+                    body = by_day.get(day) or recorded[hash(day) % len(recorded)]
+                    await respond(writer, "200 OK", body)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+# ---------------------------------------------------------------------------
+# Traffic
+# ---------------------------------------------------------------------------
+
+# A request: (route label for the report, path, query parameters)
+Request = Tuple[str, str, dict]
+
+PLANETS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu"]
+ASPECTS = ["conjunction", "square", "trine", "opposition"]
+
+
+class Traffic:
+    """Random requests of each kind, over a fixed set of calendar days"""
+
+    def __init__(self, days: int, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        today = date.today()
+        self.today = (today.month, today.day)
+        # Dates in a leap year, so Feb 29 can be drawn
+        ordinals = self.rng.sample(range(366), days)
+        self.days = [date.fromordinal(date(2024, 1, 1).toordinal() + o) for o in ordinals]
+
+    def day(self) -> Tuple[int, int]:
+        d = self.rng.choice(self.days)
+        return d.month, d.day
+
+    def events(self) -> Request:
+        month, day = self.day()
+        params = {}
+        if self.rng.random() < 0.3:
+            params["category"] = self.rng.choice(["battle", "political", "discovery", "religious"])
+        if self.rng.random() < 0.3:
+            params["year_from"] = self.rng.choice([600, 1500, 1800, 1900])
+        if self.rng.random() < 0.2:
+            params["country"] = self.rng.choice(list(COUNTRIES))
+        if self.rng.random() < 0.2:
+            params["region"] = self.rng.choice(list(REGIONS))
+        return "/api/events/{month}/{day}", f"/api/events/{month}/{day}", params
+
+    def today_events(self) -> Request:
+        return "/api/today", "/api/today", {}
+
+    def chart(self) -> Request:
+        month, day = self.day()
+        year = self.rng.randint(600, 2030)
+        if (month, day) == (2, 29):
+            year = 2024
+        return "/api/vedic/chart/{month}/{day}/{year}", f"/api/vedic/chart/{month}/{day}/{year}", {}
+
+    def correlations(self) -> Request:
+        month, day = self.today
+        params = {"min_score": self.rng.choice([3, 5, 8]), "limit": 20}
+        return "/api/vedic/correlations/{month}/{day}", f"/api/vedic/correlations/{month}/{day}", params
+
+    def search(self) -> Request:
+        month, day = self.day()
+        if self.rng.random() < 0.5:
+            params = {"planet": self.rng.choice(PLANETS), "month": month, "day": day}
+            if self.rng.random() < 0.5:
+                params["nakshatra"] = self.rng.choice(NAKSHATRAS)["name"]
+            else:
+                params["rashi"] = self.rng.choice(RASHIS)["name"]
+            return "/api/vedic/search", "/api/vedic/search", params
+        planet1, planet2 = self.rng.sample(PLANETS, 2)
+        params = {
+            "planet1": planet1, "planet2": planet2,
+            "aspect_type": self.rng.choice(ASPECTS), "month": month, "day": day,
+        }
+        return "/api/vedic/aspect-search", "/api/vedic/aspect-search", params
+
+
+# Traffic methods a mix can weight
+KINDS = ("events", "today_events", "chart", "correlations", "search")
+
+# Mix name -> relative weight of each kind of request
+MIXES: Dict[str, Dict[str, int]] = {
+    "default": {"events": 35, "today_events": 10, "chart": 25, "correlations": 10, "search": 20},
+    "browse": {"events": 70, "today_events": 20, "chart": 10},
+    "today-burst": {"today_events": 20, "correlations": 80},
+    "search": {"search": 80, "chart": 20},
+}
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """A named mix, or weights given as kind=weight,kind=weight"""
+    if value in MIXES:
+        return MIXES[value]
+    mix = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in KINDS or not weight.strip().isdigit():
+            raise argparse.ArgumentTypeError(f"Invalid mix entry: {part}")
+        mix[kind.strip()] = int(weight)
+    return mix
+
+
+# ---------------------------------------------------------------------------
+# Load generation and report
+# ---------------------------------------------------------------------------
+
+class Recorder:
+    """Latencies and statuses per route"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def add(self, route: str, seconds: float, error: Optional[str] = None):
+        self.latencies[route].append(seconds)
+        if error:
+            self.errors[route][error] += 1
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def report(recorder: Recorder, elapsed: float) -> dict:
+    """Throughput, p50/p95/p99 in milliseconds and error rates, per route and overall"""
+    def summarize(latencies: List[float], errors: Dict[str, int]) -> dict:
+        values = sorted(latencies)
+        failed = sum(errors.values())
+        return {
+            "requests": len(values),
+            "throughput": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "error_rate": round(failed / len(values), 4) if values else 0.0,
+            "errors": dict(errors),
+        }
+
+    all_errors: Dict[str, int] = defaultdict(int)
+    for errors in recorder.errors.values():
+        for status, count in errors.items():
+            all_errors[status] += count
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "overall": summarize([v for values in recorder.latencies.values() for v in values], all_errors),
+        "routes": {
+            route: summarize(latencies, recorder.errors.get(route, {}))
+            for route, latencies in sorted(recorder.latencies.items())
+        },
+    }
+
+
+def print_report(result: dict):
+    header = f"{'route':<42}{'reqs':>7}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    rows = list(result["routes"].items()) + [("overall", result["overall"])]
+    for route, s in rows:
+        print(f"{route:<42}{s['requests']:>7}{s['throughput']:>9}{s['p50_ms']:>9}"
+              f"{s['p95_ms']:>9}{s['p99_ms']:>9}{s['error_rate'] * 100:>7.1f}%")
+    print(f"\n{result['elapsed_s']} s; latencies in ms")
+
+
+async def generate_load(
+    base_url: str,
+    mix: Dict[str, int],
+    duration: float,
+    concurrency: int,
+    rate: Optional[float] = None,
+    days: int = 30,
+    timeout: float = 30.0,
+    seed: Optional[int] = None,
+) -> dict:
+    """
+    Send requests drawn from the mix for `duration` seconds and report on them.
+    Without a rate, `concurrency` clients each send their next request as soon as
+    the last one completes (closed loop). With a rate, requests arrive at random
+    (Poisson) at that many per second regardless of how fast they complete
+    (open loop), with at most `concurrency` in flight.
+    """
+    traffic = Traffic(days, seed)
+    kinds: List[Callable[[], Request]] = [getattr(traffic, kind) for kind in mix]
+    weights = list(mix.values())
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def send():
+            route, path, params = traffic.rng.choices(kinds, weights)[0]()
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, params=params)
+                error = None if response.status_code < 400 else str(response.status_code)
+            except httpx.HTTPError as e:
+                error = type(e).__name__
+            recorder.add(route, time.perf_counter() - start, error)
+
+        started = time.perf_counter()
+        deadline = started + duration
+
+        if rate is None:
+            async def client_loop():
+                while time.perf_counter() < deadline:
+                    await send()
+
+            await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        else:
+            in_flight = asyncio.Semaphore(concurrency)
+            tasks = set()
+
+            async def bounded():
+                async with in_flight:
+                    await send()
+
+            while time.perf_counter() < deadline:
+                task = asyncio.ensure_future(bounded())
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                await asyncio.sleep(traffic.rng.expovariate(rate))
+            await asyncio.gather(*tasks)
+
+        return report(recorder, time.perf_counter() - started)
+
+
+async def wait_until_up(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise SystemExit(f"{url} did not come up within {timeout} s")
+                await asyncio.sleep(0.2)
+
+
+async def run(args) -> dict:
+    """Run a load test, first starting the stand-in and the app if asked to"""
+    if not args.start:
+        return await generate_load(args.base_url, args.mix, args.duration, args.concurrency,
+                                   args.rate, args.days, seed=args.seed)
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    stand_in_command = [
+        sys.executable, os.path.join(here, "loadtest.py"), "stand-in",
+        "--fixtures", args.fixtures, "--stand-in-port", str(args.stand_in_port),
+        "--latency", str(args.latency), "--jitter", str(args.jitter), "--error-rate", str(args.error_rate),
+    ]
+    if args.seed is not None:
+        stand_in_command += ["--seed", str(args.seed)]
+    env = dict(os.environ, ONTHISDAY_URL=f"http://127.0.0.1:{args.stand_in_port}/feed/{{month:02d}}/{{day:02d}}")
+    app_command = [
+        sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.app_port),
+        "--workers", str(args.workers), "--log-level", "warning",
+    ]
+    # Separate processes, so the load generator does not compete with either for the event loop
+    processes = [subprocess.Popen(stand_in_command), subprocess.Popen(app_command, cwd=here, env=env)]
+    try:
+        base_url = f"http://127.0.0.1:{args.app_port}"
+        await wait_until_up(f"http://127.0.0.1:{args.stand_in_port}/")
+        await wait_until_up(base_url + "/")
+        return await generate_load(base_url, args.mix, args.duration, args.concurrency,
+                                   args.rate, args.days, seed=args.seed)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load testing against a local Wikipedia stand-in")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_stand_in_options(sub):
+        sub.add_argument("--fixtures", default="data/fixtures", help="Directory of recorded feeds")
+        sub.add_argument("--stand-in-port", type=int, default=STAND_IN_PORT)
+        sub.add_argument("--latency", type=float, default=0.0, help="Seconds before each response")
+        sub.add_argument("--jitter", type=float, default=0.0, help="Random +/- seconds on the latency")
+        sub.add_argument("--error-rate", type=float, default=0.0, help="Fraction of responses that are 503s")
+
+    stand_in = subparsers.add_parser("stand-in", help="Serve recorded feeds in place of Wikipedia")
+    add_stand_in_options(stand_in)
+    stand_in.add_argument("--seed", type=int)
+
+    load = subparsers.add_parser("run", help="Generate load and report per-route latencies")
+    load.add_argument("--base-url", default=f"http://127.0.0.1:{APP_PORT}")
+    load.add_argument("--mix", type=parse_mix, default="default",
+                      help=f"One of {', '.join(MIXES)}, or weights like events=3,chart=1")
+    load.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    load.add_argument("--concurrency", type=int, default=20, help="Clients, or maximum requests in flight with --rate")
+    load.add_argument("--rate", type=float, help="Open-loop arrival rate in requests per second")
+    load.add_argument("--days", type=int, default=30, help="Distinct calendar days requested")
+    load.add_argument("--seed", type=int)
+    load.add_argument("--json", help="Also write the report to this file")
+    load.add_argument("--start", action="store_true", help="Start the stand-in and the app first")
+    load.add_argument("--app-port", type=int, default=APP_PORT)
+    load.add_argument("--workers", type=int, default=1, help="App worker processes with --start")
+    add_stand_in_options(load)
+    args = parser.parse_args(argv)
+
+    if args.command == "stand-in":
+        print(f"Serving recorded feeds on http://127.0.0.1:{args.stand_in_port}/feed/MM/DD", flush=True)
+        try:
+            asyncio.run(serve_stand_in(args.fixtures, port=args.stand_in_port, latency=args.latency,
+                                       jitter=args.jitter, error_rate=args.error_rate, seed=args.seed))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "run":
+        result = asyncio.run(run(args))
+        print_report(result)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
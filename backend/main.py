@@ -3,29 +3,71 @@ This Day in History - Vedic Edition
 FastAPI Backend Server
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime, date
+from fastapi.responses import Response, StreamingResponse
+from contextlib import asynccontextmanager
+from datetime import datetime, date, timedelta
 from typing import Optional, List
+import asyncio
+import hashlib
+import json
 import httpx
+import numpy as np
 import os
+import secrets
 from pydantic import BaseModel
 
 from vedic_calc import (
     get_vedic_chart,
     get_planetary_signatures,
     find_matching_signatures,
-    calculate_correlation_score,
     calculate_planetary_positions,
+    calculate_tropical_batch,
     calculate_aspects,
+    match_counts,
+    MATCH_COLUMNS,
+    MATCH_TYPES,
+    PLANET_NAMES,
+    SIGNATURE_WEIGHTS,
+    AYANAMSHAS,
+    DEFAULT_AYANAMSHA,
     RASHIS,
     NAKSHATRAS,
 )
+from classification import COUNTRIES, REGIONS
+from feed import get_day_feed, process_feed
+from cache import CoalescingCache, cache_size
+from pagination import decode_cursor, next_cursor
+from day_index import DayIndex
+from prediction import scan_upcoming_dates
+from dasha import get_dasha_timeline
+import export
+import tiles
+from timescale import julian_days
+from intraday import calculate_day_samples, window_fractions, window_matches
+from houses import COUNTRY_COORDINATES, country_location, get_house_chart, house_signatures_batch
+from panchanga import get_panchanga, calculate_panchanga_range
+from stats_cube import CATEGORIES, REGION_NAMES
+from corpus import MIN_YEAR
+from event_store import get_event_store
+from similarity import get_similarity_graph
+from warmup import WarmupScheduler
+from admission import AdmissionController, AdmissionMiddleware
+from profiles import get_profile_store, merge_profiles, parse_weights, profile_vector, BUILTIN_PROFILES
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup_scheduler.start()
+    yield
+    await warmup_scheduler.stop()
+
 
 app = FastAPI(
     title="This Day in History API",
     description="API for historical events with Vedic astronomical data",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration - allow frontend origins
@@ -38,6 +80,10 @@ env_origins = os.environ.get("ALLOWED_ORIGINS", "")
 if env_origins:
     default_origins.extend([o.strip() for o in env_origins.split(",") if o.strip()])
 
+# Inside CORS, so rejections carry CORS headers too
+admission_controller = AdmissionController()
+app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=default_origins + ["*"],  # Allow all origins for API access
@@ -61,230 +107,124 @@ class WikipediaResponse(BaseModel):
     deaths: List[HistoricalEvent]
 
 
-def categorize_event(text: str) -> str:
-    """Categorize historical events based on keywords"""
-    text_lower = text.lower()
-    
-    # Battle/War keywords
-    if any(word in text_lower for word in ['war', 'battle', 'invasion', 'siege', 'military', 'army', 'troops', 'conflict', 'revolt', 'rebellion']):
-        return 'battle'
-    
-    # Political/Coronation keywords
-    if any(word in text_lower for word in ['king', 'queen', 'emperor', 'coronation', 'throne', 'crowned', 'dynasty', 'kingdom', 'empire', 'president', 'prime minister', 'elected']):
-        return 'political'
-    
-    # Discovery/Science keywords
-    if any(word in text_lower for word in ['discover', 'invent', 'scientist', 'astronomer', 'patent', 'theory', 'experiment', 'research', 'observatory']):
-        return 'discovery'
-    
-    # Religious keywords
-    if any(word in text_lower for word in ['temple', 'church', 'mosque', 'religious', 'pope', 'saint', 'monastery', 'pilgrimage', 'sacred']):
-        return 'religious'
-    
-    # Natural disasters
-    if any(word in text_lower for word in ['earthquake', 'flood', 'tsunami', 'volcano', 'hurricane', 'cyclone', 'disaster', 'famine']):
-        return 'disaster'
-    
-    # Cultural/Arts
-    if any(word in text_lower for word in ['art', 'music', 'literature', 'poet', 'writer', 'composer', 'theater', 'film', 'published']):
-        return 'cultural'
-    
-    return 'general'
-
-
-# Country and region detection
-COUNTRIES = {
-    # Asia
-    'India': ['india', 'indian', 'delhi', 'mumbai', 'calcutta', 'kolkata', 'chennai', 'madras', 'bengal', 'punjab', 'gujarat', 'rajasthan', 'maharashtra', 'tamil', 'kerala', 'mughal', 'maratha', 'vijayanagara', 'chola', 'maurya', 'gupta'],
-    'China': ['china', 'chinese', 'beijing', 'peking', 'shanghai', 'ming', 'qing', 'tang', 'song', 'han dynasty', 'tibet', 'manchuria'],
-    'Japan': ['japan', 'japanese', 'tokyo', 'kyoto', 'osaka', 'shogun', 'samurai', 'meiji', 'edo'],
-    'Korea': ['korea', 'korean', 'seoul', 'pyongyang', 'joseon'],
-    'Vietnam': ['vietnam', 'vietnamese', 'hanoi', 'saigon'],
-    'Thailand': ['thailand', 'thai', 'siam', 'bangkok'],
-    'Indonesia': ['indonesia', 'indonesian', 'java', 'sumatra', 'jakarta', 'batavia'],
-    'Philippines': ['philippines', 'filipino', 'manila'],
-    'Malaysia': ['malaysia', 'malaysian', 'malaya', 'kuala lumpur'],
-    'Singapore': ['singapore'],
-    'Myanmar': ['myanmar', 'burma', 'burmese', 'rangoon', 'yangon'],
-    'Pakistan': ['pakistan', 'pakistani', 'karachi', 'lahore', 'islamabad'],
-    'Bangladesh': ['bangladesh', 'bangladeshi', 'dhaka', 'east pakistan'],
-    'Sri Lanka': ['sri lanka', 'ceylon', 'sinhalese', 'colombo'],
-    'Nepal': ['nepal', 'nepalese', 'kathmandu'],
-    'Afghanistan': ['afghanistan', 'afghan', 'kabul', 'kandahar'],
-    
-    # Middle East
-    'Iran': ['iran', 'iranian', 'persia', 'persian', 'tehran', 'isfahan', 'safavid'],
-    'Iraq': ['iraq', 'iraqi', 'baghdad', 'babylon', 'mesopotamia', 'basra'],
-    'Saudi Arabia': ['saudi', 'arabia', 'arabian', 'mecca', 'medina', 'riyadh'],
-    'Turkey': ['turkey', 'turkish', 'ottoman', 'constantinople', 'istanbul', 'ankara', 'anatolia'],
-    'Israel': ['israel', 'israeli', 'jerusalem', 'tel aviv', 'judea', 'palestine', 'palestinian'],
-    'Egypt': ['egypt', 'egyptian', 'cairo', 'alexandria', 'pharaoh', 'nile'],
-    'Syria': ['syria', 'syrian', 'damascus', 'aleppo'],
-    'Lebanon': ['lebanon', 'lebanese', 'beirut'],
-    'Jordan': ['jordan', 'jordanian', 'amman'],
-    
-    # Europe
-    'United Kingdom': ['britain', 'british', 'england', 'english', 'scotland', 'scottish', 'wales', 'welsh', 'ireland', 'irish', 'london', 'edinburgh', 'uk', 'united kingdom'],
-    'France': ['france', 'french', 'paris', 'versailles', 'normandy', 'gaul', 'napoleon', 'bourbon'],
-    'Germany': ['germany', 'german', 'berlin', 'prussia', 'prussian', 'bavaria', 'saxon', 'holy roman'],
-    'Italy': ['italy', 'italian', 'rome', 'roman', 'venice', 'venetian', 'florence', 'milan', 'naples', 'papal', 'vatican'],
-    'Spain': ['spain', 'spanish', 'madrid', 'castile', 'aragon', 'habsburg', 'seville', 'barcelona'],
-    'Portugal': ['portugal', 'portuguese', 'lisbon'],
-    'Netherlands': ['netherlands', 'dutch', 'holland', 'amsterdam', 'rotterdam'],
-    'Belgium': ['belgium', 'belgian', 'brussels', 'flanders'],
-    'Austria': ['austria', 'austrian', 'vienna', 'habsburg'],
-    'Switzerland': ['switzerland', 'swiss', 'geneva', 'zurich'],
-    'Poland': ['poland', 'polish', 'warsaw', 'krakow'],
-    'Russia': ['russia', 'russian', 'moscow', 'st petersburg', 'soviet', 'ussr', 'czar', 'tsar', 'romanov'],
-    'Ukraine': ['ukraine', 'ukrainian', 'kiev', 'kyiv'],
-    'Greece': ['greece', 'greek', 'athens', 'sparta', 'byzantine', 'macedon'],
-    'Sweden': ['sweden', 'swedish', 'stockholm'],
-    'Norway': ['norway', 'norwegian', 'oslo', 'viking'],
-    'Denmark': ['denmark', 'danish', 'copenhagen'],
-    'Finland': ['finland', 'finnish', 'helsinki'],
-    'Hungary': ['hungary', 'hungarian', 'budapest', 'magyar'],
-    'Czech Republic': ['czech', 'bohemia', 'bohemian', 'prague'],
-    'Romania': ['romania', 'romanian', 'bucharest', 'wallachia'],
-    'Bulgaria': ['bulgaria', 'bulgarian', 'sofia'],
-    'Serbia': ['serbia', 'serbian', 'belgrade', 'yugoslavia'],
-    
-    # Americas
-    'United States': ['united states', 'america', 'american', 'usa', 'u.s.', 'washington', 'new york', 'california', 'texas', 'congress', 'president'],
-    'Canada': ['canada', 'canadian', 'toronto', 'montreal', 'ottawa', 'quebec'],
-    'Mexico': ['mexico', 'mexican', 'aztec', 'maya'],
-    'Brazil': ['brazil', 'brazilian', 'rio', 'sao paulo'],
-    'Argentina': ['argentina', 'argentine', 'buenos aires'],
-    'Peru': ['peru', 'peruvian', 'lima', 'inca'],
-    'Colombia': ['colombia', 'colombian', 'bogota'],
-    'Chile': ['chile', 'chilean', 'santiago'],
-    'Cuba': ['cuba', 'cuban', 'havana'],
-    
-    # Africa
-    'South Africa': ['south africa', 'south african', 'cape town', 'johannesburg', 'zulu', 'boer'],
-    'Nigeria': ['nigeria', 'nigerian', 'lagos'],
-    'Ethiopia': ['ethiopia', 'ethiopian', 'abyssinia', 'addis ababa'],
-    'Morocco': ['morocco', 'moroccan', 'marrakesh'],
-    'Algeria': ['algeria', 'algerian', 'algiers'],
-    'Tunisia': ['tunisia', 'tunisian', 'tunis', 'carthage'],
-    'Libya': ['libya', 'libyan', 'tripoli'],
-    'Sudan': ['sudan', 'sudanese', 'khartoum'],
-    'Kenya': ['kenya', 'kenyan', 'nairobi'],
-    
-    # Oceania
-    'Australia': ['australia', 'australian', 'sydney', 'melbourne'],
-    'New Zealand': ['new zealand', 'zealand', 'auckland', 'wellington', 'maori'],
-}
-
-REGIONS = {
-    'South Asia': ['India', 'Pakistan', 'Bangladesh', 'Sri Lanka', 'Nepal', 'Afghanistan'],
-    'East Asia': ['China', 'Japan', 'Korea'],
-    'Southeast Asia': ['Vietnam', 'Thailand', 'Indonesia', 'Philippines', 'Malaysia', 'Singapore', 'Myanmar'],
-    'Middle East': ['Iran', 'Iraq', 'Saudi Arabia', 'Turkey', 'Israel', 'Egypt', 'Syria', 'Lebanon', 'Jordan'],
-    'Western Europe': ['United Kingdom', 'France', 'Germany', 'Italy', 'Spain', 'Portugal', 'Netherlands', 'Belgium'],
-    'Eastern Europe': ['Russia', 'Ukraine', 'Poland', 'Hungary', 'Czech Republic', 'Romania', 'Bulgaria', 'Serbia'],
-    'Northern Europe': ['Sweden', 'Norway', 'Denmark', 'Finland'],
-    'North America': ['United States', 'Canada', 'Mexico'],
-    'South America': ['Brazil', 'Argentina', 'Peru', 'Colombia', 'Chile'],
-    'Africa': ['South Africa', 'Nigeria', 'Ethiopia', 'Morocco', 'Algeria', 'Tunisia', 'Libya', 'Sudan', 'Kenya', 'Egypt'],
-    'Oceania': ['Australia', 'New Zealand'],
-}
-
-
-def detect_countries(text: str) -> List[str]:
-    """Detect countries mentioned in event text"""
-    text_lower = text.lower()
-    detected = []
-    
-    for country, keywords in COUNTRIES.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                if country not in detected:
-                    detected.append(country)
-                break
-    
-    return detected
-
-
-def get_region(country: str) -> Optional[str]:
-    """Get region for a country"""
-    for region, countries in REGIONS.items():
-        if country in countries:
-            return region
-    return None
+class EventSubmission(BaseModel):
+    month: int
+    day: int
+    year: int
+    text: str
+    links: Optional[List[dict]] = None
 
 
 async def fetch_wikipedia_events(month: int, day: int) -> dict:
     """Fetch historical events from Wikipedia API"""
-    # Use zero-padded month and day for Wikipedia REST API
-    url = f"https://en.wikipedia.org/api/rest_v1/feed/onthisday/all/{month:02d}/{day:02d}"
+    try:
+        _, data = await get_day_feed(month, day)
+        
+        # Only the newest births and deaths are kept, so only those are classified
+        events = process_feed(data, "events", region=True)
+        births = process_feed(data, "births", limit=20, category="birth", links=2)
+        deaths = process_feed(data, "deaths", limit=20, category="death", links=2)
+        all_countries = {country for event in events for country in event["countries"]}
+        
+        # User-contributed events for this day
+        for contributed in get_event_store().events_for_day(month, day, source="user"):
+            all_countries.update(contributed["countries"])
+            events.append({
+                "id": contributed["id"],
+                "year": contributed["year"],
+                "text": contributed["text"],
+                "category": contributed["category"],
+                "countries": contributed["countries"],
+                "region": contributed["region"],
+                "links": contributed.get("links", [])[:3],
+                "source": "user",
+            })
+        
+        return {
+            "date": f"{month:02d}-{day:02d}",
+            "events": sorted(events, key=lambda x: x["year"], reverse=True),
+            "births": births,
+            "deaths": deaths,
+            "available_countries": sorted(list(all_countries)),
+        }
+        
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=503, detail=f"Wikipedia API error: {str(e)}")
+
+
+async def day_data_version(month: int, day: int) -> tuple:
+    """
+    Version of the data behind a day's events: the Wikipedia feed's content and
+    the day's latest change in the event log (changes to other days leave it be)
+    """
+    try:
+        feed_version, _ = await get_day_feed(month, day)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=503, detail=f"Wikipedia API error: {str(e)}")
+    return (feed_version, get_event_store().day_seq(month, day))
+
+
+# Computed correlation and search results, keyed on normalized parameters and
+# the day's data version; concurrent identical requests share one computation
+result_cache = CoalescingCache(cache_size("results", 256))
+
+# Processed days with their filter indexes, keyed the same way
+day_index_cache = CoalescingCache(cache_size("days", 64))
+
+
+async def get_day_index(month: int, day: int) -> DayIndex:
+    """A day's processed events, indexed for filtering"""
+    version = await day_data_version(month, day)
     
-    headers = {
-        "User-Agent": "ThisDayInHistory/1.0 (contact@example.com)"
-    }
+    async def compute():
+        return DayIndex(await fetch_wikipedia_events(month, day))
     
-    async with httpx.AsyncClient() as client:
+    return await day_index_cache.get_or_compute((month, day, version), compute)
+
+
+def date_events(events: List[dict], month: int, day: int) -> List[tuple]:
+    """(event, noon of its date) for each event whose date exists"""
+    dated_events = []
+    for event in events:
+        # Create datetime for the historical event
         try:
-            response = await client.get(url, headers=headers, timeout=10.0)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Process and categorize events
-            events = []
-            all_countries = set()
-            for event in data.get("events", []):
-                # Filter for last 1500 years (from ~525 CE)
-                year = event.get("year", 0)
-                if year >= 525:
-                    text = event.get("text", "")
-                    countries = detect_countries(text)
-                    all_countries.update(countries)
-                    events.append({
-                        "year": year,
-                        "text": text,
-                        "category": categorize_event(text),
-                        "countries": countries,
-                        "region": get_region(countries[0]) if countries else None,
-                        "links": event.get("pages", [])[:3]  # Limit links
-                    })
-            
-            births = []
-            for birth in data.get("births", []):
-                year = birth.get("year", 0)
-                if year >= 525:
-                    text = birth.get("text", "")
-                    countries = detect_countries(text)
-                    births.append({
-                        "year": year,
-                        "text": text,
-                        "category": "birth",
-                        "countries": countries,
-                        "links": birth.get("pages", [])[:2]
-                    })
-            
-            deaths = []
-            for death in data.get("deaths", []):
-                year = death.get("year", 0)
-                if year >= 525:
-                    text = death.get("text", "")
-                    countries = detect_countries(text)
-                    deaths.append({
-                        "year": year,
-                        "text": text,
-                        "category": "death",
-                        "countries": countries,
-                        "links": death.get("pages", [])[:2]
-                    })
-            
-            return {
-                "date": f"{month:02d}-{day:02d}",
-                "events": sorted(events, key=lambda x: x["year"], reverse=True),
-                "births": sorted(births, key=lambda x: x["year"], reverse=True)[:20],
-                "deaths": sorted(deaths, key=lambda x: x["year"], reverse=True)[:20],
-                "available_countries": sorted(list(all_countries)),
-            }
-            
-        except httpx.HTTPError as e:
-            raise HTTPException(status_code=503, detail=f"Wikipedia API error: {str(e)}")
+            dated_events.append((event, datetime(event["year"], month, day, 12, 0)))
+        except ValueError:
+            continue  # Skip invalid dates (e.g., Feb 29 in non-leap years)
+    return dated_events
+
+
+async def get_day_charts(month: int, day: int, version: tuple) -> List[tuple]:
+    """
+    A day's events with their dates and tropical longitudes, all calculated in
+    one batch that also fills the cache the correlation and search scans read,
+    so however many of them run over a day, under whichever ayanamshas, its
+    charts are computed once
+    """
+    async def compute():
+        dated_events = date_events((await get_day_index(month, day)).payload["events"], month, day)
+        longitudes, _ = await asyncio.to_thread(
+            calculate_tropical_batch, [event_date for _, event_date in dated_events]
+        )
+        return [(event, event_date, row) for (event, event_date), row in zip(dated_events, longitudes)]
+    
+    return await result_cache.get_or_compute(("charts", month, day, version), compute)
+
+
+async def get_day_samples(month: int, day: int, version: tuple) -> tuple:
+    """
+    A day's events and longitudes through the whole day of each of those with a
+    date (see intraday.calculate_day_samples), in one batch, for matching
+    placements held at any time that day; tropical, so shared by every
+    ayanamsha. Samples follow the events' order, so the two are used together.
+    """
+    async def compute():
+        events = (await get_day_index(month, day)).payload["events"]
+        dated_events = date_events(events, month, day)
+        samples = await asyncio.to_thread(calculate_day_samples, [event_date for _, event_date in dated_events])
+        return events, samples
+    
+    return await result_cache.get_or_compute(("day-samples", month, day, version), compute)
 
 
 @app.get("/")
@@ -293,11 +233,35 @@ async def root():
     return {"status": "ok", "message": "This Day in History API"}
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Admission control metrics in the Prometheus text format"""
+    return Response(admission_controller.metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api/today")
 async def get_today():
     """Get historical events for today's date"""
     today = date.today()
-    return await fetch_wikipedia_events(today.month, today.day)
+    return (await get_day_index(today.month, today.day)).payload
+
+
+@app.get("/api/events/{event_id}/similar")
+async def get_similar_events(
+    event_id: str,
+    limit: int = Query(10, description="Maximum number of events"),
+):
+    """Events from the dates whose charts most resemble this event's date"""
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="Limit must be at least 1")
+    store = get_event_store()
+    event = store.get(event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    graph = get_similarity_graph(store)
+    if graph is None:
+        raise HTTPException(status_code=503, detail="Similar-events graph has not been built")
+    return {"event": event, "similar": graph.similar(store, event, limit)}
 
 
 @app.get("/api/events/{month}/{day}")
@@ -317,34 +281,92 @@ async def get_events_by_date(
     if not (1 <= day <= 31):
         raise HTTPException(status_code=400, detail="Day must be between 1 and 31")
     
-    data = await fetch_wikipedia_events(month, day)
-    
-    # Apply filters
-    if category:
-        data["events"] = [e for e in data["events"] if e["category"] == category]
-    
-    if year_from:
-        data["events"] = [e for e in data["events"] if e["year"] >= year_from]
-        data["births"] = [e for e in data["births"] if e["year"] >= year_from]
-        data["deaths"] = [e for e in data["deaths"] if e["year"] >= year_from]
-    
-    if year_to:
-        data["events"] = [e for e in data["events"] if e["year"] <= year_to]
-        data["births"] = [e for e in data["births"] if e["year"] <= year_to]
-        data["deaths"] = [e for e in data["deaths"] if e["year"] <= year_to]
-    
-    if country:
-        data["events"] = [e for e in data["events"] if country in e.get("countries", [])]
-        data["births"] = [e for e in data["births"] if country in e.get("countries", [])]
-        data["deaths"] = [e for e in data["deaths"] if country in e.get("countries", [])]
-    
-    if region:
-        region_countries = REGIONS.get(region, [])
-        data["events"] = [e for e in data["events"] if any(c in region_countries for c in e.get("countries", []))]
-        data["births"] = [e for e in data["births"] if any(c in region_countries for c in e.get("countries", []))]
-        data["deaths"] = [e for e in data["deaths"] if any(c in region_countries for c in e.get("countries", []))]
-    
-    return data
+    index = await get_day_index(month, day)
+    return index.filter(category, year_from, year_to, country, region)
+
+
+def validate_submission(submission: EventSubmission):
+    """Reject submissions that could not be charted or shown"""
+    try:
+        datetime(submission.year, submission.month, submission.day)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {str(e)}")
+    if submission.year < MIN_YEAR:
+        raise HTTPException(status_code=400, detail=f"Year must be {MIN_YEAR} or later")
+    if not submission.text.strip():
+        raise HTTPException(status_code=400, detail="Text must not be empty")
+
+
+@app.post("/api/events", status_code=201)
+async def add_event(submission: EventSubmission):
+    """Add a user-contributed event; statistics and indexes update immediately"""
+    validate_submission(submission)
+    try:
+        return get_event_store().add(
+            submission.month, submission.day, submission.year, submission.text.strip(), submission.links
+        )
+    except KeyError:
+        raise HTTPException(status_code=409, detail="Event already exists")
+
+
+@app.get("/api/events/{event_id}")
+async def get_event(event_id: str):
+    """Get a single event by id"""
+    event = get_event_store().get(event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return event
+
+
+def has_admin_token(admin_token: Optional[str], variable: str) -> bool:
+    """Whether a request's X-Admin-Token matches the token in an environment variable (never if it is unset)"""
+    expected = os.environ.get(variable, "")
+    return bool(expected) and secrets.compare_digest((admin_token or "").encode(), expected.encode())
+
+
+def authorize_change(event_id: str, admin_token: Optional[str]):
+    """
+    User-contributed events may be changed by anyone; others (from Wikipedia)
+    only with the X-Admin-Token header matching EVENTS_ADMIN_TOKEN, and by no
+    one if it is unset
+    """
+    event = get_event_store().get(event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    if event.get("source", "wikipedia") == "user":
+        return
+    if not has_admin_token(admin_token, "EVENTS_ADMIN_TOKEN"):
+        raise HTTPException(status_code=403, detail="Only user-contributed events can be changed without an admin token")
+
+
+@app.put("/api/events/{event_id}")
+async def edit_event(
+    event_id: str,
+    submission: EventSubmission,
+    x_admin_token: Optional[str] = Header(None, description="EVENTS_ADMIN_TOKEN, required for events not contributed by users"),
+):
+    """Edit an event; statistics and indexes update immediately"""
+    validate_submission(submission)
+    authorize_change(event_id, x_admin_token)
+    try:
+        return get_event_store().edit(
+            event_id, submission.month, submission.day, submission.year, submission.text.strip(), submission.links
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+
+@app.delete("/api/events/{event_id}")
+async def delete_event(
+    event_id: str,
+    x_admin_token: Optional[str] = Header(None, description="EVENTS_ADMIN_TOKEN, required for events not contributed by users"),
+):
+    """Remove an event; statistics and indexes update immediately"""
+    authorize_change(event_id, x_admin_token)
+    try:
+        return get_event_store().remove(event_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Event not found")
 
 
 @app.get("/api/countries")
@@ -373,101 +395,295 @@ async def get_categories():
 
 
 @app.get("/api/vedic/chart/{month}/{day}/{year}")
-async def get_vedic_chart_for_date(month: int, day: int, year: int):
+async def get_vedic_chart_for_date(
+    month: int,
+    day: int,
+    year: int,
+    country: Optional[str] = Query(None, description="Country whose coordinates place the chart (adds Lagna and houses)"),
+    ayanamsha: Optional[str] = Query(None, description="Ayanamsha system: lahiri (default), raman, kp or yukteshwar"),
+):
     """Get Vedic chart for a specific date"""
+    location = country_coordinates(country)
+    system = ayanamsha_system(ayanamsha)
     try:
         dt = datetime(year, month, day, 12, 0)  # Use noon
-        chart = get_vedic_chart(dt)
-        return chart
+        chart = get_vedic_chart(dt, system)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid date: {str(e)}")
+    if location:
+        chart = {**chart, "houses": get_house_chart(dt, location, system)}
+    return chart
 
 
 @app.get("/api/vedic/today")
-async def get_vedic_chart_today():
+async def get_vedic_chart_today(
+    ayanamsha: Optional[str] = Query(None, description="Ayanamsha system: lahiri (default), raman, kp or yukteshwar"),
+):
     """Get Vedic chart for today"""
     now = datetime.now()
-    chart = get_vedic_chart(now)
+    chart = get_vedic_chart(now, ayanamsha_system(ayanamsha))
     return chart
 
 
-@app.get("/api/vedic/correlations/{month}/{day}")
-async def get_correlated_events(
+@app.get("/api/vedic/panchanga/{month}/{day}/{year}")
+async def get_panchanga_for_date(
     month: int,
     day: int,
-    year: Optional[int] = Query(None, description="Year for the reference date (defaults to current year)"),
-    hour: Optional[int] = Query(12, description="Hour of day (0-23)"),
-    min_score: int = Query(3, description="Minimum correlation score"),
-    limit: int = Query(20, description="Maximum number of correlated events")
+    year: int,
+    ayanamsha: Optional[str] = Query(None, description="Ayanamsha system: lahiri (default), raman, kp or yukteshwar"),
 ):
-    """
-    Get historical events that have matching Vedic astrological signatures with the selected date.
+    """Get the Panchanga (tithi, vara, nakshatra, yoga, karana) for a date, times in UT"""
+    try:
+        selected = date(year, month, day)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {str(e)}")
+    return await asyncio.to_thread(get_panchanga, selected, ayanamsha_system(ayanamsha))
+
+
+@app.get("/api/vedic/panchanga")
+async def get_panchanga_for_range(
+    from_date: str = Query(..., alias="from", description="First date (YYYY-MM-DD)"),
+    to_date: str = Query(..., alias="to", description="Last date, inclusive (YYYY-MM-DD)"),
+    ayanamsha: Optional[str] = Query(None, description="Ayanamsha system: lahiri (default), raman, kp or yukteshwar"),
+):
+    """Get the Panchanga for every day in a date range (up to 10 years)"""
+    try:
+        start = date.fromisoformat(from_date)
+        end = date.fromisoformat(to_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {str(e)}")
     
-    This endpoint:
-    1. Calculates the selected date's planetary positions (rashis, nakshatras, aspects, conjunctions)
-    2. For each historical event on this date, calculates the Vedic chart for that year
-    3. Finds events where planetary patterns match (e.g., Saturn in Ashwini on selected date → events when Saturn was also in Ashwini)
-    4. Returns events sorted by correlation score
+    days = (end - start).days + 1
+    if not (1 <= days <= 3660):
+        raise HTTPException(status_code=400, detail="Range must cover between 1 and 3660 days")
+    system = ayanamsha_system(ayanamsha)
+    # Up to ten years of daily samples: compute off the event loop
+    panchanga_days = await asyncio.to_thread(calculate_panchanga_range, start, days, system)
+    
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "ayanamsha": system,
+        "days": panchanga_days,
+    }
+
+
+@app.get("/api/vedic/tiles")
+async def get_tile_info():
+    """Version and year range of the ephemeris tiles; request tiles with ?v=version"""
+    return {"version": tiles.tile_version(), "min_year": tiles.MIN_YEAR, "max_year": tiles.MAX_YEAR}
+
+
+@app.get("/api/vedic/tiles/{year}.bin")
+async def get_ephemeris_tile(
+    year: int,
+    v: Optional[str] = Query(None, description="Tile version from /api/vedic/tiles; versioned tiles may be cached forever"),
+):
+    """A year's tropical longitudes of every planet as a binary tile, with the Lahiri ayanamsha in its header (layout in tiles.py)"""
+    if not (tiles.MIN_YEAR <= year <= tiles.MAX_YEAR):
+        raise HTTPException(status_code=400, detail=f"Year must be between {tiles.MIN_YEAR} and {tiles.MAX_YEAR}")
+    version = tiles.tile_version()
+    tile = await asyncio.to_thread(tiles.get_tile, year)
+    # A tile only changes with its version, so a URL naming the current version never changes
+    cache_control = "public, max-age=31536000, immutable" if v == version else "public, max-age=3600"
+    return Response(
+        content=tile,
+        media_type="application/octet-stream",
+        headers={"Cache-Control": cache_control, "ETag": f'"{version}-{year}"'},
+    )
+
+
+@app.get("/api/vedic/export")
+async def export_transits(
+    from_date: str = Query(..., alias="from", description="First date (YYYY-MM-DD)"),
+    to_date: str = Query(..., alias="to", description="Last date, inclusive (YYYY-MM-DD)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields: longitude, rashi, nakshatra, pada, dignity, tithi, yoga, karana, vara"),
+    format: str = Query("csv", description="csv, or columnar (JSON lines of dictionary-encoded row groups)"),
+    hour: int = Query(12, description="Hour of each day's chart (0-23, UT)"),
+    ayanamsha: Optional[str] = Query(None, description="Ayanamsha system: lahiri (default), raman, kp or yukteshwar"),
+):
     """
+    Stream a daily transit table for a date range, computed and sent a chunk of days
+    at a time, so any range up to 3000 years is served in constant memory
+    """
+    try:
+        start = date.fromisoformat(from_date)
+        end = date.fromisoformat(to_date)
+        selected = export.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if format not in export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(export.FORMATS)}")
+    if not (0 <= hour <= 23):
+        raise HTTPException(status_code=400, detail="Hour must be between 0 and 23")
+    system = ayanamsha_system(ayanamsha)
+    
+    first_jd, days = export.day_range(start, end, hour)
+    if not (1 <= days <= export.MAX_DAYS):
+        raise HTTPException(status_code=400, detail=f"Range must cover between 1 and {export.MAX_DAYS} days")
     
+    extension, media_type = ("csv", "text/csv") if format == "csv" else ("jsonl", "application/x-ndjson")
+    filename = f"transits-{start.isoformat()}-{end.isoformat()}.{extension}"
+    # A plain generator, so Starlette computes each chunk in its thread pool
+    return StreamingResponse(
+        export.export(first_jd, days, selected, format, system),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def birth_moment(year: int, month: int, day: int, hour: int) -> datetime:
+    """The birth moment (UT) of a dasha request"""
+    if not (0 <= hour <= 23):
+        raise HTTPException(status_code=400, detail="Hour must be between 0 and 23")
+    try:
+        return datetime(year, month, day, hour, 0)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {str(e)}")
+
+
+@app.get("/api/vedic/dasha/{month}/{day}/{year}")
+async def get_dasha_timeline_for_date(
+    month: int,
+    day: int,
+    year: int,
+    hour: int = Query(12, description="Hour of birth (0-23, UT)"),
+    depth: int = Query(2, description="Levels to list: 1 mahadashas, 2 antardashas, 3 pratyantardashas"),
+    ayanamsha: Optional[str] = Query(None, description="Ayanamsha system: lahiri (default), raman, kp or yukteshwar"),
+):
+    """Get the Vimshottari dasha timeline for a birth moment"""
+    if not (1 <= depth <= 3):
+        raise HTTPException(status_code=400, detail="Depth must be between 1 and 3")
+    birth = birth_moment(year, month, day, hour)
+    system = ayanamsha_system(ayanamsha)
+    timeline = get_dasha_timeline(birth, system)
+    
+    return {
+        "birth": birth.isoformat(),
+        "ayanamsha": system,
+        "moon_nakshatra": timeline.nakshatra,
+        "periods": timeline.periods(depth),
+    }
+
+
+@app.get("/api/vedic/dashas/{month}/{day}")
+async def get_event_dashas(
+    month: int,
+    day: int,
+    birth: str = Query(..., description="Birth date of the reference chart (YYYY-MM-DD)"),
+    hour: int = Query(12, description="Hour of birth (0-23, UT)"),
+    ayanamsha: Optional[str] = Query(None, description="Ayanamsha system: lahiri (default), raman, kp or yukteshwar"),
+):
+    """
+    Get the dashas of a reference birth chart active at every event of a day.
+    Events before the birth, or after the 120-year cycle, have no active dasha.
+    """
     if not (1 <= month <= 12):
         raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
     if not (1 <= day <= 31):
         raise HTTPException(status_code=400, detail="Day must be between 1 and 31")
-    
-    # Use provided year or current year
-    reference_year = year if year else datetime.now().year
-    reference_hour = hour if hour is not None else 12
-    
-    # Create the reference date (the date user selected)
     try:
-        reference_date = datetime(reference_year, month, day, reference_hour, 0)
-    except ValueError:
-        reference_date = datetime(reference_year, month, day - 1, reference_hour, 0)  # Handle edge cases like Feb 29
+        birth_date = date.fromisoformat(birth)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {str(e)}")
+    birth_dt = birth_moment(birth_date.year, birth_date.month, birth_date.day, hour)
+    system = ayanamsha_system(ayanamsha)
+    timeline = get_dasha_timeline(birth_dt, system)
+    
+    events = (await get_day_index(month, day)).payload["events"]
+    indices = timeline.period_indices(julian_days(
+        [event["year"] for event in events], month, day, 12.0,
+    ))
     
+    return {
+        "birth": birth_dt.isoformat(),
+        "ayanamsha": system,
+        "moon_nakshatra": timeline.nakshatra,
+        "events": [
+            {"event": event, "dasha": timeline.describe(int(index))}
+            for event, index in zip(events, indices)
+        ],
+    }
+
+
+def country_coordinates(country: Optional[str]) -> Optional[tuple]:
+    """Coordinates of a country named in a request, or None if no country was given"""
+    if country is None:
+        return None
+    if country not in COUNTRY_COORDINATES:
+        raise HTTPException(status_code=400, detail=f"Unknown country: {country}")
+    return COUNTRY_COORDINATES[country]
+
+
+def ayanamsha_system(ayanamsha: Optional[str]) -> str:
+    """The ayanamsha system a request names (case-insensitively), Lahiri if none"""
+    if ayanamsha is None:
+        return DEFAULT_AYANAMSHA
+    if ayanamsha.lower() not in AYANAMSHAS:
+        raise HTTPException(status_code=400, detail=f"Unknown ayanamsha. Choose from: {list(AYANAMSHAS)}")
+    return ayanamsha.lower()
+
+
+def correlate_events(
+    reference_date: datetime,
+    month: int,
+    day: int,
+    events: List[dict],
+    location: Optional[tuple] = None,
+    ayanamsha: str = DEFAULT_AYANAMSHA,
+    samples: Optional[dict] = None,
+) -> dict:
+    """
+    Match a day's events against the reference date.
+    Keeps every event's matches, in the day's order, with their match counts
+    stacked into one integer matrix, so any weighting scores them in a single
+    product; charts are built later, only for the events a page returns
+    (see correlation_page).
+    With a reference location, house signatures are matched too, each event
+    placed by the first of its countries with known coordinates.
+    With samples of the events' whole days (get_day_samples, taken for these
+    events), nakshatra and rashi placements match if they hold at any time of
+    the event's day, each counted as the fraction of the day it holds.
+    """
     # Get Vedic signatures for the reference date
-    reference_signatures = get_planetary_signatures(reference_date)
-    reference_chart = get_vedic_chart(reference_date)
+    reference_signatures = get_planetary_signatures(reference_date, ayanamsha)
+    reference_chart = get_vedic_chart(reference_date, ayanamsha)
+    reference_houses = None
+    if location:
+        reference_houses = get_house_chart(reference_date, location, ayanamsha)
+        reference_signatures = {**reference_signatures, "houses": reference_houses["signatures"]}
+    
+    dated_events = date_events(events, month, day)
+    fractions = window_fractions(reference_signatures, samples, ayanamsha) if samples is not None else None
     
-    # Fetch historical events
-    wiki_data = await fetch_wikipedia_events(month, day)
+    # House charts for all of the day's located events in one pass
+    event_houses = [[] for _ in dated_events]
+    if location:
+        event_houses = house_signatures_batch(
+            [event_date for _, event_date in dated_events],
+            [country_location(event.get("countries", [])) for event, _ in dated_events],
+            ayanamsha,
+        )
     
     correlated_events = []
     
-    for event in wiki_data["events"]:
-        event_year = event["year"]
-        
-        # Create datetime for the historical event
-        try:
-            event_date = datetime(event_year, month, day, 12, 0)
-        except ValueError:
-            continue  # Skip invalid dates (e.g., Feb 29 in non-leap years)
-        
+    for row, ((event, event_date), houses) in enumerate(zip(dated_events, event_houses)):
         # Get Vedic signatures for the historical event
-        event_signatures = get_planetary_signatures(event_date)
+        event_signatures = get_planetary_signatures(event_date, ayanamsha)
+        if houses:
+            event_signatures = {**event_signatures, "houses": houses}
         
         # Find matching signatures
         matches = find_matching_signatures(reference_signatures, event_signatures)
+        if fractions is not None:
+            # Placements held at any time of the day, rather than at noon
+            matches.update(window_matches(reference_signatures, fractions, row))
         
-        # Calculate correlation score
-        score = calculate_correlation_score(matches)
-        
-        if score >= min_score:
-            # Get the event chart for more details
-            event_chart = get_vedic_chart(event_date)
-            
-            correlated_events.append({
-                "event": event,
-                "correlation_score": score,
-                "matches": matches,
-                "event_chart": {
-                    "ayanamsha": event_chart["ayanamsha"],
-                    "positions": event_chart["positions"],
-                },
-            })
-    
-    # Sort by correlation score (highest first)
-    correlated_events.sort(key=lambda x: x["correlation_score"], reverse=True)
+        correlated_events.append({
+            "event": event,
+            "event_date": event_date,
+            "matches": matches,
+        })
     
     # Create summary of the reference date's signatures for the frontend
     reference_summary = {
@@ -475,6 +691,12 @@ async def get_correlated_events(
         "chart": reference_chart,
         "key_signatures": []
     }
+    if reference_houses:
+        reference_summary["houses"] = {k: v for k, v in reference_houses.items() if k != "signatures"}
+        reference_summary["key_signatures"].append({
+            "type": "lagna",
+            "description": f"Lagna in {reference_houses['lagna']['name']}"
+        })
     
     # Add notable signatures to summary
     for sig in reference_signatures["planet_in_nakshatra"]:
@@ -502,45 +724,485 @@ async def get_correlated_events(
             "description": f"{sig['planet1']} {sig['type'].replace('_', ' ')} {sig['planet2']}"
         })
     
+    for sig in reference_signatures["conditions"]:
+        subject = " and ".join(sig["planets"]) if "planets" in sig else sig["planet"]
+        reference_summary["key_signatures"].append({
+            "type": "condition",
+            "description": f"{subject} {sig['condition'].replace('_', ' ')}"
+        })
+    
+    # Rows of flattened (MATCH_TYPES, MATCH_COLUMNS) counts, one per event
+    counts = np.zeros(
+        (len(correlated_events), len(MATCH_TYPES), len(MATCH_COLUMNS)),
+        dtype=np.int16 if fractions is None else np.float32,
+    )
+    for row, candidate in zip(counts, correlated_events):
+        row[:] = match_counts(candidate["matches"])
+    if fractions is not None:
+        for match_type, held in fractions.items():
+            counts[:, MATCH_TYPES.index(match_type), :len(PLANET_NAMES)] = held
+    counts = counts.reshape(len(correlated_events), -1)
+    
     return {
-        "today": reference_summary,  # Keep key as "today" for frontend compatibility
-        "correlated_events": correlated_events[:limit],
-        "total_matches": len(correlated_events),
+        "today": reference_summary,
+        "correlated_events": correlated_events,
+        "match_counts": counts,
+        "ayanamsha": ayanamsha,
     }
 
 
-@app.get("/api/vedic/search")
-async def search_by_planetary_position(
-    planet: str = Query(..., description="Planet name (Sun, Moon, Mars, etc.)"),
-    nakshatra: Optional[str] = Query(None, description="Nakshatra name"),
-    rashi: Optional[str] = Query(None, description="Rashi name"),
-    month: int = Query(..., description="Month to search"),
-    day: int = Query(..., description="Day to search"),
+def correlation_page(result: dict, weights: np.ndarray, min_score: float, offset: int, limit: int) -> tuple:
+    """
+    The [offset, offset + limit) slice of the events scoring at least min_score
+    under the weights (a profile_vector), highest score first, with their charts;
+    also returns how many events qualify
+    """
+    scores = result["match_counts"] @ weights
+    if scores.dtype.kind == "f":
+        scores = np.round(scores, 4)
+    qualifying = np.flatnonzero(scores >= min_score)
+    
+    # Select the top offset + limit without sorting every qualifying event:
+    # everything above the k-th score, then the earliest of those tied with it
+    top = qualifying
+    k = offset + limit
+    if k < len(qualifying):
+        qualifying_scores = scores[qualifying]
+        kth = np.partition(qualifying_scores, len(qualifying) - k)[len(qualifying) - k]
+        above = qualifying[qualifying_scores > kth]
+        tied = qualifying[qualifying_scores == kth][:k - len(above)]
+        top = np.concatenate([above, tied])
+    # Highest score first; ties keep the day's order, so pages never overlap
+    ranked = top[np.lexsort((top, -scores[top]))]
+    
+    page = []
+    for index in ranked[offset:offset + limit]:
+        candidate = result["correlated_events"][index]
+        event_chart = get_vedic_chart(candidate["event_date"], result["ayanamsha"])
+        page.append({
+            "event": candidate["event"],
+            "correlation_score": scores[index].item(),
+            "matches": candidate["matches"],
+            "event_chart": {
+                "ayanamsha": event_chart["ayanamsha"],
+                "positions": event_chart["positions"],
+            },
+        })
+    return page, len(qualifying)
+
+
+def weight_profile(profile: Optional[str], weights: Optional[str]) -> dict:
+    """The named profile (default if none), with inline weights applied on top"""
+    resolved = get_profile_store().get(profile or "default")
+    if resolved is None:
+        raise HTTPException(status_code=404, detail=f"Unknown weight profile: {profile}")
+    if weights:
+        try:
+            resolved = merge_profiles(resolved, parse_weights(weights))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return resolved
+
+
+def effective_weights(profile: dict) -> dict:
+    """Every type and planet weight a profile scores with"""
+    return {
+        "types": {t: profile["types"].get(t, SIGNATURE_WEIGHTS[t]) for t in MATCH_TYPES},
+        "planets": {p: profile["planets"].get(p, 1) for p in PLANET_NAMES},
+    }
+
+
+def scoring_scope(scoring: dict, min_score: float) -> str:
+    """Short hash of the weights and minimum score a correlation ranking used, for its cursors"""
+    key = json.dumps([effective_weights(scoring), min_score], sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+def page_offset(cursor: Optional[str], version: tuple, scope: Optional[str] = None) -> int:
+    """
+    Where a cursor's page starts; rejects malformed cursors, those for another
+    query (scope) and those from older data
+    """
+    if cursor is None:
+        return 0
+    try:
+        offset, cursor_version, cursor_scope = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_scope != scope:
+        raise HTTPException(status_code=400, detail="Cursor belongs to a different profile, weights or min_score")
+    if cursor_version != version:
+        raise HTTPException(status_code=410, detail="Results have changed; start again from the first page")
+    return offset
+
+
+def reference_moment(month: int, day: int, year: Optional[int] = None, hour: Optional[int] = None) -> datetime:
+    """
+    The reference date a correlation request selects: the current year and noon
+    by default; rejects hours and dates that do not exist
+    """
+    # Use provided year or current year
+    reference_year = year if year else datetime.now().year
+    reference_hour = hour if hour is not None else 12
+    if not (0 <= reference_hour <= 23):
+        raise HTTPException(status_code=400, detail="Hour must be between 0 and 23")
+    
+    # Create the reference date (the date user selected)
+    try:
+        return datetime(reference_year, month, day, reference_hour, 0)
+    except ValueError as e:
+        if (month, day) != (2, 29):
+            raise HTTPException(status_code=400, detail=f"Invalid date: {str(e)}")
+        return datetime(reference_year, 2, 28, reference_hour, 0)  # Feb 29 outside leap years
+
+
+MATCH_WINDOWS = ["noon", "day"]
+
+
+def match_window(window: str) -> str:
+    """When in an event's day its placements are matched: at noon, or at any time that day"""
+    if window not in MATCH_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"Invalid window. Choose from: {MATCH_WINDOWS}")
+    return window
+
+
+async def get_correlation_result(
+    month: int, day: int, reference_date: datetime, country: Optional[str], version: tuple,
+    ayanamsha: str = DEFAULT_AYANAMSHA, window: str = "noon",
+) -> dict:
+    """A day's events matched against a reference date (see correlate_events), cached per data version"""
+    location = country_coordinates(country)
+    
+    async def compute():
+        await get_day_charts(month, day, version)
+        if window == "day":
+            # The events the samples were taken for, however the day has changed since
+            events, samples = await get_day_samples(month, day, version)
+        else:
+            events, samples = (await get_day_index(month, day)).payload["events"], None
+        return await asyncio.to_thread(
+            correlate_events, reference_date, month, day, events, location, ayanamsha, samples
+        )
+    
+    # Matches do not depend on the weights or min_score, so every weighting shares one cached result
+    return await result_cache.get_or_compute(
+        ("correlations", month, day, reference_date, country, ayanamsha, window, version),
+        compute,
+    )
+
+
+async def warm_day(day: date):
+    """Fill the caches behind a day's default requests: its events, correlations and tile"""
+    version = await day_data_version(day.month, day.day)
+    # The page's default request: the day at noon (see DateSelector's todayAtNoon)
+    await get_correlation_result(day.month, day.day, reference_moment(day.month, day.day, day.year), None, version)
+    await asyncio.to_thread(tiles.get_tile, day.year)
+
+
+warmup_scheduler = WarmupScheduler(warm_day)
+
+
+@app.get("/api/vedic/correlations/{month}/{day}")
+async def get_correlated_events(
+    month: int,
+    day: int,
+    year: Optional[int] = Query(None, description="Year for the reference date (defaults to current year)"),
+    hour: Optional[int] = Query(12, description="Hour of day (0-23)"),
+    min_score: float = Query(3, description="Minimum correlation score"),
+    limit: int = Query(20, description="Maximum number of correlated events"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    country: Optional[str] = Query(None, description="Country whose coordinates place the reference chart (adds house matches)"),
+    profile: Optional[str] = Query(None, description="Named weight profile (see /api/vedic/profiles); default weights if omitted"),
+    weights: Optional[str] = Query(None, description="Weights overriding the profile's, e.g. nakshatra:4,aspects:0,Saturn:2"),
+    ayanamsha: Optional[str] = Query(None, description="Ayanamsha system: lahiri (default), raman, kp or yukteshwar"),
+    window: str = Query("noon", description="When events' nakshatra and rashi placements must hold: noon, or day (any time that day, weighted by how long)"),
+):
+    """
+    Get historical events that have matching Vedic astrological signatures with the selected date.
+    
+    This endpoint:
+    1. Calculates the selected date's planetary positions (rashis, nakshatras, aspects, conjunctions)
+    2. For each historical event on this date, calculates the Vedic chart for that year
+    3. Finds events where planetary patterns match (e.g., Saturn in Ashwini on selected date → events when Saturn was also in Ashwini)
+    4. Returns events sorted by correlation score, a page at a time
+    
+    Event times are unknown, so charts are cast for noon; with window=day a
+    nakshatra or rashi placement matches if it held at any time of the event's
+    day, scored by the fraction of the day it held (mostly the Moon's).
+    """
+    
+    if not (1 <= month <= 12):
+        raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
+    if not (1 <= day <= 31):
+        raise HTTPException(status_code=400, detail="Day must be between 1 and 31")
+    
+    reference_date = reference_moment(month, day, year, hour)
+    
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="Limit must be at least 1")
+    country_coordinates(country)  # Reject unknown countries before fetching anything
+    system = ayanamsha_system(ayanamsha)
+    match_window(window)
+    scoring = weight_profile(profile, weights)
+    
+    version = await day_data_version(month, day)
+    scope = scoring_scope(scoring, min_score)
+    offset = page_offset(cursor, version, scope)
+    result = await get_correlation_result(month, day, reference_date, country, version, system, window)
+    correlated_events, total = correlation_page(result, profile_vector(scoring), min_score, offset, limit)
+    
+    return {
+        "today": result["today"],  # Keep key as "today" for frontend compatibility
+        "correlated_events": correlated_events,
+        "total_matches": total,
+        "window": window,
+        "weights": effective_weights(scoring),
+        "next_cursor": next_cursor(offset, limit, total, version, scope),
+    }
+
+
+DAY_SECTIONS = ["events", "chart", "correlations"]
+
+
+@app.get("/api/day/{month}/{day}")
+async def get_day_bundle(
+    month: int,
+    day: int,
+    include: str = Query("events,chart,correlations", description="Comma-separated sections to return: events, chart, correlations"),
+    year: Optional[int] = Query(None, description="Year for the reference date (defaults to current year)"),
+    hour: Optional[int] = Query(12, description="Hour of day (0-23)"),
+    country: Optional[str] = Query(None, description="Country whose coordinates place the reference chart (adds houses and house matches)"),
+    category: Optional[str] = Query(None, description="Filter events by category"),
+    year_from: Optional[int] = Query(None, description="Filter events from this year"),
+    year_to: Optional[int] = Query(None, description="Filter events up to this year"),
+    event_country: Optional[str] = Query(None, description="Filter events by country name"),
+    region: Optional[str] = Query(None, description="Filter events by region"),
+    min_score: float = Query(3, description="Minimum correlation score"),
+    limit: int = Query(20, description="Maximum number of correlated events"),
+    profile: Optional[str] = Query(None, description="Named weight profile (see /api/vedic/profiles); default weights if omitted"),
+    weights: Optional[str] = Query(None, description="Weights overriding the profile's, e.g. nakshatra:4,aspects:0,Saturn:2"),
+    ayanamsha: Optional[str] = Query(None, description="Ayanamsha system: lahiri (default), raman, kp or yukteshwar"),
+    window: str = Query("noon", description="When events' nakshatra and rashi placements must hold: noon, or day (any time that day, weighted by how long)"),
 ):
     """
-    Search for historical events where a specific planet was in a specific nakshatra or rashi.
+    A day's page in one response: its events, the reference chart and the
+    first page of correlated events (more pages from /api/vedic/correlations
+    with next_cursor). The Wikipedia fetch, classification and event charts
+    are shared by the sections, and with the separate endpoints.
     """
     
-    valid_planets = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Rahu", "Ketu"]
-    if planet not in valid_planets:
-        raise HTTPException(status_code=400, detail=f"Invalid planet. Choose from: {valid_planets}")
+    if not (1 <= month <= 12):
+        raise HTTPException(status_code=400, detail="Month must be between 1 and 12")
+    if not (1 <= day <= 31):
+        raise HTTPException(status_code=400, detail="Day must be between 1 and 31")
     
-    if nakshatra:
-        valid_nakshatras = [n["name"] for n in NAKSHATRAS]
-        if nakshatra not in valid_nakshatras:
-            raise HTTPException(status_code=400, detail=f"Invalid nakshatra")
+    sections = [section.strip() for section in include.split(",") if section.strip()]
+    unknown = [section for section in sections if section not in DAY_SECTIONS]
+    if unknown or not sections:
+        raise HTTPException(status_code=400, detail=f"Invalid include. Choose from: {DAY_SECTIONS}")
     
-    if rashi:
-        valid_rashis = [r["name"] for r in RASHIS]
-        if rashi not in valid_rashis:
-            raise HTTPException(status_code=400, detail=f"Invalid rashi")
+    reference_date = reference_moment(month, day, year, hour)
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="Limit must be at least 1")
+    location = country_coordinates(country)
+    system = ayanamsha_system(ayanamsha)
+    match_window(window)
+    scoring = weight_profile(profile, weights) if "correlations" in sections else None
+    
+    version = await day_data_version(month, day)
+    response = {"reference_date": reference_date.isoformat()}
+    
+    if "events" in sections:
+        index = await get_day_index(month, day)
+        response["events"] = index.filter(category, year_from, year_to, event_country, region)
+    
+    result = None
+    if "correlations" in sections:
+        result = await get_correlation_result(month, day, reference_date, country, version, system, window)
+        correlated_events, total = correlation_page(result, profile_vector(scoring), min_score, 0, limit)
+        response["correlations"] = {
+            "key_signatures": result["today"]["key_signatures"],
+            "correlated_events": correlated_events,
+            "total_matches": total,
+            "window": window,
+            "weights": effective_weights(scoring),
+            "next_cursor": next_cursor(0, limit, total, version, scoring_scope(scoring, min_score)),
+        }
+    
+    if "chart" in sections:
+        if result is not None:
+            # The correlation run already charted the reference date
+            chart = result["today"]["chart"]
+            houses = result["today"].get("houses")
+        else:
+            chart = get_vedic_chart(reference_date, system)
+            houses = None
+            if location:
+                houses = {k: v for k, v in get_house_chart(reference_date, location, system).items() if k != "signatures"}
+        response["chart"] = {**chart, "houses": houses} if houses else chart
+    
+    return response
+
+
+class WeightProfile(BaseModel):
+    types: dict = {}
+    planets: dict = {}
+
+
+@app.get("/api/vedic/profiles")
+async def list_weight_profiles():
+    """Named weight profiles usable with /api/vedic/correlations"""
+    return {
+        "profiles": {name: effective_weights(p) for name, p in get_profile_store().all().items()},
+        "builtin": list(BUILTIN_PROFILES),
+    }
+
+
+def authorize_profile_change(admin_token: Optional[str]):
+    if not has_admin_token(admin_token, "PROFILES_ADMIN_TOKEN"):
+        raise HTTPException(status_code=403, detail="Changing weight profiles takes an admin token")
+
+
+@app.put("/api/vedic/profiles/{name}")
+async def save_weight_profile(
+    name: str,
+    profile: WeightProfile,
+    x_admin_token: Optional[str] = Header(None, description="PROFILES_ADMIN_TOKEN"),
+):
+    """
+    Save a named weight profile: weights by signature type and by planet (omitted
+    ones keep their defaults). Saved profiles are shared by every client, so
+    changing them takes the X-Admin-Token header matching PROFILES_ADMIN_TOKEN.
+    """
+    authorize_profile_change(x_admin_token)
+    try:
+        saved = get_profile_store().save(name, profile.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"name": name, "weights": effective_weights(saved)}
+
+
+@app.delete("/api/vedic/profiles/{name}")
+async def delete_weight_profile(
+    name: str,
+    x_admin_token: Optional[str] = Header(None, description="PROFILES_ADMIN_TOKEN"),
+):
+    """Remove a saved weight profile (takes the admin token, as saving does)"""
+    authorize_profile_change(x_admin_token)
+    if name in BUILTIN_PROFILES:
+        raise HTTPException(status_code=400, detail=f"'{name}' is a built-in profile")
+    try:
+        get_profile_store().delete(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown weight profile: {name}")
+    return {"deleted": name}
+
+
+@app.get("/api/vedic/upcoming/{month}/{day}/{year}")
+async def get_upcoming_similar_dates(
+    month: int,
+    day: int,
+    year: int,
+    hour: int = Query(12, description="Hour of day (0-23) of the historical date"),
+    years: int = Query(50, description="Number of years ahead to scan (1-200)"),
+    limit: int = Query(10, description="Number of upcoming dates to return (1-100)"),
+    min_score: int = Query(0, description="Minimum correlation score"),
+    ayanamsha: Optional[str] = Query(None, description="Ayanamsha system: lahiri (default), raman, kp or yukteshwar"),
+):
+    """
+    Find upcoming dates whose planetary signatures resemble a historical event's date.
+    
+    Every day from tomorrow through the next `years` years is scored against the
+    historical date with the same weights as /api/vedic/correlations.
+    """
+    
+    if not (0 <= hour <= 23):
+        raise HTTPException(status_code=400, detail="Hour must be between 0 and 23")
+    if not (1 <= years <= 200):
+        raise HTTPException(status_code=400, detail="Years must be between 1 and 200")
+    if not (1 <= limit <= 100):
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 100")
+    system = ayanamsha_system(ayanamsha)
+    
+    try:
+        reference_date = datetime(year, month, day, hour, 0)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {str(e)}")
     
-    # Fetch historical events
-    wiki_data = await fetch_wikipedia_events(month, day)
+    tomorrow = date.today() + timedelta(days=1)
+    start = datetime(tomorrow.year, tomorrow.month, tomorrow.day, hour, 0)
+    days = round(years * 365.25)
     
+    upcoming = await asyncio.to_thread(
+        scan_upcoming_dates, reference_date, start, days, limit=limit, min_score=min_score, ayanamsha=system
+    )
+    
+    return {
+        "reference_date": reference_date.strftime("%Y-%m-%d"),
+        "scan": {
+            "from": start.strftime("%Y-%m-%d"),
+            "to": (start + timedelta(days=days - 1)).strftime("%Y-%m-%d"),
+            "days_scanned": days,
+        },
+        "upcoming": upcoming,
+    }
+
+
+PLANET_CONDITIONS = ["retrograde", "combust", "graha_yuddha"]
+
+
+def chart_summary(event_date: datetime, ayanamsha: str = DEFAULT_AYANAMSHA) -> dict:
+    """Compact chart of an event with its key combinations, for search results"""
+    event_chart = get_vedic_chart(event_date, ayanamsha)
+    
+    # Build key combinations summary
+    key_combinations = []
+    
+    # Add conjunctions
+    for conj in event_chart.get("conjunctions", []):
+        key_combinations.append({
+            "type": "conjunction",
+            "description": f"{', '.join(conj['planets'])} in {conj['rashi']}"
+        })
+    
+    # Add notable aspects
+    for asp in event_chart.get("aspects", [])[:5]:
+        key_combinations.append({
+            "type": "aspect", 
+            "description": f"{asp['planet1']} {asp['type'].replace('_', ' ')} {asp['planet2']}"
+        })
+    
+    return {
+        "ayanamsha": event_chart["ayanamsha"],
+        "positions": {p: {"rashi": d["rashi"]["name"], "nakshatra": d["nakshatra"]["name"],
+                          "retrograde": d["retrograde"], "combust": d["combust"]}
+                     for p, d in event_chart["positions"].items()},
+        "key_combinations": key_combinations,
+    }
+
+
+def search_page(candidates: List[dict], offset: int, limit: int, ayanamsha: str = DEFAULT_AYANAMSHA) -> List[dict]:
+    """A page of search matches, with chart summaries built only for that page"""
+    return [
+        {
+            **candidate,
+            "event_date": candidate["event_date"].strftime("%B %d, %Y"),
+            "chart_summary": chart_summary(candidate["event_date"], ayanamsha),
+        }
+        for candidate in candidates[offset:offset + limit]
+    ]
+
+
+def search_planet_position(planet: str, nakshatra: Optional[str], rashi: Optional[str],
+                           month: int, day: int, events: List[dict],
+                           ayanamsha: str = DEFAULT_AYANAMSHA, condition: Optional[str] = None) -> List[dict]:
+    """
+    Events of a day whose chart has the planet in the given nakshatra and/or rashi,
+    and in the given condition (without chart summaries)
+    """
     matching_events = []
     
-    for event in wiki_data["events"]:
+    for event in events:
         year = event["year"]
         
         try:
@@ -548,7 +1210,7 @@ async def search_by_planetary_position(
         except ValueError:
             continue
         
-        positions = calculate_planetary_positions(event_date)
+        positions = calculate_planetary_positions(event_date, ayanamsha=ayanamsha)
         planet_pos = positions.get(planet)
         
         if not planet_pos:
@@ -560,31 +1222,13 @@ async def search_by_planetary_position(
             matches = False
         if rashi and planet_pos["rashi"]["name"] != rashi:
             matches = False
+        if condition and not planet_pos[condition]:
+            matches = False
         
         if matches:
-            # Get full chart for the event
-            event_chart = get_vedic_chart(event_date)
-            
-            # Build key combinations summary
-            key_combinations = []
-            
-            # Add conjunctions
-            for conj in event_chart.get("conjunctions", []):
-                key_combinations.append({
-                    "type": "conjunction",
-                    "description": f"{', '.join(conj['planets'])} in {conj['rashi']}"
-                })
-            
-            # Add notable aspects
-            for asp in event_chart.get("aspects", [])[:5]:
-                key_combinations.append({
-                    "type": "aspect", 
-                    "description": f"{asp['planet1']} {asp['type'].replace('_', ' ')} {asp['planet2']}"
-                })
-            
             matching_events.append({
                 "event": event,
-                "event_date": event_date.strftime("%B %d, %Y"),
+                "event_date": event_date,
                 "planetary_position": {
                     "planet": planet,
                     "rashi": planet_pos["rashi"]["name"],
@@ -592,26 +1236,128 @@ async def search_by_planetary_position(
                     "pada": planet_pos["nakshatra"]["pada"],
                     "longitude": planet_pos["longitude"],
                     "dignity": planet_pos["dignity"],
+                    "retrograde": planet_pos["retrograde"],
+                    "combust": planet_pos["combust"],
+                    "graha_yuddha": planet_pos["graha_yuddha"],
                 },
-                "chart_summary": {
-                    "ayanamsha": event_chart["ayanamsha"],
-                    "positions": {p: {"rashi": d["rashi"]["name"], "nakshatra": d["nakshatra"]["name"]} 
-                                 for p, d in event_chart["positions"].items()},
-                    "key_combinations": key_combinations,
-                }
             })
     
+    return matching_events
+
+
+@app.get("/api/vedic/search")
+async def search_by_planetary_position(
+    planet: str = Query(..., description="Planet name (Sun, Moon, Mars, etc.)"),
+    nakshatra: Optional[str] = Query(None, description="Nakshatra name"),
+    rashi: Optional[str] = Query(None, description="Rashi name"),
+    condition: Optional[str] = Query(None, description="Planet condition: retrograde, combust or graha_yuddha"),
+    month: int = Query(..., description="Month to search"),
+    day: int = Query(..., description="Day to search"),
+    limit: int = Query(50, description="Maximum number of events per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    ayanamsha: Optional[str] = Query(None, description="Ayanamsha system: lahiri (default), raman, kp or yukteshwar"),
+):
+    """
+    Search for historical events where a specific planet was in a specific nakshatra or rashi,
+    and/or retrograde, combust or at war.
+    """
+    
+    valid_planets = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Rahu", "Ketu"]
+    if planet not in valid_planets:
+        raise HTTPException(status_code=400, detail=f"Invalid planet. Choose from: {valid_planets}")
+    
+    if nakshatra:
+        valid_nakshatras = [n["name"] for n in NAKSHATRAS]
+        if nakshatra not in valid_nakshatras:
+            raise HTTPException(status_code=400, detail=f"Invalid nakshatra")
+    
+    if rashi:
+        valid_rashis = [r["name"] for r in RASHIS]
+        if rashi not in valid_rashis:
+            raise HTTPException(status_code=400, detail=f"Invalid rashi")
+    
+    if condition and condition not in PLANET_CONDITIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid condition. Choose from: {PLANET_CONDITIONS}")
+    
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="Limit must be at least 1")
+    system = ayanamsha_system(ayanamsha)
+    
+    version = await day_data_version(month, day)
+    offset = page_offset(cursor, version)
+    
+    async def compute():
+        wiki_data = (await get_day_index(month, day)).payload
+        await get_day_charts(month, day, version)
+        return await asyncio.to_thread(
+            search_planet_position, planet, nakshatra, rashi, month, day, wiki_data["events"], system, condition
+        )
+    
+    matching_events = await result_cache.get_or_compute(
+        ("search", planet, nakshatra, rashi, condition, month, day, system, version), compute
+    )
+    
     return {
         "search_criteria": {
             "planet": planet,
             "nakshatra": nakshatra,
             "rashi": rashi,
+            "condition": condition,
+            "ayanamsha": system,
         },
-        "matching_events": matching_events,
+        "matching_events": search_page(matching_events, offset, limit, system),
         "total_matches": len(matching_events),
+        "next_cursor": next_cursor(offset, limit, len(matching_events), version),
     }
 
 
+def search_aspect(planet1: str, planet2: str, aspect_type: str, target_distances: List[int],
+                  month: int, day: int, events: List[dict],
+                  ayanamsha: str = DEFAULT_AYANAMSHA) -> List[dict]:
+    """Events of a day whose chart has the two planets the given numbers of signs apart (without chart summaries)"""
+    matching_events = []
+    
+    for event in events:
+        year = event["year"]
+        
+        try:
+            event_date = datetime(year, month, day, 12, 0)
+        except ValueError:
+            continue
+        
+        positions = calculate_planetary_positions(event_date, ayanamsha=ayanamsha)
+        pos1 = positions.get(planet1)
+        pos2 = positions.get(planet2)
+        
+        if not pos1 or not pos2:
+            continue
+        
+        # Calculate sign distance
+        rashi1 = pos1["rashi"]["id"]
+        rashi2 = pos2["rashi"]["id"]
+        distance = (rashi2 - rashi1 + 12) % 12
+        reverse_distance = (rashi1 - rashi2 + 12) % 12
+        
+        # Check if aspect matches
+        if distance in target_distances or reverse_distance in target_distances:
+            matching_events.append({
+                "event": event,
+                "event_date": event_date,
+                "aspect": {
+                    "planet1": planet1,
+                    "planet1_rashi": pos1["rashi"]["name"],
+                    "planet1_nakshatra": pos1["nakshatra"]["name"],
+                    "planet2": planet2,
+                    "planet2_rashi": pos2["rashi"]["name"],
+                    "planet2_nakshatra": pos2["nakshatra"]["name"],
+                    "aspect_type": aspect_type,
+                    "sign_distance": min(distance, reverse_distance),
+                },
+            })
+    
+    return matching_events
+
+
 @app.get("/api/vedic/aspect-search")
 async def search_by_aspect(
     planet1: str = Query(..., description="First planet"),
@@ -621,6 +1367,9 @@ async def search_by_aspect(
     day: int = Query(..., description="Day to search"),
     country: Optional[str] = Query(None, description="Filter by country"),
     region: Optional[str] = Query(None, description="Filter by region"),
+    limit: int = Query(50, description="Maximum number of events per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    ayanamsha: Optional[str] = Query(None, description="Ayanamsha system: lahiri (default), raman, kp or yukteshwar"),
 ):
     """
     Search for historical events where two planets form a specific aspect.
@@ -670,83 +1419,31 @@ async def search_by_aspect(
         "12th_house": [11],   # 11 signs = 12th house (1 behind)
     }
     
-    # Fetch historical events
-    wiki_data = await fetch_wikipedia_events(month, day)
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="Limit must be at least 1")
+    system = ayanamsha_system(ayanamsha)
     
-    matching_events = []
+    version = await day_data_version(month, day)
+    offset = page_offset(cursor, version)
     
-    for event in wiki_data["events"]:
-        year = event["year"]
-        
-        # Apply country/region filter
-        if country and country not in event.get("countries", []):
-            continue
-        if region:
-            region_countries = REGIONS.get(region, [])
-            if not any(c in region_countries for c in event.get("countries", [])):
-                continue
-        
-        try:
-            event_date = datetime(year, month, day, 12, 0)
-        except ValueError:
-            continue
-        
-        positions = calculate_planetary_positions(event_date)
-        pos1 = positions.get(planet1)
-        pos2 = positions.get(planet2)
-        
-        if not pos1 or not pos2:
-            continue
-        
-        # Calculate sign distance
-        rashi1 = pos1["rashi"]["id"]
-        rashi2 = pos2["rashi"]["id"]
-        distance = (rashi2 - rashi1 + 12) % 12
-        reverse_distance = (rashi1 - rashi2 + 12) % 12
-        
-        # Check if aspect matches
-        target_distances = aspect_distances.get(aspect_type, [])
-        if distance in target_distances or reverse_distance in target_distances:
-            # Get full chart for the event
-            event_chart = get_vedic_chart(event_date)
-            
-            # Build key combinations summary
-            key_combinations = []
-            
-            # Add conjunctions
-            for conj in event_chart.get("conjunctions", []):
-                key_combinations.append({
-                    "type": "conjunction",
-                    "description": f"{', '.join(conj['planets'])} in {conj['rashi']}"
-                })
-            
-            # Add notable aspects
-            for asp in event_chart.get("aspects", [])[:5]:
-                key_combinations.append({
-                    "type": "aspect", 
-                    "description": f"{asp['planet1']} {asp['type'].replace('_', ' ')} {asp['planet2']}"
-                })
-            
-            matching_events.append({
-                "event": event,
-                "event_date": event_date.strftime("%B %d, %Y"),
-                "aspect": {
-                    "planet1": planet1,
-                    "planet1_rashi": pos1["rashi"]["name"],
-                    "planet1_nakshatra": pos1["nakshatra"]["name"],
-                    "planet2": planet2,
-                    "planet2_rashi": pos2["rashi"]["name"],
-                    "planet2_nakshatra": pos2["nakshatra"]["name"],
-                    "aspect_type": aspect_type,
-                    "sign_distance": min(distance, reverse_distance),
-                },
-                "chart_summary": {
-                    "ayanamsha": event_chart["ayanamsha"],
-                    "positions": {p: {"rashi": d["rashi"]["name"], "nakshatra": d["nakshatra"]["name"]} 
-                                 for p, d in event_chart["positions"].items()},
-                    "key_combinations": key_combinations,
-                }
-            })
+    async def compute():
+        wiki_data = (await get_day_index(month, day)).payload
+        await get_day_charts(month, day, version)
+        return await asyncio.to_thread(
+            search_aspect, planet1, planet2, aspect_type, aspect_distances[aspect_type],
+            month, day, wiki_data["events"], system,
+        )
+    
+    # Results are cached unfiltered, so every country/region view shares one computation
+    matching_events = await result_cache.get_or_compute(
+        ("aspect-search", planet1, planet2, aspect_type, month, day, system, version), compute
+    )
+    if country:
+        matching_events = [m for m in matching_events if country in m["event"].get("countries", [])]
+    if region:
+        region_countries = REGIONS.get(region, [])
+        matching_events = [m for m in matching_events
+                           if any(c in region_countries for c in m["event"].get("countries", []))]
     
     return {
         "search_criteria": {
@@ -755,9 +1452,66 @@ async def search_by_aspect(
             "aspect_type": aspect_type,
             "country": country,
             "region": region,
+            "ayanamsha": system,
         },
-        "matching_events": matching_events,
+        "matching_events": search_page(matching_events, offset, limit, system),
         "total_matches": len(matching_events),
+        "next_cursor": next_cursor(offset, limit, len(matching_events), version),
+    }
+
+
+def get_statistics_cube():
+    """The statistics cube, kept current with added and edited events by the event store"""
+    cube = get_event_store().cube
+    if cube is None:
+        raise HTTPException(status_code=503, detail="Statistics cube has not been built")
+    return cube
+
+
+@app.get("/api/stats/keys")
+async def list_statistics_keys(
+    q: Optional[str] = Query(None, description="Substring to search for, e.g. Rahu_in"),
+    limit: int = Query(50, description="Maximum number of keys"),
+):
+    """List signature keys available in the statistics cube"""
+    cube = get_statistics_cube()
+    keys = [k for k in cube.keys if not q or q.lower() in k.lower()]
+    return {"keys": sorted(keys)[:limit], "total": len(keys)}
+
+
+@app.get("/api/stats/enrichment")
+async def get_signature_enrichment(
+    key: str = Query(..., description="Signature key, e.g. Rahu_in_Ardra"),
+    category: Optional[str] = Query(None, description="Event category (all categories if omitted)"),
+    region: Optional[str] = Query(None, description="Restrict to a region"),
+    century_from: Optional[int] = Query(None, description="First century (e.g. 16 for the 1500s)"),
+    century_to: Optional[int] = Query(None, description="Last century, inclusive"),
+):
+    """
+    How over- or under-represented event categories are among events whose chart
+    carries a signature key, across the whole event corpus.
+    
+    Enrichment is P(category | key) / P(category); chi-square and p-value come from
+    the 2x2 table of key presence vs. category membership.
+    """
+    cube = get_statistics_cube()
+    
+    if key not in cube.key_index:
+        raise HTTPException(status_code=400, detail="Unknown signature key")
+    if category and category not in CATEGORIES:
+        raise HTTPException(status_code=400, detail=f"Invalid category. Choose from: {CATEGORIES}")
+    if region and region not in REGION_NAMES:
+        raise HTTPException(status_code=400, detail=f"Invalid region. Choose from: {REGION_NAMES}")
+    
+    return {
+        "criteria": {
+            "key": key,
+            "category": category,
+            "region": region,
+            "century_from": century_from,
+            "century_to": century_to,
+        },
+        "results": cube.enrichment(key, category, region, century_from, century_to),
     }
 
 
@@ -0,0 +1,40 @@
+"""
+Cursor Pagination
+Opaque cursors for paging through computed results. A cursor records where the
+next page starts and the version of the data the results were computed from,
+so a listing is never stitched together from two different versions, and
+optionally a scope (e.g. the scoring a ranking used), so a cursor is only
+resumed by the same query.
+"""
+
+import base64
+import json
+from typing import Optional, Tuple
+
+
+def encode_cursor(offset: int, version: tuple, scope: Optional[str] = None) -> str:
+    payload = {"offset": offset, "version": list(version)}
+    if scope is not None:
+        payload["scope"] = scope
+    payload = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, tuple, Optional[str]]:
+    """(offset, data version, scope) of a cursor; raises ValueError if it is malformed"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = int(payload["offset"])
+        version = tuple(payload["version"])
+        scope = payload.get("scope")
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if offset < 0 or not (scope is None or isinstance(scope, str)):
+        raise ValueError("Invalid cursor")
+    return offset, version, scope
+
+
+def next_cursor(offset: int, limit: int, total: int, version: tuple, scope: Optional[str] = None) -> Optional[str]:
+    """Cursor for the page after [offset, offset + limit), or None on the last page"""
+    end = offset + limit
+    return encode_cursor(end, version, scope) if end < total else None
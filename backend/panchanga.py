@@ -0,0 +1,131 @@
+"""
+Panchanga Engine
+Daily tithi, vara, nakshatra, yoga and karana with transition times,
+computed in batch over date ranges from the Sun and Moon sidereal longitudes
+"""
+
+from datetime import date
+from typing import List
+
+import numpy as np
+
+from timescale import julian_day, jd_to_iso
+from vedic_calc import (
+    calculate_sidereal_longitudes_batch,
+    karana_name_index,
+    DEFAULT_AYANAMSHA,
+    PLANET_NAMES,
+    NAKSHATRAS,
+    TITHIS,
+    YOGAS,
+    KARANAS,
+    VARAS,
+)
+
+# Longitudes are sampled this many times per day; every element changes
+# at most once between two samples, so transitions are bracketed exactly
+SAMPLES_PER_DAY = 24
+
+# Element -> (span in degrees, number of divisions, angle sign of the Sun)
+# The element's angle is Moon + sign * Sun
+ELEMENTS = {
+    'tithi': (12.0, 30, -1),
+    'nakshatra': (360 / 27, 27, 0),
+    'yoga': (360 / 27, 27, 1),
+    'karana': (6.0, 60, -1),
+}
+
+SUN = PLANET_NAMES.index('Sun')
+MOON = PLANET_NAMES.index('Moon')
+
+
+def _element_angles(longitudes: np.ndarray, sun_sign: int) -> np.ndarray:
+    return np.mod(longitudes[:, MOON] + sun_sign * longitudes[:, SUN], 360)
+
+
+def _describe(element: str, index: int) -> dict:
+    """Name an element division"""
+    if element == 'tithi':
+        return dict(TITHIS[index])
+    if element == 'nakshatra':
+        return {'id': index, 'name': NAKSHATRAS[index]['name']}
+    if element == 'yoga':
+        return {'id': index, 'name': YOGAS[index]}
+    return {'id': index, 'name': KARANAS[karana_name_index(index)]}
+
+
+def _find_transitions(jds: np.ndarray, angles: np.ndarray, span: float):
+    """
+    Locate every time an (increasing) angle crosses a multiple of span.
+    Returns (transition JDs, division index after each transition).
+    """
+    unwrapped = np.unwrap(angles, period=360)
+    divisions = np.floor(unwrapped / span).astype(np.int64)
+    before = np.nonzero(np.diff(divisions) > 0)[0]
+
+    boundaries = divisions[before + 1] * span
+    step = unwrapped[before + 1] - unwrapped[before]
+    times = jds[before] + (boundaries - unwrapped[before]) / step / SAMPLES_PER_DAY
+    rates = step * SAMPLES_PER_DAY
+    return times, boundaries, rates, divisions[before + 1]
+
+
+def calculate_panchanga_range(start: date, days: int, ayanamsha: str = DEFAULT_AYANAMSHA) -> List[dict]:
+    """
+    Panchanga for `days` consecutive days from `start`, under an ayanamsha system
+    (it moves nakshatra and yoga transitions; tithis and karanas do not depend on it).
+    Days run from 00:00 to 24:00 UT; each element lists every division in effect
+    during the day with the time it ends (None if it continues past midnight).
+    """
+    jd0 = julian_day(start.year, start.month, start.day)
+    jds = jd0 + np.arange(days * SAMPLES_PER_DAY + 1, dtype=np.float64) / SAMPLES_PER_DAY
+    longitudes = calculate_sidereal_longitudes_batch(jds, ayanamsha)
+
+    # Bracket every transition from the samples, then refine all of them with
+    # one more batch evaluation (a secant step from the interpolated time)
+    found = {}
+    for element, (span, _, sun_sign) in ELEMENTS.items():
+        found[element] = _find_transitions(jds, _element_angles(longitudes, sun_sign), span)
+
+    all_times = np.concatenate([found[e][0] for e in ELEMENTS])
+    refined_longitudes = calculate_sidereal_longitudes_batch(all_times, ayanamsha)
+
+    transitions = {}
+    offset = 0
+    for element, (_, count, sun_sign) in ELEMENTS.items():
+        times, boundaries, rates, divisions = found[element]
+        angles = _element_angles(refined_longitudes[offset:offset + len(times)], sun_sign)
+        offset += len(times)
+        residual = np.mod(boundaries - angles + 180, 360) - 180
+        transitions[element] = (times + residual / rates, divisions % count)
+
+    start_indices = {
+        element: np.floor(_element_angles(longitudes[:-1:SAMPLES_PER_DAY], sun_sign) / span).astype(np.int64)
+        for element, (span, _, sun_sign) in ELEMENTS.items()
+    }
+    varas = (np.floor(jds[:-1:SAMPLES_PER_DAY] + 1.5) % 7).astype(np.int64)
+
+    results = []
+    for day in range(days):
+        panchanga = {
+            'date': jd_to_iso(jd0 + day, date_only=True),
+            'vara': VARAS[varas[day]],
+        }
+        for element in ELEMENTS:
+            times, divisions = transitions[element]
+            first, last = np.searchsorted(times, [jd0 + day, jd0 + day + 1])
+            entries = [_describe(element, int(start_indices[element][day]))]
+            for i in range(first, last):
+                entries[-1]['ends_at'] = jd_to_iso(times[i])
+                entries.append(_describe(element, int(divisions[i])))
+            entries[-1]['ends_at'] = None
+            panchanga[element] = entries
+        results.append(panchanga)
+
+    return results
+
+
+def get_panchanga(day: date, ayanamsha: str = DEFAULT_AYANAMSHA) -> dict:
+    """Panchanga for a single day"""
+    return calculate_panchanga_range(day, 1, ayanamsha)[0]
+
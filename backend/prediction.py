@@ -0,0 +1,59 @@
+"""
+Upcoming Similar Skies
+Scans future dates for planetary signatures similar to a historical date
+"""
+
+import heapq
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+
+from timescale import datetime_to_jd
+from vedic_calc import (
+    get_planetary_signatures,
+    find_matching_signatures,
+    calculate_correlation_score,
+    calculate_sidereal_longitudes_batch,
+    SignatureScorer,
+    DEFAULT_AYANAMSHA,
+)
+
+
+def scan_upcoming_dates(
+    reference_date: datetime,
+    start: datetime,
+    days: int,
+    limit: int = 10,
+    min_score: int = 0,
+    ayanamsha: str = DEFAULT_AYANAMSHA,
+) -> List[dict]:
+    """
+    Score every day from `start` for `days` days against the reference date
+    and return the `limit` best days, highest score first (earliest first on ties).
+
+    Scores for all days are computed in one batch; full signature dicts are only
+    built for the days that are returned.
+    """
+    reference_signatures = get_planetary_signatures(reference_date, ayanamsha)
+    scorer = SignatureScorer(reference_signatures)
+
+    jds = datetime_to_jd(start) + np.arange(days, dtype=np.float64)
+    longitudes = calculate_sidereal_longitudes_batch(jds, ayanamsha)
+    scores = scorer.score(longitudes, jds).tolist()
+
+    candidates = (i for i in range(days) if scores[i] >= min_score)
+    best = heapq.nlargest(limit, candidates, key=scores.__getitem__)
+
+    upcoming = []
+    for offset in best:
+        day = start + timedelta(days=offset)
+        matches = find_matching_signatures(reference_signatures, get_planetary_signatures(day, ayanamsha))
+        upcoming.append({
+            "date": day.strftime("%Y-%m-%d"),
+            "days_from_start": offset,
+            "correlation_score": calculate_correlation_score(matches),
+            "matches": matches,
+        })
+
+    return upcoming
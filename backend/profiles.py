@@ -0,0 +1,173 @@
+"""
+Weight Profiles
+Named correlation weightings: a weight per signature type (SIGNATURE_WEIGHTS
+by default) and per planet (1 by default). Built-in profiles ship with the
+code; others are saved server-side in a JSON file shared by all workers.
+"""
+
+import json
+import os
+import re
+import threading
+import uuid
+from typing import Dict, Optional
+
+import numpy as np
+
+from event_store import file_lock
+from vedic_calc import weight_vector, MATCH_TYPES, PLANET_NAMES
+
+DEFAULT_PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'profiles.json')
+
+MAX_WEIGHT = 100
+# Saved profiles (besides the built-in ones) the shared file holds at most
+MAX_PROFILES = int(os.environ.get('PROFILES_MAX', 200))
+NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,40}$')
+
+# Short names accepted for signature types in weight specs
+TYPE_ALIASES = {
+    'nakshatra': 'planet_in_nakshatra',
+    'rashi': 'planet_in_rashi',
+    'conjunction': 'conjunctions',
+    'aspect': 'aspects',
+    'dignity': 'dignities',
+    'house': 'houses',
+    'condition': 'conditions',
+}
+
+BUILTIN_PROFILES = {
+    'default': {'types': {}, 'planets': {}},
+    # Configurations of the slow planets last for months or years
+    'slow_movers': {'types': {}, 'planets': {'Saturn': 3, 'Rahu': 3, 'Ketu': 3, 'Jupiter': 2}},
+    # Only where the planets are, ignoring their relationships, conditions and the day's panchanga
+    'placements': {'types': {'conjunctions': 0, 'aspects': 0, 'panchanga': 0, 'conditions': 0}, 'planets': {}},
+}
+
+
+def validate_profile(profile: dict) -> dict:
+    """A profile with only known types and planets and non-negative weights; raises ValueError"""
+    types = dict(profile.get('types') or {})
+    planets = dict(profile.get('planets') or {})
+    for name, weights, known in (('type', types, MATCH_TYPES), ('planet', planets, PLANET_NAMES)):
+        for key, weight in weights.items():
+            if key not in known:
+                raise ValueError(f"Unknown {name} '{key}'. Choose from: {', '.join(known)}")
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not 0 <= weight <= MAX_WEIGHT:
+                raise ValueError(f"Weight of {key} must be a number between 0 and {MAX_WEIGHT}")
+    return {'types': types, 'planets': planets}
+
+
+def parse_weights(spec: str) -> dict:
+    """
+    A profile from a spec like "nakshatra:4,aspects:0,Saturn:2" (signature types,
+    or their short names, and planets); raises ValueError
+    """
+    profile = {'types': {}, 'planets': {}}
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        key, _, value = part.partition(':')
+        key = key.strip()
+        try:
+            weight = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid weight '{part.strip()}'; expected name:number")
+        if weight.is_integer():
+            weight = int(weight)
+        if key in PLANET_NAMES:
+            profile['planets'][key] = weight
+        else:
+            profile['types'][TYPE_ALIASES.get(key, key)] = weight
+    return validate_profile(profile)
+
+
+def merge_profiles(base: dict, overrides: dict) -> dict:
+    return {
+        'types': {**base['types'], **overrides['types']},
+        'planets': {**base['planets'], **overrides['planets']},
+    }
+
+
+def profile_vector(profile: dict) -> np.ndarray:
+    """Weight vector scoring match counts (see vedic_calc.weight_vector)"""
+    return weight_vector(profile['types'], profile['planets'])
+
+
+class ProfileStore:
+    """Built-in profiles plus those saved in a JSON file, reread when another worker changes it"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get('PROFILES_PATH', DEFAULT_PROFILES_PATH)
+        self._saved: Dict[str, dict] = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._saved, self._version = {}, None
+            return
+        version = (stat.st_ino, stat.st_mtime_ns)
+        if version != self._version:
+            with open(self.path) as f:
+                self._saved = json.load(f)
+            self._version = version
+
+    def all(self) -> Dict[str, dict]:
+        with self._lock:
+            self._refresh()
+            return {**self._saved, **BUILTIN_PROFILES}
+
+    def get(self, name: str) -> Optional[dict]:
+        return self.all().get(name)
+
+    def save(self, name: str, profile: dict) -> dict:
+        """Save a profile under a name; raises ValueError for invalid names, profiles or built-in names, or when full"""
+        if not NAME_PATTERN.match(name):
+            raise ValueError("Profile names are 1-40 letters, digits, '-' or '_'")
+        if name in BUILTIN_PROFILES:
+            raise ValueError(f"'{name}' is a built-in profile")
+        profile = validate_profile(profile)
+
+        def add(saved: dict):
+            if name not in saved and len(saved) >= MAX_PROFILES:
+                raise ValueError(f"At most {MAX_PROFILES} profiles can be saved; delete one first")
+            saved[name] = profile
+
+        self._write(add)
+        return profile
+
+    def delete(self, name: str):
+        """Remove a saved profile; raises KeyError if there is none by that name"""
+        def remove(saved: dict):
+            if name not in saved:
+                raise KeyError(name)
+            del saved[name]
+
+        self._write(remove)
+
+    def _write(self, change):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Other workers read-modify-write the same file, so each change holds the file lock throughout
+        with self._lock, file_lock(self.path + '.lock'):
+            self._refresh()
+            saved = dict(self._saved)
+            change(saved)
+            temporary = f'{self.path}.{uuid.uuid4().hex}.tmp'
+            with open(temporary, 'w') as f:
+                json.dump(saved, f, indent=2, sort_keys=True)
+            os.replace(temporary, self.path)
+            self._refresh()
+
+
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProfileStore()
+        return _store
@@ -0,0 +1,359 @@
+"""
+Similar Events
+Precomputed nearest-neighbour graph over the charts of every date in the corpus,
+for "events like this one" across all dates.
+
+Nodes are distinct event dates (events of the same date share a noon chart).
+Two charts are as similar as calculate_correlation_score says: the summed
+SIGNATURE_WEIGHTS of the signature keys they share. Comparing every pair of
+dates is too slow, so candidates come from locality-sensitive hashing of
+weighted MinHash sketches (a key of weight w counts as w tokens), and only
+candidates are scored exactly. Each date keeps its NEIGHBOURS best dates.
+
+The graph is stored as memory-mapped arrays. Events added or edited after it
+was built are followed through the event store and compared exactly.
+
+Build it offline (after building the corpus) with:
+    python similarity.py build [--corpus data/corpus.jsonl] [--out data/similar]
+"""
+
+import argparse
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from corpus import (
+    event_signature_keys, generation_path, load_corpus, load_generation, new_generation, publish_files,
+    snapshot_seq, write_meta,
+)
+from vedic_calc import signature_key_type, SIGNATURE_WEIGHTS
+
+DEFAULT_SIMILAR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'similar')
+
+NEIGHBOURS = 20
+BANDS = 48
+ROWS = 2
+PERMUTATIONS = BANDS * ROWS
+# Bucket members considered per band; buckets of very common key combinations are sampled
+MAX_BUCKET = 256
+# Token ids are key_id * MAX_WEIGHT + copy
+MAX_WEIGHT = max(SIGNATURE_WEIGHTS.values())
+
+_PRIME = np.uint64(4294967311)  # > 2**32
+_rng = np.random.default_rng(20240101)
+_A = _rng.integers(1, 2 ** 32, PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, 2 ** 32, PERMUTATIONS, dtype=np.uint64)
+_BAND_MIX = _rng.integers(1, 2 ** 63, ROWS, dtype=np.uint64) | np.uint64(1)
+
+
+def date_key(year: int, month: int, day: int) -> int:
+    return year * 10000 + month * 100 + day
+
+
+def record_date_key(record: dict) -> int:
+    return date_key(record['year'], record['month'], record['day'])
+
+
+def chart_keys(key: int) -> Optional[List[str]]:
+    """Signature keys of a date's noon chart, or None if the date does not exist"""
+    return event_signature_keys({'year': key // 10000, 'month': key // 100 % 100, 'day': key % 100})
+
+
+def key_weight(key: str) -> int:
+    return SIGNATURE_WEIGHTS.get(signature_key_type(key), 1)
+
+
+def minhash(key_ids: np.ndarray, offsets: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Weighted MinHash sketches, shape (nodes, PERMUTATIONS), of nodes whose sorted
+    key ids are key_ids[offsets[i]:offsets[i + 1]]
+    """
+    counts = weights[key_ids]
+    tokens = np.repeat(key_ids.astype(np.uint64) * np.uint64(MAX_WEIGHT), counts)
+    tokens += (np.arange(len(tokens)) - np.repeat(np.cumsum(counts) - counts, counts)).astype(np.uint64)
+    token_offsets = np.concatenate(([0], np.cumsum(np.add.reduceat(counts, offsets[:-1]))))
+
+    sketches = np.empty((len(offsets) - 1, PERMUTATIONS), dtype=np.uint64)
+    for first in range(0, len(offsets) - 1, 4096):
+        last = min(first + 4096, len(offsets) - 1)
+        chunk = tokens[token_offsets[first]:token_offsets[last]]
+        hashed = (chunk[:, None] * _A + _B) % _PRIME
+        sketches[first:last] = np.minimum.reduceat(hashed, token_offsets[first:last] - token_offsets[first])
+    return sketches
+
+
+def overlap_scores(key_ids: np.ndarray, weights: np.ndarray, offsets: np.ndarray,
+                   node_key_ids: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """Summed weights of the keys each candidate node shares with a chart"""
+    if len(candidates) == 0:
+        return np.zeros(0, dtype=np.int64)
+    member = np.zeros(len(weights), dtype=bool)
+    member[key_ids] = True
+    starts = offsets[candidates]
+    lengths = offsets[candidates + 1] - starts
+    firsts = np.cumsum(lengths) - lengths
+    gathered = node_key_ids[np.repeat(starts - firsts, lengths) + np.arange(lengths.sum())]
+    return np.add.reduceat(np.where(member[gathered], weights[gathered], 0), firsts)
+
+
+def band_hashes(sketches: np.ndarray) -> np.ndarray:
+    """One hash per band, shape (BANDS, nodes)"""
+    bands = sketches.reshape(len(sketches), BANDS, ROWS)
+    return (bands * _BAND_MIX).sum(axis=2).T.copy()
+
+
+class SimilarityGraph:
+    """Memory-mapped neighbour graph plus an overlay of events changed since it was built"""
+
+    def __init__(self, directory: str):
+        load_generation(os.path.join(directory, 'meta.json'), lambda meta: self._open(directory, meta))
+
+        # Overlay: events (by date) changed since the build, and sorted key ids of their new dates
+        self.added: Dict[int, Set[str]] = defaultdict(set)
+        self.extra: Dict[int, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _open(self, directory: str, meta: dict):
+        def path(name: str) -> str:
+            return generation_path(os.path.join(directory, name), meta.get('generation'))
+
+        def load(name: str) -> np.ndarray:
+            return np.load(path(f'{name}.npy'), mmap_mode='r')
+
+        self.seq = meta['seq']
+        with open(path('vocabulary.json')) as f:
+            vocabulary = json.load(f)
+        self.key_index = {key: i for i, key in enumerate(vocabulary)}
+        self.weights = np.array([key_weight(key) for key in vocabulary], dtype=np.int64)
+
+        self.dates = load('dates')
+        self.key_offsets = load('key_offsets')
+        self.key_ids = load('key_ids')
+        self.event_offsets = load('event_offsets')
+        self.event_ids = load('event_ids')
+        self.band_hashes = load('band_hashes')
+        self.band_nodes = load('band_nodes')
+        self.neighbours = load('neighbours')
+        self.scores = load('scores')
+
+    def node(self, key: int) -> Optional[int]:
+        position = int(np.searchsorted(self.dates, key))
+        if position < len(self.dates) and self.dates[position] == key:
+            return position
+        return None
+
+    def encode(self, keys: Iterable[str]) -> np.ndarray:
+        """Sorted key ids of a chart; keys the graph has never seen get new ids"""
+        with self._lock:
+            for key in keys:
+                if key not in self.key_index:
+                    self.key_index[key] = len(self.key_index)
+                    self.weights = np.append(self.weights, key_weight(key))
+            return np.array(sorted(self.key_index[key] for key in keys), dtype=np.int32)
+
+    def on_change(self, previous: Optional[dict], current: Optional[dict]):
+        """Event store subscriber"""
+        if previous is not None:
+            self.added[record_date_key(previous)].discard(previous['id'])
+        if current is not None:
+            key = record_date_key(current)
+            if self.node(key) is None and key not in self.extra:
+                keys = chart_keys(key)
+                if keys is None:
+                    return
+                self.extra[key] = self.encode(keys)
+            self.added[key].add(current['id'])
+
+    def _candidates(self, key_ids: np.ndarray) -> np.ndarray:
+        """Nodes sharing at least one band bucket with a chart"""
+        hashes = band_hashes(minhash(key_ids, np.array([0, len(key_ids)]), self.weights))[:, 0]
+        found = []
+        for band, value in enumerate(hashes):
+            first = np.searchsorted(self.band_hashes[band], value, side='left')
+            last = np.searchsorted(self.band_hashes[band], value, side='right')
+            found.append(self.band_nodes[band, first:min(last, first + MAX_BUCKET)])
+        return np.unique(np.concatenate(found)) if found else np.zeros(0, dtype=np.int32)
+
+    def nearest(self, key: int, limit: int = NEIGHBOURS) -> List[Tuple[int, int]]:
+        """(date key, score) of the charts most similar to a date's, best first"""
+        node = self.node(key)
+        if node is not None:
+            key_ids = np.asarray(self.key_ids[self.key_offsets[node]:self.key_offsets[node + 1]])
+            found = [
+                (int(self.dates[n]), int(s))
+                for n, s in zip(self.neighbours[node], self.scores[node]) if n >= 0
+            ]
+        else:
+            key_ids = self.extra.get(key)
+            if key_ids is None:
+                keys = chart_keys(key)
+                if keys is None:
+                    return []
+                key_ids = self.encode(keys)
+            candidates = self._candidates(key_ids)
+            candidates = candidates[self.dates[candidates] != key]
+            scores = overlap_scores(key_ids, self.weights, self.key_offsets, self.key_ids, candidates)
+            best = np.argsort(-scores, kind='stable')[:limit]
+            found = [(int(self.dates[candidates[i]]), int(scores[i])) for i in best]
+
+        # Dates first seen after the build are few, so they are compared exactly
+        for other, other_ids in list(self.extra.items()):
+            if other != key:
+                shared = np.intersect1d(key_ids, other_ids, assume_unique=True)
+                found.append((other, int(self.weights[shared].sum())))
+        found.sort(key=lambda pair: -pair[1])
+        return found
+
+    def events_of(self, key: int) -> List[str]:
+        """Ids of the events of a date, as built plus those added since"""
+        ids = list(self.added.get(key, ()))
+        node = self.node(key)
+        if node is not None:
+            ids += [i.decode() for i in self.event_ids[self.event_offsets[node]:self.event_offsets[node + 1]]]
+        return list(dict.fromkeys(ids))
+
+    def similar(self, store, event: dict, limit: int = 10) -> List[dict]:
+        """Current events of the dates most similar to an event's, with their similarity_score"""
+        results = []
+        for other, score in self.nearest(record_date_key(event)):
+            for event_id in self.events_of(other):
+                # Skip events removed, or moved to another date, since the build
+                current = store.get(event_id)
+                if current is None or record_date_key(current) != other:
+                    continue
+                results.append({**current, 'similarity_score': score})
+                if len(results) >= limit:
+                    return results
+        return results
+
+
+def build_graph(records: List[dict]) -> dict:
+    """Arrays (and vocabulary) of the neighbour graph over the records' dates"""
+    by_date: Dict[int, List[str]] = defaultdict(list)
+    for record in records:
+        by_date[record_date_key(record)].append(record['id'])
+
+    dates, node_keys = [], []
+    for key in sorted(by_date):
+        keys = chart_keys(key)
+        if keys is not None:
+            dates.append(key)
+            node_keys.append(keys)
+
+    vocabulary = sorted({key for keys in node_keys for key in keys})
+    key_index = {key: i for i, key in enumerate(vocabulary)}
+    weights = np.array([key_weight(key) for key in vocabulary], dtype=np.int64)
+    key_offsets = np.concatenate(([0], np.cumsum([len(keys) for keys in node_keys]))).astype(np.int64)
+    key_ids = np.array([key_index[key] for keys in node_keys for key in keys], dtype=np.int32)
+    event_lists = [sorted(by_date[key]) for key in dates]
+    event_offsets = np.concatenate(([0], np.cumsum([len(ids) for ids in event_lists]))).astype(np.int64)
+    event_ids = np.array([i for ids in event_lists for i in ids], dtype='S24')
+
+    hashes = band_hashes(minhash(key_ids, key_offsets, weights))
+    order = np.argsort(hashes, axis=1, kind='stable')
+    sorted_hashes = np.take_along_axis(hashes, order, axis=1)
+    band_nodes = order.astype(np.int32)
+
+    arrays = {
+        'dates': np.array(dates, dtype=np.int32),
+        'key_offsets': key_offsets,
+        'key_ids': key_ids,
+        'event_offsets': event_offsets,
+        'event_ids': event_ids,
+        'band_hashes': sorted_hashes,
+        'band_nodes': band_nodes,
+    }
+
+    # Score each node's candidates exactly
+    count = len(dates)
+    neighbours = np.full((count, NEIGHBOURS), -1, dtype=np.int32)
+    scores = np.zeros((count, NEIGHBOURS), dtype=np.int16)
+    firsts = [np.searchsorted(sorted_hashes[b], hashes[b], side='left') for b in range(BANDS)]
+    lasts = [np.searchsorted(sorted_hashes[b], hashes[b], side='right') for b in range(BANDS)]
+    for node in range(count):
+        candidates = np.unique(np.concatenate([
+            band_nodes[b, firsts[b][node]:min(lasts[b][node], firsts[b][node] + MAX_BUCKET)]
+            for b in range(BANDS)
+        ]))
+        candidates = candidates[candidates != node]
+        node_key_ids = key_ids[key_offsets[node]:key_offsets[node + 1]]
+        node_scores = overlap_scores(node_key_ids, weights, key_offsets, key_ids, candidates)
+        best = np.argsort(-node_scores, kind='stable')[:NEIGHBOURS]
+        neighbours[node, :len(best)] = candidates[best]
+        scores[node, :len(best)] = node_scores[best]
+
+    arrays['neighbours'] = neighbours
+    arrays['scores'] = scores
+    return {'arrays': arrays, 'vocabulary': vocabulary}
+
+
+def write_graph(graph: dict, directory: str, seq: int) -> List[Tuple[str, str]]:
+    """Write the files of a new graph generation; returns (temporary, final) pairs for publish_files"""
+    os.makedirs(directory, exist_ok=True)
+    generation = new_generation()
+    files = []
+    for name, array in graph['arrays'].items():
+        files.append(os.path.join(directory, f'{name}.npy'))
+        np.save(generation_path(files[-1], generation), array)
+    files.append(os.path.join(directory, 'vocabulary.json'))
+    with open(generation_path(files[-1], generation), 'w') as f:
+        json.dump(graph['vocabulary'], f)
+    # meta.json names the generation: readers treat it as the graph's version
+    return [write_meta(os.path.join(directory, 'meta.json'), {'seq': seq}, generation, files)]
+
+
+def similar_dir() -> str:
+    return os.environ.get('SIMILAR_DIR', DEFAULT_SIMILAR_DIR)
+
+
+_graph: Optional[SimilarityGraph] = None
+_graph_version = None
+_graph_lock = threading.Lock()
+
+
+def get_similarity_graph(store) -> Optional[SimilarityGraph]:
+    """
+    The built graph (None if it has not been built), following the event store's
+    changes; reloaded when a new graph is published
+    """
+    global _graph, _graph_version
+    meta_path = os.path.join(similar_dir(), 'meta.json')
+    try:
+        stat = os.stat(meta_path)
+    except FileNotFoundError:
+        return None
+    version = (stat.st_ino, stat.st_mtime_ns)
+    with _graph_lock:
+        if version != _graph_version:
+            graph = SimilarityGraph(similar_dir())
+            # Catch up with changes logged before this process subscribed
+            for seq, record in list(store.changes.values()):
+                if record is not None and seq > graph.seq:
+                    graph.on_change(None, record)
+            if _graph is not None:
+                store.subscribers.remove(_graph.on_change)
+            store.subscribe(graph.on_change)
+            _graph, _graph_version = graph, version
+        return _graph
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Similar-events graph tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="Build the neighbour graph from the event corpus")
+    build.add_argument('--corpus', default=None)
+    build.add_argument('--out', default=similar_dir())
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        graph = build_graph(load_corpus(args.corpus))
+        publish_files(write_graph(graph, args.out, snapshot_seq(args.corpus)))
+        print(f"Wrote {len(graph['arrays']['dates'])} dates x {NEIGHBOURS} neighbours to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""
+Statistics Cube
+Event counts by signature key x category x region x century over the whole corpus,
+for questions like "are battles over-represented when Rahu is in Ardra?"
+
+Build it offline (after building the corpus) with:
+    python stats_cube.py build [--corpus data/corpus.jsonl] [--out data/stats]
+"""
+
+import argparse
+import json
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from classification import REGIONS
+from corpus import (
+    load_corpus, event_signature_keys, generation_path, load_generation, new_generation, publish_files,
+    snapshot_seq, write_meta,
+)
+
+DEFAULT_CUBE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'stats')
+
+CATEGORIES = ['battle', 'political', 'discovery', 'religious', 'disaster', 'cultural', 'general', 'birth', 'death']
+REGION_NAMES = list(REGIONS) + ['Unknown']
+FIRST_CENTURY = 6   # 6th century CE (the corpus starts in 525)
+LAST_CENTURY = 21
+CENTURIES = list(range(FIRST_CENTURY, LAST_CENTURY + 1))
+
+
+def century_of(year: int) -> int:
+    """Century number (1-based) of a CE year"""
+    return (year - 1) // 100 + 1
+
+
+def event_cell(event: dict) -> Tuple[int, int, int]:
+    """(category, region, century) indexes of an event in the cube"""
+    century = min(max(century_of(event['year']), FIRST_CENTURY), LAST_CENTURY)
+    return (
+        CATEGORIES.index(event['category']),
+        REGION_NAMES.index(event['region'] or 'Unknown'),
+        century - FIRST_CENTURY,
+    )
+
+
+class StatisticsCube:
+    """
+    Contingency counts held as integer arrays:
+    counts[key, category, region, century] and totals[category, region, century].
+
+    Events added or removed after the cube was built are kept in a small
+    overlay of per-key deltas, so the base arrays never need rebuilding online.
+    `seq` is the event log sequence number the base arrays include.
+    """
+
+    def __init__(self, keys: List[str], counts: np.ndarray, totals: np.ndarray, seq: int = 0):
+        self.keys = keys
+        self.key_index = {key: i for i, key in enumerate(keys)}
+        self.counts = counts
+        self.totals = totals
+        self.seq = seq
+        self.overlay: Dict[int, np.ndarray] = {}
+        self.totals_overlay = np.zeros(totals.shape, dtype=np.int64)
+
+    def add_event(self, keys: List[str], cell: Tuple[int, int, int], delta: int = 1):
+        """Count (or with delta=-1, uncount) one event"""
+        self.totals_overlay[cell] += delta
+        for key in keys:
+            index = self.key_index.get(key)
+            if index is None:
+                index = self.key_index[key] = len(self.keys)
+                self.keys.append(key)
+            if index not in self.overlay:
+                self.overlay[index] = np.zeros(self.totals.shape, dtype=np.int64)
+            self.overlay[index][cell] += delta
+
+    def _key_counts(self, index: int) -> np.ndarray:
+        counts = self.counts[index] if index < len(self.counts) else np.zeros(self.totals.shape, dtype=np.int64)
+        if index in self.overlay:
+            return counts + self.overlay[index]
+        return counts
+
+    def _select(self, array: np.ndarray, region: Optional[str],
+                century_from: Optional[int], century_to: Optional[int]) -> np.ndarray:
+        """Sum an array with trailing (region, century) axes down to per-category counts"""
+        first = max((century_from or FIRST_CENTURY) - FIRST_CENTURY, 0)
+        last = min((century_to or LAST_CENTURY) - FIRST_CENTURY, len(CENTURIES) - 1) + 1
+        array = array[..., first:last]
+        if region:
+            array = array[..., REGION_NAMES.index(region), :]
+            return array.sum(axis=-1, dtype=np.int64)
+        return array.sum(axis=(-2, -1), dtype=np.int64)
+
+    def enrichment(
+        self,
+        key: str,
+        category: Optional[str] = None,
+        region: Optional[str] = None,
+        century_from: Optional[int] = None,
+        century_to: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Over/under-representation of categories among events carrying a signature key.
+        Returns one row per category (or only the requested one) with the 2x2 table,
+        the enrichment ratio P(category | key) / P(category), chi-square and p-value.
+        """
+        with_key = self._select(self._key_counts(self.key_index[key]), region, century_from, century_to)
+        everything = self._select(self.totals + self.totals_overlay, region, century_from, century_to)
+        total = int(everything.sum())
+        total_with_key = int(with_key.sum())
+
+        rows = []
+        for index, name in enumerate(CATEGORIES):
+            if category and name != category:
+                continue
+            rows.append(_two_by_two(name, int(with_key[index]), total_with_key,
+                                    int(everything[index]), total))
+        return rows
+
+
+def _two_by_two(category: str, a: int, with_key: int, in_category: int, total: int) -> dict:
+    """Statistics for the table [[a, b], [c, d]] of key x category membership"""
+    b = with_key - a
+    c = in_category - a
+    d = total - with_key - c
+
+    enrichment = None
+    if with_key and in_category:
+        enrichment = round((a / with_key) / (in_category / total), 4)
+
+    chi_square, p_value = 0.0, 1.0
+    denominator = (a + b) * (c + d) * (a + c) * (b + d)
+    if denominator:
+        chi_square = total * (a * d - b * c) ** 2 / denominator
+        p_value = math.erfc(math.sqrt(chi_square / 2))  # chi-square with 1 degree of freedom
+
+    return {
+        'category': category,
+        'events_with_key': a,
+        'events_with_key_total': with_key,
+        'events_in_category': in_category,
+        'events_total': total,
+        'enrichment': enrichment,
+        'chi_square': round(chi_square, 4),
+        'p_value': p_value,
+    }
+
+
+def build_cube(corpus: List[dict], seq: int = 0) -> StatisticsCube:
+    """Count every corpus event into the cube"""
+    key_index: Dict[str, int] = {}
+    entries = []
+    totals = np.zeros((len(CATEGORIES), len(REGION_NAMES), len(CENTURIES)), dtype=np.int64)
+
+    for event in corpus:
+        keys = event_signature_keys(event)
+        if keys is None:
+            continue
+
+        cell = event_cell(event)
+        totals[cell] += 1
+        for key in keys:
+            entries.append((key_index.setdefault(key, len(key_index)),) + cell)
+
+    counts = np.zeros((len(key_index),) + totals.shape, dtype=np.int64)
+    if entries:
+        np.add.at(counts, tuple(np.array(entries).T), 1)
+
+    return StatisticsCube(list(key_index), _compact(counts, totals), _compact(totals, totals), seq)
+
+
+def _compact(array: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """Smallest unsigned dtype that holds every count (totals bound every cell)"""
+    dtype = np.uint16 if totals.max(initial=0) <= np.iinfo(np.uint16).max else np.uint32
+    return array.astype(dtype)
+
+
+def merge_cube_changes(cube: StatisticsCube, changes: List[Tuple[Optional[List[str]], dict, int]],
+                       seq: int) -> StatisticsCube:
+    """
+    Fold (signature keys, event, +1/-1) changes into a cube, returning a new
+    cube whose base arrays include the event log up to seq
+    """
+    for keys, event, delta in changes:
+        if keys is not None:
+            cube.add_event(keys, event_cell(event), delta)
+
+    counts = np.zeros((len(cube.keys),) + cube.totals.shape, dtype=np.int64)
+    counts[:len(cube.counts)] = cube.counts
+    for index, overlay in cube.overlay.items():
+        counts[index] += overlay
+    totals = cube.totals + cube.totals_overlay
+
+    return StatisticsCube(cube.keys, _compact(counts, totals), _compact(totals, totals), seq)
+
+
+def write_cube(cube: StatisticsCube, directory: str) -> List[Tuple[str, str]]:
+    """Write the files of a new cube generation; returns (temporary, final) pairs for publish_files"""
+    os.makedirs(directory, exist_ok=True)
+    generation = new_generation()
+    files = [os.path.join(directory, name) for name in ('counts.npy', 'totals.npy', 'keys.json')]
+    np.save(generation_path(files[0], generation), cube.counts)
+    np.save(generation_path(files[1], generation), cube.totals)
+    with open(generation_path(files[2], generation), 'w') as f:
+        json.dump(cube.keys, f)
+    # meta.json names the generation: readers treat it as the cube's version
+    return [write_meta(os.path.join(directory, 'meta.json'), {'seq': cube.seq}, generation, files)]
+
+
+def save_cube(cube: StatisticsCube, directory: str):
+    """Write a cube; published atomically, so readers keep their old mapping"""
+    publish_files(write_cube(cube, directory))
+
+
+def load_cube(directory: Optional[str] = None, mmap: bool = True) -> Optional[StatisticsCube]:
+    """Load a built cube, or None if it has not been built"""
+    directory = directory or os.environ.get('STATS_CUBE_DIR', DEFAULT_CUBE_DIR)
+    meta_path = os.path.join(directory, 'meta.json')
+    if not os.path.exists(meta_path) and not os.path.exists(os.path.join(directory, 'keys.json')):
+        return None
+
+    def load(meta: dict) -> StatisticsCube:
+        def path(name: str) -> str:
+            return generation_path(os.path.join(directory, name), meta.get('generation'))
+
+        with open(path('keys.json')) as f:
+            keys = json.load(f)
+        return StatisticsCube(
+            keys,
+            np.load(path('counts.npy'), mmap_mode='r' if mmap else None),
+            np.load(path('totals.npy')),
+            meta.get('seq', 0),
+        )
+
+    return load_generation(meta_path, load)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Statistics cube tools")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="Build the cube from the event corpus")
+    build.add_argument('--corpus', default=None)
+    build.add_argument('--out', default=os.environ.get('STATS_CUBE_DIR', DEFAULT_CUBE_DIR))
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        cube = build_cube(load_corpus(args.corpus), snapshot_seq(args.corpus))
+        save_cube(cube, args.out)
+        print(f"Wrote {len(cube.keys)} signature keys x {len(CATEGORIES)} categories to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""DayIndex filtering against the list comprehensions it replaced"""
+
+import random
+from typing import Optional
+
+import pytest
+
+from classification import REGIONS
+from day_index import DayIndex
+
+COUNTRIES = sorted({country for countries in REGIONS.values() for country in countries})[:30]
+CATEGORIES = ["battle", "political", "religious", "disaster", "general"]
+
+
+def make_payload(rng: random.Random, size: int) -> dict:
+    def item(category: str) -> dict:
+        return {
+            "year": rng.randint(400, 2024),
+            "text": "",
+            "category": category,
+            "countries": rng.sample(COUNTRIES, rng.randint(0, 3)),
+        }
+
+    payload = {
+        "events": [item(rng.choice(CATEGORIES)) for _ in range(size)],
+        "births": [item("birth") for _ in range(size // 2)],
+        "deaths": [item("death") for _ in range(size // 2)],
+    }
+    for name in DayIndex.LISTS:
+        # Newest first, as processed days are; repeated years keep their order
+        payload[name].sort(key=lambda e: e["year"], reverse=True)
+    return payload
+
+
+def filter_by_scan(
+    payload: dict,
+    category: Optional[str],
+    year_from: Optional[int],
+    year_to: Optional[int],
+    country: Optional[str],
+    region: Optional[str],
+) -> dict:
+    data = {name: list(items) for name, items in payload.items()}
+    if category:
+        data["events"] = [e for e in data["events"] if e["category"] == category]
+    for name in DayIndex.LISTS:
+        if year_from:
+            data[name] = [e for e in data[name] if e["year"] >= year_from]
+        if year_to:
+            data[name] = [e for e in data[name] if e["year"] <= year_to]
+        if country:
+            data[name] = [e for e in data[name] if country in e.get("countries", [])]
+        if region:
+            region_countries = REGIONS.get(region, [])
+            data[name] = [e for e in data[name] if any(c in region_countries for c in e.get("countries", []))]
+    return data
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_filter_matches_scan(seed):
+    rng = random.Random(seed)
+    payload = make_payload(rng, 300)
+    index = DayIndex(payload)
+
+    for _ in range(200):
+        filters = (
+            rng.choice([None, "nope"] + CATEGORIES),
+            rng.choice([None, 0, 600, 1500, 1900]),
+            rng.choice([None, 0, 700, 1600, 1950, 3000]),
+            rng.choice([None, "Atlantis"] + COUNTRIES),
+            rng.choice([None, "Nowhere"] + list(REGIONS)),
+        )
+        assert index.filter(*filters) == filter_by_scan(payload, *filters), filters
+
+
+def test_filter_leaves_payload_unchanged():
+    payload = make_payload(random.Random(7), 50)
+    snapshot = {name: list(items) for name, items in payload.items()}
+
+    DayIndex(payload).filter("battle", 1000, 1900, COUNTRIES[0], next(iter(REGIONS)))
+
+    assert payload == snapshot
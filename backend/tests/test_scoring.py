@@ -0,0 +1,49 @@
+"""SignatureScorer against the per-date dict path it replaces"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from timescale import datetime_to_jd
+from vedic_calc import (
+    SignatureScorer,
+    calculate_sidereal_longitudes_batch,
+    find_matching_signatures,
+    get_planetary_signatures,
+    match_counts,
+)
+
+REFERENCES = [datetime(2024, 3, 1, 12), datetime(1947, 8, 15, 12), datetime(1066, 10, 14, 12)]
+
+
+def event_dates(count: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    return [
+        datetime(int(year), int(month), int(day), 12)
+        for year, month, day in zip(rng.integers(600, 2024, count), rng.integers(1, 13, count), rng.integers(1, 29, count))
+    ]
+
+
+@pytest.mark.parametrize("reference", REFERENCES)
+@pytest.mark.parametrize("ayanamsha", ["lahiri", "raman"])
+def test_counts_match_dict_path(reference, ayanamsha):
+    reference_signatures = get_planetary_signatures(reference, ayanamsha)
+    dates = event_dates(40, seed=reference.year)
+    jds = np.array([datetime_to_jd(dt) for dt in dates])
+
+    counts = SignatureScorer(reference_signatures).counts(calculate_sidereal_longitudes_batch(jds, ayanamsha), jds)
+
+    for dt, batch in zip(dates, counts):
+        matches = find_matching_signatures(reference_signatures, get_planetary_signatures(dt, ayanamsha))
+        np.testing.assert_array_equal(batch, match_counts(matches), err_msg=dt.isoformat())
+
+
+def test_reference_matches_itself():
+    reference = REFERENCES[0]
+    signatures = get_planetary_signatures(reference)
+    jds = np.array([datetime_to_jd(reference)])
+
+    counts = SignatureScorer(signatures).counts(calculate_sidereal_longitudes_batch(jds), jds)
+
+    np.testing.assert_array_equal(counts[0], match_counts(find_matching_signatures(signatures, signatures)))
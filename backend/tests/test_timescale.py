@@ -0,0 +1,50 @@
+"""Julian Days across the 1582 Julian-to-Gregorian cutover"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from timescale import GREGORIAN_CUTOVER, calendar_date, datetime_to_jd, julian_day, julian_days
+
+
+def test_cutover_is_default():
+    assert (GREGORIAN_CUTOVER.year, GREGORIAN_CUTOVER.month, GREGORIAN_CUTOVER.day) == (1582, 10, 15)
+
+
+def test_last_julian_day_is_followed_by_first_gregorian_day():
+    # Thursday 4 October 1582 (Julian) was followed by Friday 15 October 1582 (Gregorian)
+    assert julian_day(1582, 10, 4) == 2299159.5
+    assert julian_day(1582, 10, 15) == 2299160.5
+
+
+@pytest.mark.parametrize("date, jd", [
+    ((1582, 10, 4), 2299159.5),
+    ((1582, 10, 15), 2299160.5),
+    ((1582, 10, 16), 2299161.5),
+    ((1000, 1, 1), 2086307.5),
+    ((2000, 1, 1), 2451544.5),
+])
+def test_known_julian_days(date, jd):
+    assert julian_day(*date) == jd
+    assert calendar_date(jd) == date
+
+
+def test_batch_matches_scalar_across_cutover():
+    # 1500 is a leap year in the Julian calendar only
+    dates = [(1582, 10, day) for day in (1, 2, 3, 4, 15, 16, 17)] + [(1582, 2, 28), (1583, 3, 1), (1500, 2, 29)]
+    years, months, days = zip(*dates)
+
+    batch = julian_days(years, months, days, 12.0)
+
+    np.testing.assert_array_equal(batch, [julian_day(*date, 12.0) for date in dates])
+
+
+def test_datetime_to_jd_at_cutover():
+    # datetime is proleptic Gregorian, but its fields are read as the calendar in use
+    assert datetime_to_jd(datetime(1582, 10, 4, 12)) + 1 == datetime_to_jd(datetime(1582, 10, 15, 12))
+
+
+def test_calendar_date_round_trips_across_cutover():
+    for jd in np.arange(2299100.5, 2299220.5):
+        assert julian_day(*calendar_date(jd)) == jd
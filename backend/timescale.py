@@ -0,0 +1,167 @@
+"""
+Time Scales
+Calendar dates to Julian Days and back, and Universal Time to Terrestrial Time.
+
+Dates before the Gregorian cutover (GREGORIAN_CUTOVER, default 1582-10-15, the
+first Gregorian day) are read as Julian calendar dates, as historical sources
+give them. Set GREGORIAN_CUTOVER=0001-01-01 for a proleptic Gregorian calendar.
+
+Planetary theories run on Terrestrial Time; timestamps are Universal Time.
+The difference, delta T, comes from the Espenak & Meeus (2006) polynomials.
+"""
+
+import math
+import os
+from bisect import bisect_right
+from datetime import date, datetime
+from typing import Tuple, Union
+
+import numpy as np
+
+
+def _parse_cutover(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+GREGORIAN_CUTOVER = _parse_cutover(os.environ.get("GREGORIAN_CUTOVER", "1582-10-15"))
+_CUTOVER_KEY = GREGORIAN_CUTOVER.year * 10000 + GREGORIAN_CUTOVER.month * 100 + GREGORIAN_CUTOVER.day
+
+SECONDS_PER_DAY = 86400.0
+J2000 = 2451545.0
+
+
+def _is_gregorian(year: int, month: int, day: int) -> bool:
+    return year * 10000 + month * 100 + day >= _CUTOVER_KEY
+
+
+def julian_day(year: int, month: int, day: int, hours: float = 0.0) -> float:
+    """Julian Day (UT) of a calendar date and time of day (Meeus, ch. 7)"""
+    gregorian = _is_gregorian(year, month, day)
+    if month <= 2:
+        year -= 1
+        month += 12
+    b = 0
+    if gregorian:
+        a = math.floor(year / 100)
+        b = 2 - a + math.floor(a / 4)
+    return math.floor(365.25 * (year + 4716)) + math.floor(30.6001 * (month + 1)) + day + hours / 24 + b - 1524.5
+
+
+def datetime_to_jd(dt: datetime) -> float:
+    """Julian Day (UT) of a datetime whose fields are a calendar date and UT time"""
+    hours = dt.hour + dt.minute / 60 + dt.second / 3600
+    return julian_day(dt.year, dt.month, dt.day, hours)
+
+
+_CUTOVER_DAY = math.floor(julian_day(GREGORIAN_CUTOVER.year, GREGORIAN_CUTOVER.month, GREGORIAN_CUTOVER.day) + 0.5)
+
+
+def julian_days(years, months, days, hours=0.0) -> np.ndarray:
+    """Julian Days (UT) of arrays of calendar dates (same rules as julian_day)"""
+    years = np.asarray(years, dtype=np.int64)
+    months = np.asarray(months, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    gregorian = years * 10000 + months * 100 + days >= _CUTOVER_KEY
+
+    shift = months <= 2
+    years = np.where(shift, years - 1, years)
+    months = np.where(shift, months + 12, months)
+    a = np.floor(years / 100)
+    b = np.where(gregorian, 2 - a + np.floor(a / 4), 0)
+    return (np.floor(365.25 * (years + 4716)) + np.floor(30.6001 * (months + 1))
+            + days + np.asarray(hours, dtype=np.float64) / 24 + b - 1524.5)
+
+
+def calendar_date(jd: float) -> Tuple[int, int, int]:
+    """(year, month, day) of the calendar day containing a Julian Day (Meeus, ch. 7)"""
+    z = math.floor(jd + 0.5)
+    a = z
+    if z >= _CUTOVER_DAY:
+        alpha = math.floor((z - 1867216.25) / 36524.25)
+        a = z + 1 + alpha - math.floor(alpha / 4)
+    b = a + 1524
+    c = math.floor((b - 122.1) / 365.25)
+    d = math.floor(365.25 * c)
+    e = math.floor((b - d) / 30.6001)
+    day = b - d - math.floor(30.6001 * e)
+    month = e - 1 if e < 14 else e - 13
+    year = c - 4716 if month > 2 else c - 4715
+    return year, month, day
+
+
+def jd_to_iso(jd: float, date_only: bool = False) -> str:
+    """Calendar date (and UT time to the minute, truncated) of a Julian Day as ISO text"""
+    minutes = math.floor((jd + 0.5) * 1440)
+    year, month, day = calendar_date(minutes // 1440 - 0.5)
+    text = f"{year:04d}-{month:02d}-{day:02d}"
+    if date_only:
+        return text
+    minute_of_day = minutes % 1440
+    return f"{text}T{minute_of_day // 60:02d}:{minute_of_day % 60:02d}"
+
+
+# Delta T segments: (end year, origin, scale, coefficients); within a segment
+# delta T = sum(c[i] * t**i) seconds with t = (year - origin) / scale
+DELTA_T_SEGMENTS = [
+    (-500, 1820, 100, (-20.0, 0.0, 32.0)),
+    (500, 0, 100, (10583.6, -1014.41, 33.78311, -5.952053, -0.1798452, 0.022174192, 0.0090316521)),
+    (1600, 1000, 100, (1574.2, -556.01, 71.23472, 0.319781, -0.8503463, -0.005050998, 0.0083572073)),
+    (1700, 1600, 1, (120.0, -0.9808, -0.01532, 1 / 7129)),
+    (1800, 1700, 1, (8.83, 0.1603, -0.0059285, 0.00013336, -1 / 1174000)),
+    (1860, 1800, 1, (13.72, -0.332447, 0.0068612, 0.0041116, -0.00037436, 0.0000121272,
+                     -0.0000001699, 0.000000000875)),
+    (1900, 1860, 1, (7.62, 0.5737, -0.251754, 0.01680668, -0.0004473624, 1 / 233174)),
+    (1920, 1900, 1, (-2.79, 1.494119, -0.0598939, 0.0061966, -0.000197)),
+    (1941, 1920, 1, (21.20, 0.84493, -0.076100, 0.0020936)),
+    (1961, 1950, 1, (29.07, 0.407, -1 / 233, 1 / 2547)),
+    (1986, 1975, 1, (45.45, 1.067, -1 / 260, -1 / 718)),
+    (2005, 2000, 1, (63.86, 0.3345, -0.060374, 0.0017275, 0.000651814, 0.00002373599)),
+    (2050, 2000, 1, (62.92, 0.32217, 0.005589)),
+    # -20 + 32u^2 - 0.5628(2150 - year) with u = (year - 1820) / 100, expanded in u
+    (2150, 1820, 100, (-205.724, 56.28, 32.0)),
+    (math.inf, 1820, 100, (-20.0, 0.0, 32.0)),
+]
+_SEGMENT_ENDS = [segment[0] for segment in DELTA_T_SEGMENTS]
+
+
+def _decimal_year(jd):
+    return 2000.0 + (jd - J2000) / 365.25
+
+
+def delta_t(jd: float) -> float:
+    """TT - UT in seconds at a Julian Day"""
+    year = _decimal_year(jd)
+    _, origin, scale, coefficients = DELTA_T_SEGMENTS[bisect_right(_SEGMENT_ENDS, year)]
+    t = (year - origin) / scale
+    value = 0.0
+    for c in reversed(coefficients):
+        value = value * t + c
+    return value
+
+
+def delta_t_array(jds: np.ndarray) -> np.ndarray:
+    """TT - UT in seconds for an array of Julian Days (same arithmetic as delta_t)"""
+    years = _decimal_year(np.asarray(jds, dtype=np.float64))
+    segments = np.searchsorted(_SEGMENT_ENDS, years, side='right')
+    values = np.empty_like(years)
+    for index in np.unique(segments):
+        _, origin, scale, coefficients = DELTA_T_SEGMENTS[index]
+        mask = segments == index
+        t = (years[mask] - origin) / scale
+        value = np.zeros_like(t)
+        for c in reversed(coefficients):
+            value = value * t + c
+        values[mask] = value
+    return values
+
+
+def terrestrial_time(jd: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """Julian Day in Terrestrial Time of a Julian Day (or array of them) in Universal Time"""
+    if isinstance(jd, np.ndarray):
+        return jd + delta_t_array(jd) / SECONDS_PER_DAY
+    return jd + delta_t(jd) / SECONDS_PER_DAY
+
+
+def weekday_index(jd: float) -> int:
+    """Day of the week of a Julian Day (UT), 0 = Sunday"""
+    return int(math.floor(jd + 1.5) % 7)
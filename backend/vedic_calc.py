@@ -1,28 +1,32 @@
 """
 Vedic Astrology Calculation Engine
 Calculates planetary positions using sidereal (Vedic) zodiac with Lahiri Ayanamsha
+(or another of AYANAMSHAS)
 """
 
-import math
 from datetime import datetime, date
 from typing import Dict, List, Tuple, Optional
 
+import numpy as np
+
+from cache import LRUCache, cache_size
+from ephemeris import PLANETS, PLANET_NAMES, get_ephemeris
+from timescale import datetime_to_jd, terrestrial_time, weekday_index
+
 # Ayanamsha constants (Lahiri)
 AYANAMSHA_J2000 = 23.85  # degrees at J2000 epoch
 AYANAMSHA_RATE = 50.29 / 3600  # arcseconds per year in degrees
 
-# Planets with mean orbital elements at J2000 epoch
-PLANETS = {
-    'Sun': {'period': 365.25636, 'longitude0': 280.46646, 'daily_motion': 0.9856474},
-    'Moon': {'period': 27.321582, 'longitude0': 218.3165, 'daily_motion': 13.176358},
-    'Mercury': {'period': 87.969, 'longitude0': 252.2511, 'daily_motion': 4.0923344},
-    'Venus': {'period': 224.701, 'longitude0': 181.9798, 'daily_motion': 1.6021302},
-    'Mars': {'period': 686.98, 'longitude0': 355.4330, 'daily_motion': 0.5240208},
-    'Jupiter': {'period': 4332.59, 'longitude0': 34.3515, 'daily_motion': 0.0830853},
-    'Saturn': {'period': 10759.22, 'longitude0': 49.9429, 'daily_motion': 0.0334442},
-    'Rahu': {'period': 6793.5, 'longitude0': 125.0, 'daily_motion': -0.0529539},
-    'Ketu': {'period': 6793.5, 'longitude0': 305.0, 'daily_motion': -0.0529539},
+# Ayanamsha systems: (degrees at J2000, degrees per year). Only the offset
+# from tropical longitudes differs between them, so tropical longitudes are
+# what is cached and precomputed, and a system is applied at query time.
+AYANAMSHAS = {
+    'lahiri': (AYANAMSHA_J2000, AYANAMSHA_RATE),
+    'raman': (22.41, 50.33 / 3600),
+    'kp': (23.76, 50.24 / 3600),
+    'yukteshwar': (22.48, 50.29 / 3600),
 }
+DEFAULT_AYANAMSHA = 'lahiri'
 
 # Rashis (Zodiac Signs)
 RASHIS = [
@@ -82,28 +86,79 @@ DIGNITY = {
     'Saturn': {'exalted': 6, 'debilitated': 0},
 }
 
+# Tithis (30 lunar days: Moon-Sun elongation in 12 degree steps)
+TITHI_NAMES = [
+    'Pratipada', 'Dwitiya', 'Tritiya', 'Chaturthi', 'Panchami', 'Shashthi', 'Saptami',
+    'Ashtami', 'Navami', 'Dashami', 'Ekadashi', 'Dwadashi', 'Trayodashi', 'Chaturdashi',
+]
+TITHIS = (
+    [{'id': i, 'number': i + 1, 'name': name, 'paksha': 'Shukla'} for i, name in enumerate(TITHI_NAMES + ['Purnima'])]
+    + [{'id': 15 + i, 'number': 16 + i, 'name': name, 'paksha': 'Krishna'} for i, name in enumerate(TITHI_NAMES + ['Amavasya'])]
+)
+
+# Yogas (27 divisions of the Sun + Moon longitude sum)
+YOGAS = [
+    'Vishkambha', 'Priti', 'Ayushman', 'Saubhagya', 'Shobhana', 'Atiganda', 'Sukarma',
+    'Dhriti', 'Shula', 'Ganda', 'Vriddhi', 'Dhruva', 'Vyaghata', 'Harshana', 'Vajra',
+    'Siddhi', 'Vyatipata', 'Variyan', 'Parigha', 'Shiva', 'Siddha', 'Sadhya', 'Shubha',
+    'Shukla', 'Brahma', 'Indra', 'Vaidhriti',
+]
+
+# Karanas (half tithis): 7 movable karanas repeat 8 times, 4 fixed ones fill the rest
+KARANAS = [
+    'Bava', 'Balava', 'Kaulava', 'Taitila', 'Garaja', 'Vanija', 'Vishti',
+    'Shakuni', 'Chatushpada', 'Naga', 'Kimstughna',
+]
+
+# Varas (weekdays), Sunday first
+VARAS = [
+    {'id': 0, 'name': 'Ravivara', 'english': 'Sunday', 'ruler': 'Sun'},
+    {'id': 1, 'name': 'Somavara', 'english': 'Monday', 'ruler': 'Moon'},
+    {'id': 2, 'name': 'Mangalavara', 'english': 'Tuesday', 'ruler': 'Mars'},
+    {'id': 3, 'name': 'Budhavara', 'english': 'Wednesday', 'ruler': 'Mercury'},
+    {'id': 4, 'name': 'Guruvara', 'english': 'Thursday', 'ruler': 'Jupiter'},
+    {'id': 5, 'name': 'Shukravara', 'english': 'Friday', 'ruler': 'Venus'},
+    {'id': 6, 'name': 'Shanivara', 'english': 'Saturday', 'ruler': 'Saturn'},
+]
+
+# Weight of each signature type in the correlation score
+SIGNATURE_WEIGHTS = {
+    'planet_in_nakshatra': 3,  # Most specific
+    'conjunctions': 3,
+    'aspects': 2,
+    'dignities': 2,
+    'planet_in_rashi': 1,      # Least specific
+    'panchanga': 1,
+    'houses': 2,               # Only for charts with a location (see houses.py)
+    'conditions': 2,           # Retrograde, combust, graha yuddha
+}
+
+# The five star planets: the only ones with retrograde phases (the nodes always
+# move backwards) and the only ones that fight planetary wars
+TARA_GRAHAS = ['Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn']
 
-def date_to_jd(dt: datetime) -> float:
-    """Convert datetime to Julian Day Number"""
-    year = dt.year
-    month = dt.month
-    day = dt.day + (dt.hour + dt.minute / 60) / 24
+# Degrees from the Sun within which a planet is combust; retrograde Mercury and
+# Venus, being nearer the Earth, only within smaller orbs
+COMBUSTION_ORBS = {'Moon': 12, 'Mercury': 14, 'Venus': 10, 'Mars': 17, 'Jupiter': 11, 'Saturn': 15}
+RETROGRADE_COMBUSTION_ORBS = {**COMBUSTION_ORBS, 'Mercury': 12, 'Venus': 8}
 
-    if month <= 2:
-        year -= 1
-        month += 12
+# Two star planets within this many degrees are in graha yuddha
+GRAHA_YUDDHA_ORB = 1.0
 
-    a = math.floor(year / 100)
-    b = 2 - a + math.floor(a / 4)
+# Daily motions are central differences over this many days either side
+MOTION_STEP = 0.5
 
-    return math.floor(365.25 * (year + 4716)) + math.floor(30.6001 * (month + 1)) + day + b - 1524.5
 
+def ayanamsha_at(jd_tt, ayanamsha: str = DEFAULT_AYANAMSHA):
+    """Ayanamsha (of an AYANAMSHAS system) at a Julian Day (TT), or an array of them"""
+    at_j2000, rate = AYANAMSHAS[ayanamsha]
+    years_from_j2000 = (jd_tt - 2451545.0) / 365.25
+    return at_j2000 + rate * years_from_j2000
 
-def calculate_ayanamsha(dt: datetime) -> float:
-    """Calculate Lahiri Ayanamsha for a given date"""
-    jd = date_to_jd(dt)
-    years_from_j2000 = (jd - 2451545.0) / 365.25
-    return AYANAMSHA_J2000 + AYANAMSHA_RATE * years_from_j2000
+
+def calculate_ayanamsha(dt: datetime, jd: Optional[float] = None, ayanamsha: str = DEFAULT_AYANAMSHA) -> float:
+    """Calculate the Ayanamsha for a given date (jd: its Julian Day, if already known)"""
+    return ayanamsha_at(terrestrial_time(jd if jd is not None else datetime_to_jd(dt)), ayanamsha)
 
 
 def normalize_angle(angle: float) -> float:
@@ -112,27 +167,17 @@ def normalize_angle(angle: float) -> float:
     return angle if angle >= 0 else angle + 360
 
 
-def calculate_tropical_longitude(planet: str, dt: datetime) -> float:
-    """Calculate tropical longitude for a planet"""
-    jd = date_to_jd(dt)
-    days_from_j2000 = jd - 2451545.0
-    data = PLANETS[planet]
-    
-    longitude = data['longitude0'] + data['daily_motion'] * days_from_j2000
-    
-    # Simple perturbation for inner planets
-    if planet in ('Mercury', 'Venus'):
-        anomaly = (days_from_j2000 * 360 / data['period']) % 360
-        longitude += 5 * math.sin(math.radians(anomaly))
-    
-    return normalize_angle(longitude)
+def calculate_tropical_longitude(planet: str, dt: datetime, jd: Optional[float] = None) -> float:
+    """Calculate tropical longitude for a planet using the active ephemeris backend"""
+    jd_tt = terrestrial_time(jd if jd is not None else datetime_to_jd(dt))
+    return get_ephemeris().tropical_longitude(planet, jd_tt)
 
 
-def calculate_sidereal_longitude(planet: str, dt: datetime) -> float:
+def calculate_sidereal_longitude(planet: str, dt: datetime, jd: Optional[float] = None,
+                                 ayanamsha: str = DEFAULT_AYANAMSHA) -> float:
     """Calculate sidereal (Vedic) longitude"""
-    tropical = calculate_tropical_longitude(planet, dt)
-    ayanamsha = calculate_ayanamsha(dt)
-    return normalize_angle(tropical - ayanamsha)
+    jd_tt = terrestrial_time(jd if jd is not None else datetime_to_jd(dt))
+    return normalize_angle(get_ephemeris().tropical_longitude(planet, jd_tt) - ayanamsha_at(jd_tt, ayanamsha))
 
 
 def get_rashi(longitude: float) -> dict:
@@ -163,23 +208,122 @@ def get_dignity(planet: str, rashi_id: int) -> Optional[str]:
     return None
 
 
-def calculate_planetary_positions(dt: datetime) -> Dict[str, dict]:
-    """Calculate all planetary positions for a date"""
-    positions = {}
+def get_tithi_index(sun_longitude: float, moon_longitude: float) -> int:
+    """Tithi index (0-29) from Sun and Moon longitudes"""
+    return int(normalize_angle(moon_longitude - sun_longitude) / 12)
+
+
+def get_yoga_index(sun_longitude: float, moon_longitude: float) -> int:
+    """Yoga index (0-26) from Sun and Moon longitudes"""
+    return int(normalize_angle(moon_longitude + sun_longitude) / (360 / 27))
+
+
+def get_karana_index(sun_longitude: float, moon_longitude: float) -> int:
+    """Half-tithi index (0-59) from Sun and Moon longitudes"""
+    return int(normalize_angle(moon_longitude - sun_longitude) / 6)
+
+
+def karana_name_index(half_tithi: int) -> int:
+    """Index into KARANAS for a half-tithi index (0-59)"""
+    if half_tithi == 0:
+        return 10  # Kimstughna
+    if half_tithi >= 57:
+        return half_tithi - 50  # Shakuni, Chatushpada, Naga
+    return (half_tithi - 1) % 7
+
+
+def get_vara_index(jd: float) -> int:
+    """Vara index (0 = Sunday) for a Julian Day (UT)"""
+    return weekday_index(jd)
+
+
+def tropical_motions_batch(jds_tt: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tropical longitudes and daily motions (degrees per day, negative when
+    retrograde) for an array of Julian Days (TT), each (len(jds_tt), len(PLANET_NAMES)),
+    from one ephemeris batch
+    """
+    jds_tt = np.asarray(jds_tt, dtype=np.float64)
+    n = len(jds_tt)
+    longitudes = get_ephemeris().tropical_longitudes(
+        np.concatenate([jds_tt, jds_tt - MOTION_STEP, jds_tt + MOTION_STEP])
+    )
+    motions = (np.mod(longitudes[2 * n:] - longitudes[n:2 * n] + 180, 360) - 180) / (2 * MOTION_STEP)
+    return longitudes[:n], motions
+
+
+def calculate_daily_motions_batch(jds: np.ndarray) -> np.ndarray:
+    """Daily motions for an array of Julian Days (UT), shape (len(jds), len(PLANET_NAMES))"""
+    return tropical_motions_batch(terrestrial_time(np.asarray(jds, dtype=np.float64)))[1]
+
+
+# Tropical longitudes and motions depend only on the moment and the ephemeris,
+# so they are cached per worker, once for every ayanamsha
+_tropical_cache = LRUCache(cache_size('charts', 2048))
+
+
+def calculate_tropical_batch(dts: List[datetime]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Tropical longitudes and daily motions for many dates, each shape
+    (len(dts), len(PLANET_NAMES)); those not already cached are calculated in
+    one batch and cached
+    """
+    ephemeris = get_ephemeris()
+    states = np.empty((len(dts), 2, len(PLANET_NAMES)), dtype=np.float64)
+    missing = []
+    for i, dt in enumerate(dts):
+        cached = _tropical_cache.get((dt, ephemeris.name))
+        if cached is None:
+            missing.append(i)
+        else:
+            states[i] = cached
+    if missing:
+        jds_tt = terrestrial_time(np.array([datetime_to_jd(dts[i]) for i in missing], dtype=np.float64))
+        calculated = np.stack(tropical_motions_batch(jds_tt), axis=1)
+        for i, state in zip(missing, calculated):
+            _tropical_cache.put((dts[i], ephemeris.name), state)
+        states[missing] = calculated
+    return states[:, 0], states[:, 1]
+
+
+def calculate_chart_state(dt: datetime, jd: Optional[float] = None,
+                          ayanamsha: str = DEFAULT_AYANAMSHA) -> Tuple[Dict[str, float], Dict[str, np.ndarray]]:
+    """
+    Sidereal longitudes of every planet for a date, from the cached tropical
+    ones, and the chart's planet_conditions (one chart's row of each)
+    """
+    tropical, motions = calculate_tropical_batch([dt])
+    sidereal = np.mod(tropical - calculate_ayanamsha(dt, jd, ayanamsha), 360)
+    conditions = {name: flags[0] for name, flags in planet_conditions(sidereal, motions).items()}
+    return dict(zip(PLANET_NAMES, sidereal[0].tolist())), conditions
+
+
+def calculate_planetary_positions(dt: datetime, jd: Optional[float] = None,
+                                  ayanamsha: str = DEFAULT_AYANAMSHA) -> Dict[str, dict]:
+    """Calculate all planetary positions for a date (jd: its Julian Day, if already known)"""
+    return positions_from_longitudes(*calculate_chart_state(dt, jd, ayanamsha))
+
+
+def positions_from_longitudes(longitudes: Dict[str, float], conditions: Dict[str, np.ndarray]) -> Dict[str, dict]:
+    """Planetary positions from sidereal longitudes by planet and the chart's planet_conditions"""
+    opponents = {}
+    for pair in np.flatnonzero(conditions['graha_yuddha']):
+        first, second = (PLANET_NAMES[i] for i in WAR_PAIRS[pair])
+        opponents[first], opponents[second] = second, first
     
-    for planet in PLANETS:
-        longitude = calculate_sidereal_longitude(planet, dt)
+    positions = {}
+    for index, (planet, longitude) in enumerate(longitudes.items()):
         rashi = get_rashi(longitude)
-        nakshatra = get_nakshatra(longitude)
-        
         positions[planet] = {
             'planet': planet,
             'longitude': round(longitude, 2),
             'rashi': rashi,
-            'nakshatra': nakshatra,
+            'nakshatra': get_nakshatra(longitude),
             'dignity': get_dignity(planet, rashi['id']),
+            'retrograde': bool(conditions['retrograde'][index]),
+            'combust': bool(conditions['combust'][index]),
+            'graha_yuddha': opponents.get(planet),
         }
-    
     return positions
 
 
@@ -329,27 +473,31 @@ def calculate_aspects(positions: Dict[str, dict]) -> List[dict]:
     return aspects
 
 
-def get_vedic_chart(dt: datetime) -> dict:
+def get_vedic_chart(dt: datetime, ayanamsha: str = DEFAULT_AYANAMSHA) -> dict:
     """Get complete Vedic chart for a date"""
-    positions = calculate_planetary_positions(dt)
+    jd = datetime_to_jd(dt)
+    positions = calculate_planetary_positions(dt, jd, ayanamsha)
     conjunctions = find_conjunctions(positions)
     aspects = calculate_aspects(positions)
     
     return {
         'date': dt.isoformat(),
-        'ayanamsha': round(calculate_ayanamsha(dt), 2),
+        'ayanamsha': round(calculate_ayanamsha(dt, jd, ayanamsha), 2),
+        'ayanamsha_system': ayanamsha,
         'positions': positions,
         'conjunctions': conjunctions,
         'aspects': aspects,
     }
 
 
-def get_planetary_signatures(dt: datetime) -> dict:
+def get_planetary_signatures(dt: datetime, ayanamsha: str = DEFAULT_AYANAMSHA) -> dict:
     """
     Get all planetary signatures for correlation matching.
     Returns a dict of signature keys that can be matched against other dates.
     """
-    positions = calculate_planetary_positions(dt)
+    jd = datetime_to_jd(dt)
+    longitudes, conditions = calculate_chart_state(dt, jd, ayanamsha)
+    positions = positions_from_longitudes(longitudes, conditions)
     conjunctions = find_conjunctions(positions)
     aspects = calculate_aspects(positions)
     
@@ -359,6 +507,9 @@ def get_planetary_signatures(dt: datetime) -> dict:
         'conjunctions': [],          # e.g., "Mars-Saturn_in_Makara"
         'aspects': [],               # e.g., "Saturn_opposition_Sun"
         'dignities': [],             # e.g., "Jupiter_exalted"
+        'panchanga': [],             # e.g., "Tithi_Shukla_Panchami", "Yoga_Siddhi"
+        'houses': [],                # e.g., "Lagna_in_Simha", "Saturn_in_house_10" (added by houses.py)
+        'conditions': condition_signatures(conditions),  # e.g., "Mars_retrograde", "Mars-Venus_graha_yuddha"
     }
     
     for planet, data in positions.items():
@@ -406,9 +557,65 @@ def get_planetary_signatures(dt: datetime) -> dict:
             'type': asp['type'],
         })
     
+    # Panchanga elements
+    sun = longitudes['Sun']
+    moon = longitudes['Moon']
+    tithi = TITHIS[get_tithi_index(sun, moon)]
+    yoga = YOGAS[get_yoga_index(sun, moon)]
+    karana = KARANAS[karana_name_index(get_karana_index(sun, moon))]
+    vara = VARAS[get_vara_index(jd)]
+    signatures['panchanga'].extend([
+        {'key': f"Tithi_{tithi['paksha']}_{tithi['name']}", 'element': 'tithi', 'name': tithi['name'], 'paksha': tithi['paksha']},
+        {'key': f"Yoga_{yoga}", 'element': 'yoga', 'name': yoga},
+        {'key': f"Karana_{karana}", 'element': 'karana', 'name': karana},
+        {'key': f"Vara_{vara['name']}", 'element': 'vara', 'name': vara['name']},
+    ])
+    
+    return signatures
+
+
+def condition_signatures(conditions: Dict[str, np.ndarray]) -> List[dict]:
+    """Retrograde, combust and graha yuddha signatures of one chart's planet_conditions"""
+    signatures = []
+    for index in np.flatnonzero(conditions['retrograde'] & TARA_MASK):
+        planet = PLANET_NAMES[index]
+        signatures.append({'key': f"{planet}_retrograde", 'condition': 'retrograde', 'planet': planet})
+    for index in np.flatnonzero(conditions['combust']):
+        planet = PLANET_NAMES[index]
+        signatures.append({'key': f"{planet}_combust", 'condition': 'combust', 'planet': planet})
+    for pair in np.flatnonzero(conditions['graha_yuddha']):
+        planets = [PLANET_NAMES[i] for i in WAR_PAIRS[pair]]
+        signatures.append({'key': f"{'-'.join(planets)}_graha_yuddha", 'condition': 'graha_yuddha', 'planets': planets})
     return signatures
 
 
+def signature_keys(signatures: dict) -> List[str]:
+    """Flatten a signatures dict from get_planetary_signatures into its keys"""
+    return [item['key'] for items in signatures.values() for item in items]
+
+
+_NAKSHATRA_NAMES = {n['name'] for n in NAKSHATRAS}
+
+
+def signature_key_type(key: str) -> str:
+    """Signature type (a SIGNATURE_WEIGHTS entry) a signature key belongs to"""
+    head = key.split('_', 1)[0]
+    if head in ('Tithi', 'Yoga', 'Karana', 'Vara'):
+        return 'panchanga'
+    if head == 'Lagna' or '_in_house_' in key:
+        return 'houses'
+    if key.endswith('_exalted') or key.endswith('_debilitated'):
+        return 'dignities'
+    if key.endswith(('_retrograde', '_combust', '_graha_yuddha')):
+        return 'conditions'
+    if '_in_' in key:
+        planets, _, place = key.partition('_in_')
+        if '-' in planets:
+            return 'conjunctions'
+        return 'planet_in_nakshatra' if place in _NAKSHATRA_NAMES else 'planet_in_rashi'
+    return 'aspects'
+
+
 def find_matching_signatures(today_sigs: dict, event_sigs: dict) -> dict:
     """
     Compare two sets of signatures and find matches.
@@ -420,6 +627,9 @@ def find_matching_signatures(today_sigs: dict, event_sigs: dict) -> dict:
         'conjunctions': [],
         'aspects': [],
         'dignities': [],
+        'panchanga': [],
+        'houses': [],
+        'conditions': [],
     }
     
     # Helper to find matches
@@ -434,6 +644,9 @@ def find_matching_signatures(today_sigs: dict, event_sigs: dict) -> dict:
     find_matches(today_sigs['conjunctions'], event_sigs['conjunctions'], 'conjunctions')
     find_matches(today_sigs['aspects'], event_sigs['aspects'], 'aspects')
     find_matches(today_sigs['dignities'], event_sigs['dignities'], 'dignities')
+    find_matches(today_sigs['panchanga'], event_sigs['panchanga'], 'panchanga')
+    find_matches(today_sigs['houses'], event_sigs['houses'], 'houses')
+    find_matches(today_sigs['conditions'], event_sigs['conditions'], 'conditions')
     
     return matches
 
@@ -445,16 +658,307 @@ def calculate_correlation_score(matches: dict) -> int:
     """
     score = 0
     
-    # Weight different match types
-    weights = {
-        'planet_in_nakshatra': 3,  # Most specific
-        'conjunctions': 3,
-        'aspects': 2,
-        'dignities': 2,
-        'planet_in_rashi': 1,      # Least specific
-    }
-    
     for match_type, items in matches.items():
-        score += len(items) * weights.get(match_type, 1)
+        score += len(items) * SIGNATURE_WEIGHTS.get(match_type, 1)
     
     return score
+
+
+# ---------------------------------------------------------------------------
+# Match counts
+#
+# A chart's matches as a (MATCH_TYPES, MATCH_COLUMNS) integer matrix, so scores
+# under any weights are one product with a weight vector (see weight_vector).
+# Columns are planets, then one for matches of the chart as a whole (panchanga
+# elements and the Lagna); a match between several planets (a conjunction or
+# an aspect) is counted for the slowest of them.
+# ---------------------------------------------------------------------------
+
+MATCH_TYPES = list(SIGNATURE_WEIGHTS)
+MATCH_COLUMNS = PLANET_NAMES + ['chart']
+CHART_COLUMN = len(PLANET_NAMES)
+
+PLANETS_BY_SPEED = sorted(PLANET_NAMES, key=lambda planet: abs(PLANETS[planet]['daily_motion']))
+
+
+def match_column(planets: List[str]) -> int:
+    """Column a match between planets is counted in"""
+    if not planets:
+        return CHART_COLUMN
+    return PLANET_NAMES.index(min(planets, key=PLANETS_BY_SPEED.index))
+
+
+def match_counts(matches: dict) -> np.ndarray:
+    """Match count matrix of a find_matching_signatures result"""
+    counts = np.zeros((len(MATCH_TYPES), len(MATCH_COLUMNS)), dtype=np.int16)
+    for match_type, items in matches.items():
+        row = MATCH_TYPES.index(match_type)
+        for item in items:
+            if 'planets' in item:
+                planets = item['planets']
+            elif 'planet1' in item:
+                planets = [item['planet1'], item['planet2']]
+            else:
+                planets = [item['planet']] if 'planet' in item else []
+            counts[row, match_column(planets)] += 1
+    return counts
+
+
+def weight_vector(types: Optional[Dict[str, float]] = None, planets: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """
+    Flattened weight matrix scoring flattened match counts: each match weighs its
+    type's weight (SIGNATURE_WEIGHTS unless overridden) times its planet's (1 unless
+    overridden). Integer when every weight is.
+    """
+    type_weights = np.array([(types or {}).get(t, SIGNATURE_WEIGHTS[t]) for t in MATCH_TYPES])
+    planet_weights = np.array([(planets or {}).get(p, 1) for p in PLANET_NAMES] + [1])
+    return np.outer(type_weights, planet_weights).ravel()
+
+
+DEFAULT_WEIGHTS = weight_vector()
+
+
+# ---------------------------------------------------------------------------
+# Batch computation
+#
+# The functions below evaluate the same model as the per-date functions above,
+# but over arrays of Julian Days, so scans over thousands of dates do not build
+# a dict per planet per day.
+# ---------------------------------------------------------------------------
+
+NAKSHATRA_SPAN = 360 / 27
+
+PLANET_PAIRS = [
+    (i, j) for i in range(len(PLANET_NAMES)) for j in range(i + 1, len(PLANET_NAMES))
+]
+
+
+def calculate_sidereal_longitudes_batch(jds: np.ndarray, ayanamsha: str = DEFAULT_AYANAMSHA) -> np.ndarray:
+    """
+    Calculate sidereal longitudes for an array of Julian Days (UT).
+    Returns an array of shape (len(jds), len(PLANET_NAMES)).
+    """
+    jds_tt = terrestrial_time(np.asarray(jds, dtype=np.float64))
+    tropical = get_ephemeris().tropical_longitudes(jds_tt)
+    return np.mod(tropical - ayanamsha_at(jds_tt, ayanamsha)[:, None], 360)
+
+
+def rashi_indices(longitudes: np.ndarray) -> np.ndarray:
+    """Rashi index (0-11) for an array of sidereal longitudes"""
+    return (longitudes / 30).astype(np.int8)
+
+
+def nakshatra_indices(longitudes: np.ndarray) -> np.ndarray:
+    """Nakshatra index (0-26) for an array of sidereal longitudes"""
+    return (longitudes / NAKSHATRA_SPAN).astype(np.int8)
+
+
+KARANA_BY_HALF_TITHI = np.array([karana_name_index(k) for k in range(60)], dtype=np.int8)
+
+
+def panchanga_indices(longitudes: np.ndarray, jds: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Tithi, yoga, karana (index into KARANAS) and vara for arrays of
+    sidereal longitudes and the Julian Days they were computed for.
+    """
+    sun = longitudes[:, PLANET_NAMES.index('Sun')]
+    moon = longitudes[:, PLANET_NAMES.index('Moon')]
+    elongation = np.mod(moon - sun, 360)
+    return {
+        'tithi': (elongation / 12).astype(np.int8),
+        'yoga': (np.mod(moon + sun, 360) / NAKSHATRA_SPAN).astype(np.int8),
+        'karana': KARANA_BY_HALF_TITHI[(elongation / 6).astype(np.int64)],
+        'vara': (np.floor(np.asarray(jds) + 1.5) % 7).astype(np.int8),
+    }
+
+
+SUN_INDEX = PLANET_NAMES.index('Sun')
+TARA_MASK = np.array([planet in TARA_GRAHAS for planet in PLANET_NAMES])
+# Combustion orbs by planet column; -1 for planets never combust (the Sun and the nodes)
+_COMBUSTION_ORBS = np.array([COMBUSTION_ORBS.get(planet, -1) for planet in PLANET_NAMES], dtype=np.float64)
+_RETROGRADE_COMBUSTION_ORBS = np.array(
+    [RETROGRADE_COMBUSTION_ORBS.get(planet, -1) for planet in PLANET_NAMES], dtype=np.float64
+)
+# Planet pairs that can fight a graha yuddha, in PLANET_PAIRS order
+WAR_PAIRS = [(i, j) for i, j in PLANET_PAIRS if TARA_MASK[i] and TARA_MASK[j]]
+
+
+def angular_distance(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Distance (0-180 degrees) between arrays of longitudes"""
+    return np.abs(np.mod(a - b + 180, 360) - 180)
+
+
+def planet_conditions(longitudes: np.ndarray, motions: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Retrograde and combust flags, each (n, planets), and graha yuddha flags,
+    (n, WAR_PAIRS), for charts given as (n, planets) longitudes and daily motions.
+    The nodes are flagged retrograde, as they always are.
+    """
+    retrograde = motions < 0
+    from_sun = angular_distance(longitudes, longitudes[:, SUN_INDEX, None])
+    combust = from_sun < np.where(retrograde, _RETROGRADE_COMBUSTION_ORBS, _COMBUSTION_ORBS)
+    first = [i for i, _ in WAR_PAIRS]
+    second = [j for _, j in WAR_PAIRS]
+    return {
+        'retrograde': retrograde,
+        'combust': combust,
+        'graha_yuddha': angular_distance(longitudes[:, first], longitudes[:, second]) < GRAHA_YUDDHA_ORB,
+    }
+
+
+_aspect_key_table: Optional[List[List[set]]] = None
+
+
+def aspect_keys_by_distance() -> List[List[set]]:
+    """
+    Aspect keys produced by calculate_aspects for every planet pair and sign distance.
+    Indexed as table[pair_index][distance], pairs in PLANET_PAIRS order.
+    """
+    global _aspect_key_table
+    if _aspect_key_table is None:
+        table = []
+        for i, j in PLANET_PAIRS:
+            row = []
+            for distance in range(12):
+                positions = {
+                    PLANET_NAMES[i]: {'rashi': {'id': 0}},
+                    PLANET_NAMES[j]: {'rashi': {'id': distance}},
+                }
+                row.append({aspect['key'] for aspect in calculate_aspects(positions)})
+            table.append(row)
+        _aspect_key_table = table
+    return _aspect_key_table
+
+
+class SignatureScorer:
+    """
+    Scores many charts against one reference chart at once.
+
+    Produces the same score as
+    calculate_correlation_score(find_matching_signatures(reference, other))
+    but works on longitude arrays instead of signature dicts.
+    """
+
+    def __init__(self, reference_signatures: dict):
+        planet_index = {name: i for i, name in enumerate(PLANET_NAMES)}
+        nakshatra_index = {n['name']: n['id'] for n in NAKSHATRAS}
+        rashi_index = {r['name']: r['id'] for r in RASHIS}
+
+        self.nakshatras = np.full(len(PLANET_NAMES), -1, dtype=np.int8)
+        for sig in reference_signatures['planet_in_nakshatra']:
+            self.nakshatras[planet_index[sig['planet']]] = nakshatra_index[sig['nakshatra']]
+
+        self.rashis = np.full(len(PLANET_NAMES), -1, dtype=np.int8)
+        for sig in reference_signatures['planet_in_rashi']:
+            self.rashis[planet_index[sig['planet']]] = rashi_index[sig['rashi']]
+
+        # A dignity is a specific rashi for a specific planet
+        self.dignities = [
+            (planet_index[sig['planet']], DIGNITY[sig['planet']][sig['dignity']])
+            for sig in reference_signatures['dignities']
+        ]
+
+        # A conjunction matches only when exactly the same planets share that rashi
+        self.conjunctions = []
+        for sig in reference_signatures['conjunctions']:
+            members = np.zeros(len(PLANET_NAMES), dtype=bool)
+            for planet in sig['planets']:
+                members[planet_index[planet]] = True
+            self.conjunctions.append((rashi_index[sig['rashi']], members, match_column(sig['planets'])))
+
+        tithi_index = {(t['paksha'], t['name']): t['id'] for t in TITHIS}
+        vara_index = {v['name']: v['id'] for v in VARAS}
+        self.panchanga = {}
+        for sig in reference_signatures['panchanga']:
+            if sig['element'] == 'tithi':
+                self.panchanga['tithi'] = tithi_index[(sig['paksha'], sig['name'])]
+            elif sig['element'] == 'yoga':
+                self.panchanga['yoga'] = YOGAS.index(sig['name'])
+            elif sig['element'] == 'karana':
+                self.panchanga['karana'] = KARANAS.index(sig['name'])
+            elif sig['element'] == 'vara':
+                self.panchanga['vara'] = vara_index[sig['name']]
+
+        # Lagna rashi and the house of each planet; -1 when the reference has no location
+        self.lagna = -1
+        self.houses = np.full(len(PLANET_NAMES), -1, dtype=np.int8)
+        for sig in reference_signatures['houses']:
+            if sig['element'] == 'lagna':
+                self.lagna = rashi_index[sig['rashi']]
+            else:
+                self.houses[planet_index[sig['planet']]] = sig['house']
+
+        # Conditions: the planets retrograde and combust in the reference, and its planetary wars
+        self.retrograde = np.zeros(len(PLANET_NAMES), dtype=bool)
+        self.combust = np.zeros(len(PLANET_NAMES), dtype=bool)
+        self.wars = np.zeros(len(WAR_PAIRS), dtype=bool)
+        for sig in reference_signatures['conditions']:
+            if sig['condition'] == 'graha_yuddha':
+                pair = tuple(sorted(planet_index[planet] for planet in sig['planets']))
+                self.wars[WAR_PAIRS.index(pair)] = True
+            else:
+                getattr(self, sig['condition'])[planet_index[sig['planet']]] = True
+        self.war_columns = np.zeros((len(WAR_PAIRS), len(MATCH_COLUMNS)), dtype=np.int16)
+        for pair, (i, j) in enumerate(WAR_PAIRS):
+            self.war_columns[pair, match_column([PLANET_NAMES[i], PLANET_NAMES[j]])] = 1
+
+        reference_aspect_keys = {sig['key'] for sig in reference_signatures['aspects']}
+        self.aspect_table = np.array([
+            [len(keys & reference_aspect_keys) for keys in row]
+            for row in aspect_keys_by_distance()
+        ], dtype=np.int16)
+        # pair_columns[pair] one-hot selects the column a pair's aspects are counted in
+        self.pair_columns = np.zeros((len(PLANET_PAIRS), len(MATCH_COLUMNS)), dtype=np.int16)
+        for pair, (i, j) in enumerate(PLANET_PAIRS):
+            self.pair_columns[pair, match_column([PLANET_NAMES[i], PLANET_NAMES[j]])] = 1
+
+    def counts(self, longitudes: np.ndarray, jds: np.ndarray, houses: Optional[dict] = None,
+               motions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Match count matrices, shape (n, MATCH_TYPES, MATCH_COLUMNS), for charts given
+        as (n, planets) sidereal longitudes at jds.
+        houses, from houses.calculate_houses_batch, adds house matches for charts with a location.
+        motions, the charts' daily motions, are calculated if not given.
+        """
+        row = {match_type: i for i, match_type in enumerate(MATCH_TYPES)}
+        planets = len(PLANET_NAMES)
+        rashis = rashi_indices(longitudes)
+        nakshatras = nakshatra_indices(longitudes)
+        counts = np.zeros((len(rashis), len(MATCH_TYPES), len(MATCH_COLUMNS)), dtype=np.int16)
+
+        counts[:, row['planet_in_nakshatra'], :planets] = nakshatras == self.nakshatras
+        counts[:, row['planet_in_rashi'], :planets] = rashis == self.rashis
+
+        for planet, rashi in self.dignities:
+            counts[:, row['dignities'], planet] += rashis[:, planet] == rashi
+
+        for rashi, members, column in self.conjunctions:
+            counts[:, row['conjunctions'], column] += ((rashis == rashi) == members).all(axis=1)
+
+        first = [i for i, _ in PLANET_PAIRS]
+        second = [j for _, j in PLANET_PAIRS]
+        distances = (rashis[:, second].astype(np.int16) - rashis[:, first]) % 12
+        counts[:, row['aspects']] = self.aspect_table[np.arange(len(PLANET_PAIRS)), distances] @ self.pair_columns
+
+        panchanga = panchanga_indices(longitudes, jds)
+        for element, index in self.panchanga.items():
+            counts[:, row['panchanga'], CHART_COLUMN] += panchanga[element] == index
+
+        if houses is not None:
+            counts[:, row['houses'], CHART_COLUMN] += houses['lagna'] == self.lagna
+            counts[:, row['houses'], :planets] += houses['houses'] == self.houses
+
+        if motions is None:
+            motions = calculate_daily_motions_batch(jds)
+        conditions = planet_conditions(longitudes, motions)
+        counts[:, row['conditions'], :planets] += conditions['retrograde'] & self.retrograde
+        counts[:, row['conditions'], :planets] += conditions['combust'] & self.combust
+        counts[:, row['conditions']] += (conditions['graha_yuddha'] & self.wars).astype(np.int16) @ self.war_columns
+
+        return counts
+
+    def score(self, longitudes: np.ndarray, jds: np.ndarray, houses: Optional[dict] = None,
+              weights: Optional[np.ndarray] = None, motions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Correlation scores of charts (see counts) under a weight_vector, SIGNATURE_WEIGHTS by default"""
+        counts = self.counts(longitudes, jds, houses, motions)
+        return counts.reshape(len(counts), -1) @ (DEFAULT_WEIGHTS if weights is None else weights)
@@ -0,0 +1,104 @@
+"""
+Cache Warm-up
+Background scheduler that keeps the caches behind the days users are about to
+ask for (today and WARMUP_DAYS either side, in UTC) filled, so the first
+requests after midnight or a restart do not pay for cold fetches and full
+correlation runs.
+
+The window is warmed on start, then again every WARMUP_INTERVAL seconds (to
+replace expired feeds) and just after each UTC midnight (to roll it forward),
+always with random jitter so workers do not fetch in lockstep. At most
+WARMUP_CONCURRENCY days are warmed at once, nearest days first.
+WARMUP_INTERVAL=0 disables it.
+"""
+
+import asyncio
+import logging
+import os
+import random
+from datetime import date, datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DAYS = 3
+DEFAULT_INTERVAL = 900.0
+DEFAULT_JITTER = 60.0
+DEFAULT_CONCURRENCY = 1
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def window(today: date, days: int) -> List[date]:
+    """today and `days` days either side, nearest first (later before earlier on ties)"""
+    result = [today]
+    for offset in range(1, days + 1):
+        result.extend([today + timedelta(days=offset), today - timedelta(days=offset)])
+    return result
+
+
+class WarmupScheduler:
+    """Runs warm_day(day) for every day of the window, on a schedule"""
+
+    def __init__(
+        self,
+        warm_day: Callable[[date], Awaitable[None]],
+        days: Optional[int] = None,
+        interval: Optional[float] = None,
+        jitter: Optional[float] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.warm_day = warm_day
+        self.days = days if days is not None else int(os.environ.get("WARMUP_DAYS", DEFAULT_DAYS))
+        self.interval = interval if interval is not None else float(os.environ.get("WARMUP_INTERVAL", DEFAULT_INTERVAL))
+        self.jitter = jitter if jitter is not None else float(os.environ.get("WARMUP_JITTER", DEFAULT_JITTER))
+        self.concurrency = concurrency or int(os.environ.get("WARMUP_CONCURRENCY", DEFAULT_CONCURRENCY))
+        self.passes = 0
+        self.failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    async def warm(self, today: date):
+        """One pass over the window around today"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def warm_one(day: date):
+            async with semaphore:
+                try:
+                    await self.warm_day(day)
+                except Exception as e:
+                    # A failed day (e.g. Wikipedia being down) is retried on the next pass
+                    self.failures += 1
+                    logger.warning("Warm-up of %s failed: %s", day, e)
+
+        await asyncio.gather(*(warm_one(day) for day in window(today, self.days)))
+        self.passes += 1
+
+    def next_delay(self, now: datetime) -> float:
+        """Seconds until the next pass: the interval, or just after the next UTC midnight if sooner"""
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+        return min(self.interval, (midnight - now).total_seconds()) + random.uniform(0, self.jitter)
+
+    async def run(self):
+        await asyncio.sleep(random.uniform(0, self.jitter))
+        while True:
+            await self.warm(utc_today())
+            await asyncio.sleep(self.next_delay(datetime.now(timezone.utc)))
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,6 +1,6 @@
 import React, { useState, useMemo } from 'react';
 import { format } from 'date-fns';
-import DateSelector from './components/DateSelector';
+import DateSelector, { todayAtNoon } from './components/DateSelector';
 import EventList from './components/EventList';
 import VedicChart from './components/VedicChart';
 import TraditionalChart from './components/TraditionalChart';
@@ -10,41 +10,40 @@ import Timeline from './components/Timeline';
 import CorrelationView from './components/CorrelationView';
 import CombinationBuilder from './components/CombinationBuilder';
 import { useHistoricalEvents, useCategories } from './hooks/useHistoricalEvents';
-import { getVedicChart, getChartSummary } from './lib/vedicCalculations';
+import { useVedicChart } from './hooks/useVedicChart';
+import { getChartSummary } from './lib/vedicCalculations';
 import './App.css';
 
 function App() {
-  const [selectedDate, setSelectedDate] = useState(new Date());
+  const [selectedDate, setSelectedDate] = useState(todayAtNoon);
   const [filters, setFilters] = useState({ category: null, yearFrom: null, yearTo: null });
   const [filterOpen, setFilterOpen] = useState(false);
   const [activeTab, setActiveTab] = useState('correlations');
   const [selectedEvent, setSelectedEvent] = useState(null);
   const [chartStyle, setChartStyle] = useState('south'); // 'south', 'north', or 'grid'
 
-  const { data, loading, error } = useHistoricalEvents(selectedDate, filters);
+  const { data, correlations, loading, error } = useHistoricalEvents(selectedDate, filters);
   const { categories } = useCategories();
 
   // Calculate Vedic chart for selected date
-  const vedicChart = useMemo(() => {
-    return getVedicChart(selectedDate);
-  }, [selectedDate]);
+  const vedicChart = useVedicChart(selectedDate);
 
   const chartSummary = useMemo(() => {
-    return getChartSummary(vedicChart);
+    return vedicChart ? getChartSummary(vedicChart) : [];
   }, [vedicChart]);
 
   // Calculate chart for a historical event's year
-  const eventChart = useMemo(() => {
+  const eventDate = useMemo(() => {
     if (!selectedEvent) return null;
-    const eventDate = new Date(
+    return new Date(
       selectedEvent.year, 
       selectedDate.getMonth(), 
       selectedDate.getDate(),
       selectedDate.getHours(),
       selectedDate.getMinutes()
     );
-    return getVedicChart(eventDate);
   }, [selectedEvent, selectedDate]);
+  const eventChart = useVedicChart(eventDate);
 
   const handleEventClick = (event) => {
     setSelectedEvent(event);
@@ -152,7 +151,7 @@ function App() {
 
         <div className="content-area">
           {activeTab === 'correlations' && (
-            <CorrelationView selectedDate={selectedDate} />
+            <CorrelationView selectedDate={selectedDate} firstPage={correlations} loading={loading} loadError={error} />
           )}
 
           {activeTab === 'search' && (
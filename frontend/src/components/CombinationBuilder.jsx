@@ -57,6 +57,7 @@ function CombinationBuilder({ selectedDate }) {
   const [results, setResults] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Fetch countries list on mount
   useEffect(() => {
@@ -106,13 +107,15 @@ function CombinationBuilder({ selectedDate }) {
 
         // Search for first condition, then filter by others
         const firstCond = validConditions[0];
-        const result = await searchByPlanetaryPosition(
+        const fetchPage = (cursor) => searchByPlanetaryPosition(
           firstCond.planet,
           month,
           day,
           firstCond.type === 'nakshatra' ? firstCond.nakshatra : null,
-          firstCond.type === 'rashi' ? firstCond.rashi : null
+          firstCond.type === 'rashi' ? firstCond.rashi : null,
+          cursor
         );
+        const result = await fetchPage(null);
 
         // If multiple conditions, filter results
         if (validConditions.length > 1) {
@@ -121,7 +124,7 @@ function CombinationBuilder({ selectedDate }) {
           result.filter_note = `Showing results for ${firstCond.planet} in ${firstCond.type === 'nakshatra' ? firstCond.nakshatra : firstCond.rashi}. Additional filters applied client-side when available.`;
         }
 
-        setResults({ type: 'position', data: result, conditions: validConditions });
+        setResults({ type: 'position', data: result, conditions: validConditions, fetchPage });
       } else {
         // Aspect search
         if (!aspectSearch.planet1 || !aspectSearch.planet2 || !aspectSearch.aspectType) {
@@ -131,17 +134,19 @@ function CombinationBuilder({ selectedDate }) {
         }
 
         // Use the new aspect search API
-        const result = await searchByAspect(
+        const fetchPage = (cursor) => searchByAspect(
           aspectSearch.planet1,
           aspectSearch.planet2,
           aspectSearch.aspectType,
           month,
           day,
           countryFilter.country || null,
-          countryFilter.region || null
+          countryFilter.region || null,
+          cursor
         );
+        const result = await fetchPage(null);
 
-        setResults({ type: 'aspect', data: result });
+        setResults({ type: 'aspect', data: result, fetchPage });
       }
     } catch (err) {
       setError(err.message || 'Search failed');
@@ -150,6 +155,25 @@ function CombinationBuilder({ selectedDate }) {
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const more = await results.fetchPage(results.data.next_cursor);
+      setResults({
+        ...results,
+        data: {
+          ...results.data,
+          ...more,
+          matching_events: [...results.data.matching_events, ...more.matching_events],
+        },
+      });
+    } catch (err) {
+      setError(err.message || 'Search failed');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleReset = () => {
     setConditions([{ planet: '', nakshatra: '', rashi: '', type: 'nakshatra' }]);
     setAspectSearch({ planet1: '', planet2: '', aspectType: '' });
@@ -553,6 +577,14 @@ function CombinationBuilder({ selectedDate }) {
               ))}
             </div>
           )}
+
+          {results.data.next_cursor && (
+            <button className="load-more-btn" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore
+                ? 'Loading...'
+                : `Load more (${results.data.matching_events.length} of ${results.data.total_matches})`}
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { format } from 'date-fns';
 import { getCorrelatedEvents } from '../lib/api';
-import { Sparkles, TrendingUp, Star, Zap, Circle, ExternalLink, BookOpen, Search } from 'lucide-react';
+import { Sparkles, TrendingUp, Star, Zap, Circle, ExternalLink, BookOpen, Search, Moon, Home, RotateCcw } from 'lucide-react';
 
 const MATCH_TYPE_INFO = {
   planet_in_nakshatra: { label: 'Nakshatra Match', icon: Star, color: '#9B59B6' },
@@ -9,6 +9,9 @@ const MATCH_TYPE_INFO = {
   conjunctions: { label: 'Conjunction', icon: Zap, color: '#E74C3C' },
   aspects: { label: 'Aspect', icon: TrendingUp, color: '#F39C12' },
   dignities: { label: 'Dignity', icon: Sparkles, color: '#27AE60' },
+  panchanga: { label: 'Panchanga', icon: Moon, color: '#16A085' },
+  houses: { label: 'House Match', icon: Home, color: '#8E44AD' },
+  conditions: { label: 'Planet Condition', icon: RotateCcw, color: '#C0392B' },
 };
 
 // Helper functions for research links
@@ -22,36 +25,49 @@ const getGoogleSearchUrl = (text, year) => {
   return `https://www.google.com/search?q=${searchQuery}`;
 };
 
+// Placements matched over the whole day (window=day) hold for a fraction of it
+const heldFor = (m) => (m.fraction !== undefined && m.fraction < 1 ? ` (${Math.round(m.fraction * 100)}% of the day)` : '');
+
 const getGoogleScholarUrl = (text, year) => {
   const searchQuery = encodeURIComponent(`${text.substring(0, 60)} ${year}`);
   return `https://scholar.google.com/scholar?q=${searchQuery}`;
 };
 
-function CorrelationView({ selectedDate }) {
-  const [data, setData] = useState(null);
-  const [loading, setLoading] = useState(true);
+// The first page arrives with the day's events (see useHistoricalEvents); later pages are fetched here
+function CorrelationView({ selectedDate, firstPage, loading, loadError }) {
+  const [data, setData] = useState(firstPage);
   const [error, setError] = useState(null);
   const [expandedEvent, setExpandedEvent] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
-    async function fetchCorrelations() {
-      setLoading(true);
-      setError(null);
-      try {
-        const month = selectedDate.getMonth() + 1;
-        const day = selectedDate.getDate();
-        const year = selectedDate.getFullYear();
-        const hour = selectedDate.getHours();
-        const result = await getCorrelatedEvents(month, day, year, hour, 2, 30);
-        setData(result);
-      } catch (err) {
-        setError(err.message || 'Failed to fetch correlations');
-      } finally {
-        setLoading(false);
-      }
+    setData(firstPage);
+    setError(null);
+    setExpandedEvent(null);
+  }, [firstPage]);
+
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const result = await getCorrelatedEvents(
+        selectedDate.getMonth() + 1,
+        selectedDate.getDate(),
+        selectedDate.getFullYear(),
+        selectedDate.getHours(),
+        2,
+        30,
+        data.next_cursor
+      );
+      setData({
+        ...result,
+        correlated_events: [...data.correlated_events, ...result.correlated_events],
+      });
+    } catch (err) {
+      setError(err.message || 'Failed to fetch correlations');
+    } finally {
+      setLoadingMore(false);
     }
-    fetchCorrelations();
-  }, [selectedDate]);
+  };
 
   if (loading) {
     return (
@@ -63,10 +79,10 @@ function CorrelationView({ selectedDate }) {
     );
   }
 
-  if (error) {
+  if (loadError || error) {
     return (
       <div className="correlation-view error">
-        <p>Error: {error}</p>
+        <p>Error: {loadError || error}</p>
       </div>
     );
   }
@@ -75,7 +91,7 @@ function CorrelationView({ selectedDate }) {
     return null;
   }
 
-  const { today, correlated_events, total_matches } = data;
+  const { today, correlated_events, total_matches, next_cursor } = data;
 
   return (
     <div className="correlation-view">
@@ -216,7 +232,7 @@ function CorrelationView({ selectedDate }) {
                         </h5>
                         <ul>
                           {item.matches.planet_in_nakshatra.map((m, i) => (
-                            <li key={i}>{m.planet} in {m.nakshatra} (Pada {m.pada})</li>
+                            <li key={i}>{m.planet} in {m.nakshatra}{m.pada ? ` (Pada ${m.pada})` : ''}{heldFor(m)}</li>
                           ))}
                         </ul>
                       </div>
@@ -261,6 +277,19 @@ function CorrelationView({ selectedDate }) {
                       </div>
                     )}
 
+                    {item.matches.conditions?.length > 0 && (
+                      <div className="match-section">
+                        <h5>
+                          <RotateCcw size={14} /> Same Planet Conditions
+                        </h5>
+                        <ul>
+                          {item.matches.conditions.map((m, i) => (
+                            <li key={i}>{m.planets ? m.planets.join(' and ') : m.planet} {m.condition.replace('_', ' ')}</li>
+                          ))}
+                        </ul>
+                      </div>
+                    )}
+
                     {item.matches.planet_in_rashi.length > 0 && (
                       <div className="match-section">
                         <h5>
@@ -268,7 +297,7 @@ function CorrelationView({ selectedDate }) {
                         </h5>
                         <ul>
                           {item.matches.planet_in_rashi.slice(0, 5).map((m, i) => (
-                            <li key={i}>{m.planet} in {m.rashi}</li>
+                            <li key={i}>{m.planet} in {m.rashi}{heldFor(m)}</li>
                           ))}
                           {item.matches.planet_in_rashi.length > 5 && (
                             <li className="more">+{item.matches.planet_in_rashi.length - 5} more</li>
@@ -297,6 +326,12 @@ function CorrelationView({ selectedDate }) {
             ))}
           </div>
         )}
+
+        {next_cursor && (
+          <button className="load-more-btn" onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : `Load more (${correlated_events.length} of ${total_matches})`}
+          </button>
+        )}
       </div>
     </div>
   );
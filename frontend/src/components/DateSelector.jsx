@@ -1,6 +1,9 @@
 import React, { useState } from 'react';
 import { ChevronLeft, ChevronRight, Calendar, Clock, ChevronDown, ChevronUp } from 'lucide-react';
-import { format, addDays, subDays, setHours, setMinutes } from 'date-fns';
+import { format, addDays, subDays, setHours, setMinutes, startOfToday } from 'date-fns';
+
+// The default selection: charts are cast, and the server's caches warmed, for noon
+export const todayAtNoon = () => setHours(startOfToday(), 12);
 
 function DateSelector({ selectedDate, onDateChange }) {
   const [showAdvanced, setShowAdvanced] = useState(false);
@@ -14,7 +17,7 @@ function DateSelector({ selectedDate, onDateChange }) {
   };
 
   const handleToday = () => {
-    onDateChange(new Date());
+    onDateChange(todayAtNoon());
   };
 
   const handleDateChange = (e) => {
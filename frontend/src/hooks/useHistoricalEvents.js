@@ -1,8 +1,10 @@
 import { useState, useEffect } from 'react';
-import { getTodayEvents, getEventsByDate, getCategories } from '../lib/api';
+import { getDayBundle, getCategories } from '../lib/api';
 
+// The day's events and the first page of its correlations, in one request
 export function useHistoricalEvents(selectedDate, filters) {
   const [data, setData] = useState(null);
+  const [correlations, setCorrelations] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -11,10 +13,17 @@ export function useHistoricalEvents(selectedDate, filters) {
       setLoading(true);
       setError(null);
       try {
-        const month = selectedDate.getMonth() + 1;
-        const day = selectedDate.getDate();
-        const result = await getEventsByDate(month, day, filters);
-        setData(result);
+        const result = await getDayBundle(selectedDate.getMonth() + 1, selectedDate.getDate(), {
+          include: ['events', 'correlations'],
+          year: selectedDate.getFullYear(),
+          hour: selectedDate.getHours(),
+          filters,
+          minScore: 2,
+          limit: 30,
+        });
+        setData(result.events);
+        // Shaped like a /vedic/correlations response
+        setCorrelations({ ...result.correlations, today: { key_signatures: result.correlations.key_signatures } });
       } catch (err) {
         setError(err.message || 'Failed to fetch events');
       } finally {
@@ -24,7 +33,7 @@ export function useHistoricalEvents(selectedDate, filters) {
     fetchData();
   }, [selectedDate, filters]);
 
-  return { data, loading, error };
+  return { data, correlations, loading, error };
 }
 
 export function useCategories() {
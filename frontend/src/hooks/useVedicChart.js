@@ -0,0 +1,27 @@
+import { useState, useEffect } from 'react';
+import { getVedicChart, loadTile } from '../lib/vedicCalculations';
+
+export function useVedicChart(date) {
+  const [chart, setChart] = useState(null);
+
+  useEffect(() => {
+    if (!date) {
+      setChart(null);
+      return;
+    }
+    let cancelled = false;
+    loadTile(date.getFullYear())
+      .then((tile) => {
+        if (!cancelled) setChart(getVedicChart(date, tile));
+      })
+      .catch((err) => {
+        console.error('Failed to load ephemeris tile:', err);
+        if (!cancelled) setChart(null);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [date]);
+
+  return chart;
+}
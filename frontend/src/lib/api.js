@@ -41,30 +41,74 @@ export async function getVedicChartToday() {
   return response.data;
 }
 
-export async function getVedicChart(month, day, year) {
-  const response = await api.get(`/vedic/chart/${month}/${day}/${year}`);
+export async function getVedicChart(month, day, year, country = null, ayanamsha = null) {
+  const params = {};
+  if (country) params.country = country;
+  if (ayanamsha) params.ayanamsha = ayanamsha;
+  const response = await api.get(`/vedic/chart/${month}/${day}/${year}`, { params });
   return response.data;
 }
 
-export async function getCorrelatedEvents(month, day, year = null, hour = null, minScore = 2, limit = 30) {
+export async function getCorrelatedEvents(month, day, year = null, hour = null, minScore = 2, limit = 30, cursor = null, country = null, profile = null, weights = null, ayanamsha = null, matchWindow = null) {
   const params = { min_score: minScore, limit };
   if (year) params.year = year;
   if (hour !== null) params.hour = hour;
+  if (cursor) params.cursor = cursor;
+  if (country) params.country = country;
+  if (profile) params.profile = profile;
+  if (weights) params.weights = weights;
+  if (ayanamsha) params.ayanamsha = ayanamsha;
+  if (matchWindow) params.window = matchWindow;
   
   const response = await api.get(`/vedic/correlations/${month}/${day}`, { params });
   return response.data;
 }
 
-export async function searchByPlanetaryPosition(planet, month, day, nakshatra = null, rashi = null) {
+// Events, reference chart and first page of correlations in one request;
+// include picks sections, e.g. ['events', 'correlations']
+export async function getDayBundle(month, day, { include = null, year = null, hour = null, country = null, filters = {}, minScore = 2, limit = 30, profile = null, weights = null, ayanamsha = null, matchWindow = null } = {}) {
+  const params = { min_score: minScore, limit };
+  if (include) params.include = include.join(',');
+  if (year) params.year = year;
+  if (hour !== null) params.hour = hour;
+  if (country) params.country = country;
+  if (filters.category) params.category = filters.category;
+  if (filters.yearFrom) params.year_from = filters.yearFrom;
+  if (filters.yearTo) params.year_to = filters.yearTo;
+  if (filters.country) params.event_country = filters.country;
+  if (filters.region) params.region = filters.region;
+  if (profile) params.profile = profile;
+  if (weights) params.weights = weights;
+  if (ayanamsha) params.ayanamsha = ayanamsha;
+  if (matchWindow) params.window = matchWindow;
+  
+  const response = await api.get(`/day/${month}/${day}`, { params });
+  return response.data;
+}
+
+export async function getWeightProfiles() {
+  const response = await api.get('/vedic/profiles');
+  return response.data;
+}
+
+export async function saveWeightProfile(name, types = {}, planets = {}, adminToken = null) {
+  const response = await api.put(`/vedic/profiles/${name}`, { types, planets }, { headers: adminHeaders(adminToken) });
+  return response.data;
+}
+
+export async function searchByPlanetaryPosition(planet, month, day, nakshatra = null, rashi = null, cursor = null, ayanamsha = null, condition = null) {
   const params = { planet, month, day };
   if (nakshatra) params.nakshatra = nakshatra;
   if (rashi) params.rashi = rashi;
+  if (condition) params.condition = condition;
+  if (cursor) params.cursor = cursor;
+  if (ayanamsha) params.ayanamsha = ayanamsha;
   
   const response = await api.get('/vedic/search', { params });
   return response.data;
 }
 
-export async function searchByAspect(planet1, planet2, aspectType, month, day, country = null, region = null) {
+export async function searchByAspect(planet1, planet2, aspectType, month, day, country = null, region = null, cursor = null, ayanamsha = null) {
   const params = { 
     planet1, 
     planet2, 
@@ -74,7 +118,77 @@ export async function searchByAspect(planet1, planet2, aspectType, month, day, c
   };
   if (country) params.country = country;
   if (region) params.region = region;
+  if (cursor) params.cursor = cursor;
+  if (ayanamsha) params.ayanamsha = ayanamsha;
   
   const response = await api.get('/vedic/aspect-search', { params });
   return response.data;
 }
+
+export async function getUpcomingSimilarDates(month, day, year, years = 50, limit = 10, ayanamsha = null) {
+  const params = { years, limit };
+  if (ayanamsha) params.ayanamsha = ayanamsha;
+  const response = await api.get(`/vedic/upcoming/${month}/${day}/${year}`, { params });
+  return response.data;
+}
+
+export async function getPanchanga(month, day, year, ayanamsha = null) {
+  const params = {};
+  if (ayanamsha) params.ayanamsha = ayanamsha;
+  const response = await api.get(`/vedic/panchanga/${month}/${day}/${year}`, { params });
+  return response.data;
+}
+
+export async function getPanchangaRange(from, to, ayanamsha = null) {
+  const params = { from, to };
+  if (ayanamsha) params.ayanamsha = ayanamsha;
+  const response = await api.get('/vedic/panchanga', { params });
+  return response.data;
+}
+
+export async function getDashaTimeline(month, day, year, hour = 12, depth = 2, ayanamsha = null) {
+  const params = { hour, depth };
+  if (ayanamsha) params.ayanamsha = ayanamsha;
+  const response = await api.get(`/vedic/dasha/${month}/${day}/${year}`, { params });
+  return response.data;
+}
+
+export async function getEventDashas(month, day, birth, hour = 12, ayanamsha = null) {
+  const params = { birth, hour };
+  if (ayanamsha) params.ayanamsha = ayanamsha;
+  const response = await api.get(`/vedic/dashas/${month}/${day}`, { params });
+  return response.data;
+}
+
+export async function contributeEvent(month, day, year, text, links = null) {
+  const response = await api.post('/events', { month, day, year, text, links });
+  return response.data;
+}
+
+// Events not contributed by users can only be changed with the admin token
+const adminHeaders = (adminToken) => (adminToken ? { 'X-Admin-Token': adminToken } : {});
+
+export async function editEvent(eventId, month, day, year, text, links = null, adminToken = null) {
+  const response = await api.put(`/events/${eventId}`, { month, day, year, text, links }, { headers: adminHeaders(adminToken) });
+  return response.data;
+}
+
+export async function deleteEvent(eventId, adminToken = null) {
+  const response = await api.delete(`/events/${eventId}`, { headers: adminHeaders(adminToken) });
+  return response.data;
+}
+
+export async function getSimilarEvents(eventId, limit = 10) {
+  const response = await api.get(`/events/${eventId}/similar`, { params: { limit } });
+  return response.data;
+}
+
+export async function getTileInfo() {
+  const response = await api.get('/vedic/tiles');
+  return response.data;
+}
+
+export async function getEphemerisTile(year, version) {
+  const response = await api.get(`/vedic/tiles/${year}.bin`, { params: { v: version }, responseType: 'arraybuffer' });
+  return response.data;
+}
@@ -1,24 +1,19 @@
 /**
  * Vedic Astrology Calculation Engine
- * Calculates planetary positions using sidereal (Vedic) zodiac
+ * Reads sidereal positions from the backend's binary ephemeris tiles (one per
+ * year, see backend/tiles.py), so charts match the server's and browsing dates
+ * needs no per-date requests
  */
 
-// Ayanamsha value (Lahiri) - approximate value that changes over time
-const AYANAMSHA_J2000 = 23.85; // degrees at J2000 epoch
-const AYANAMSHA_RATE = 50.29 / 3600; // arcseconds per year, converted to degrees
+import { getTileInfo, getEphemerisTile } from './api';
 
-// Planet data with mean orbital elements at J2000 epoch
-const PLANETS = {
-  Sun: { period: 365.25636, longitude0: 280.46646, dailyMotion: 0.9856474 },
-  Moon: { period: 27.321582, longitude0: 218.3165, dailyMotion: 13.176358 },
-  Mercury: { period: 87.969, longitude0: 252.2511, dailyMotion: 4.0923344 },
-  Venus: { period: 224.701, longitude0: 181.9798, dailyMotion: 1.6021302 },
-  Mars: { period: 686.98, longitude0: 355.4330, dailyMotion: 0.5240208 },
-  Jupiter: { period: 4332.59, longitude0: 34.3515, dailyMotion: 0.0830853 },
-  Saturn: { period: 10759.22, longitude0: 49.9429, dailyMotion: 0.0334442 },
-  Rahu: { period: 6793.5, longitude0: 125.0, dailyMotion: -0.0529539 }, // Mean Node, retrograde
-  Ketu: { period: 6793.5, longitude0: 305.0, dailyMotion: -0.0529539 }, // Opposite to Rahu
-};
+// Planets in tile order (the backend's PLANET_NAMES)
+export const PLANET_NAMES = ['Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn', 'Rahu', 'Ketu'];
+
+const TILE_MAGIC = 'VTIL';
+const TILE_VERSION = 2;
+const TILE_HEADER_SIZE = 48;
+const UNITS_PER_DEGREE = 65536 / 360;
 
 // Vedic Zodiac Signs (Rashis)
 export const RASHIS = [
@@ -79,12 +74,66 @@ export const DIGNITY = {
 };
 
 /**
- * Calculate Julian Day Number from a date
+ * Parse an ephemeris tile (layout in backend/tiles.py)
+ */
+export function parseTile(buffer) {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== TILE_MAGIC || view.getUint16(4, true) !== TILE_VERSION) {
+    throw new Error('Unsupported ephemeris tile');
+  }
+  const planetCount = view.getUint8(6);
+  const days = view.getUint16(12, true);
+  const planets = {};
+  let offset = TILE_HEADER_SIZE;
+  for (let i = 0; i < planetCount; i++) {
+    const steps = view.getUint8(36 + i);
+    const count = days * steps + 1;
+    planets[PLANET_NAMES[i]] = { steps, samples: new Uint16Array(buffer, offset, count) };
+    offset += count * 2;
+  }
+  return {
+    year: view.getInt32(8, true),
+    days,
+    firstJd: view.getFloat64(16, true),
+    cutoverKey: view.getInt32(24, true),
+    ayanamshaStart: view.getFloat32(28, true),
+    ayanamshaEnd: view.getFloat32(32, true),
+    planets,
+  };
+}
+
+let tileVersion = null;
+const tiles = new Map();
+
+/**
+ * Load (once) the tile of a year
+ */
+export function loadTile(year) {
+  if (!tiles.has(year)) {
+    const tile = (async () => {
+      if (!tileVersion) {
+        tileVersion = getTileInfo().then((info) => info.version);
+        // Ask again on the next load rather than keep a failure until the page reloads
+        tileVersion.catch(() => { tileVersion = null; });
+      }
+      return parseTile(await getEphemerisTile(year, await tileVersion));
+    })();
+    tiles.set(year, tile);
+    tile.catch(() => tiles.delete(year));
+  }
+  return tiles.get(year);
+}
+
+/**
+ * Julian Day of a date, its fields read as UT as the backend reads them; dates
+ * before the tile's Gregorian cutover are Julian calendar dates
  */
-function dateToJD(date) {
+function dateToJD(date, cutoverKey) {
   const year = date.getFullYear();
   const month = date.getMonth() + 1;
   const day = date.getDate() + (date.getHours() + date.getMinutes() / 60) / 24;
+  const gregorian = year * 10000 + month * 100 + date.getDate() >= cutoverKey;
 
   let y = year;
   let m = month;
@@ -93,21 +142,15 @@ function dateToJD(date) {
     m = month + 12;
   }
 
-  const a = Math.floor(y / 100);
-  const b = 2 - a + Math.floor(a / 4);
+  let b = 0;
+  if (gregorian) {
+    const a = Math.floor(y / 100);
+    b = 2 - a + Math.floor(a / 4);
+  }
 
   return Math.floor(365.25 * (y + 4716)) + Math.floor(30.6001 * (m + 1)) + day + b - 1524.5;
 }
 
-/**
- * Calculate Ayanamsha for a given date (Lahiri)
- */
-function calculateAyanamsha(date) {
-  const jd = dateToJD(date);
-  const t = (jd - 2451545.0) / 365.25; // Years from J2000
-  return AYANAMSHA_J2000 + AYANAMSHA_RATE * t;
-}
-
 /**
  * Normalize angle to 0-360 degrees
  */
@@ -117,34 +160,22 @@ function normalizeAngle(angle) {
 }
 
 /**
- * Calculate planetary position (tropical longitude) for a date
+ * Sidereal longitude of a planet: its tropical longitude, interpolated between
+ * the tile's samples along the shorter arc, less the ayanamsha
  */
-function calculateTropicalLongitude(planet, date) {
-  const jd = dateToJD(date);
-  const daysFromJ2000 = jd - 2451545.0;
-  const data = PLANETS[planet];
-  
-  // Mean longitude calculation
-  let longitude = data.longitude0 + data.dailyMotion * daysFromJ2000;
-  
-  // Add perturbations for inner planets
-  if (planet === 'Mercury' || planet === 'Venus') {
-    // Simplified perturbation
-    const sunLong = calculateTropicalLongitude('Sun', date);
-    const anomaly = (daysFromJ2000 * 360 / data.period) % 360;
-    longitude += 5 * Math.sin(anomaly * Math.PI / 180);
-  }
-  
-  return normalizeAngle(longitude);
+function tileLongitude(tile, planet, days) {
+  const { steps, samples } = tile.planets[planet];
+  const x = Math.min(Math.max(days, 0), tile.days) * steps;
+  const i = Math.min(Math.floor(x), samples.length - 2);
+  const delta = ((samples[i + 1] - samples[i] + 98304) % 65536) - 32768;
+  return normalizeAngle((samples[i] + (x - i) * delta) / UNITS_PER_DEGREE - tileAyanamsha(tile, days));
 }
 
 /**
- * Calculate sidereal longitude (Vedic)
+ * Ayanamsha (Lahiri) at a point of the tile's year
  */
-function calculateSiderealLongitude(planet, date) {
-  const tropical = calculateTropicalLongitude(planet, date);
-  const ayanamsha = calculateAyanamsha(date);
-  return normalizeAngle(tropical - ayanamsha);
+function tileAyanamsha(tile, days) {
+  return tile.ayanamshaStart + (tile.ayanamshaEnd - tile.ayanamshaStart) * days / tile.days;
 }
 
 /**
@@ -177,13 +208,14 @@ function getDignity(planet, rashiIndex) {
 }
 
 /**
- * Calculate planetary positions for a given date
+ * Calculate planetary positions for a given date from its year's tile
  */
-export function calculatePlanetaryPositions(date) {
+export function calculatePlanetaryPositions(date, tile) {
   const positions = {};
+  const days = dateToJD(date, tile.cutoverKey) - tile.firstJd;
   
-  for (const planet of Object.keys(PLANETS)) {
-    const longitude = calculateSiderealLongitude(planet, date);
+  for (const planet of PLANET_NAMES) {
+    const longitude = tileLongitude(tile, planet, days);
     const rashi = getRashiFromLongitude(longitude);
     const nakshatra = getNakshatraFromLongitude(longitude);
     
@@ -294,13 +326,13 @@ export function calculateAspects(positions) {
 }
 
 /**
- * Get complete Vedic chart data for a date
+ * Get complete Vedic chart data for a date, given its year's tile (see loadTile)
  */
-export function getVedicChart(date) {
-  const positions = calculatePlanetaryPositions(date);
+export function getVedicChart(date, tile) {
+  const positions = calculatePlanetaryPositions(date, tile);
   const conjunctions = findConjunctions(positions);
   const aspects = calculateAspects(positions);
-  const ayanamsha = calculateAyanamsha(date);
+  const ayanamsha = tileAyanamsha(tile, dateToJD(date, tile.cutoverKey) - tile.firstJd);
   
   return {
     date: date.toISOString(),